@@ -0,0 +1,184 @@
+"""
+Load-test the LLM fallback against the offline stand-in providers
+Starts benchmarks/llm_standin.py in-process, points the clients at it and
+drives query_llm (or stream_llm, or the process_command fallback) from
+concurrent threads, once per fallback policy, reporting throughput and
+latency percentiles. Prompts are unique and answered without history, so
+the response caches and request coalescing never apply.
+
+Scenarios:
+    healthy    every provider answers in about 0.3 s
+    slow       Groq has a heavy latency tail, the others are steady
+    flaky      Groq fails 20% of requests and Gemini throttles 10%
+    limited    Groq allows 60 requests per minute, then sends 429s
+
+Usage: python benchmarks/bench_llm_load.py [--scenario slow] [--requests 200] [--concurrency 8]
+           [--policies sequential,hedged,race] [--path query|stream|command]
+           [--rate-limits] [--provider groq:latency=2 ...]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from llm_standin import Profile, add_profile_arguments, profiles_from_arguments, start_server
+
+SCENARIOS = {
+    "healthy": {provider: Profile(latency=0.3, jitter=0.3) for provider in ("groq", "gemini", "openai")},
+    "slow": {"groq": Profile(latency=0.3, jitter=1.2),
+             "gemini": Profile(latency=0.5, jitter=0.2),
+             "openai": Profile(latency=0.7, jitter=0.2)},
+    "flaky": {"groq": Profile(latency=0.3, jitter=0.3, errors=0.2),
+              "gemini": Profile(latency=0.4, jitter=0.3, throttle=0.1),
+              "openai": Profile(latency=0.6, jitter=0.3)},
+    "limited": {"groq": Profile(latency=0.3, jitter=0.3, rpm=60),
+                "gemini": Profile(latency=0.5, jitter=0.3),
+                "openai": Profile(latency=0.7, jitter=0.3)},
+}
+
+
+def percentile(values, fraction):
+    """Nearest-rank percentile of a sorted list"""
+    if not values:
+        return float("nan")
+    return values[min(len(values) - 1, max(0, int(fraction * len(values) + 0.5) - 1))]
+
+
+def make_request(path):
+    """Function sending one prompt down the chosen path, returning (ok, first text seconds)"""
+    from brain import llm
+
+    if path == "query":
+        def request(prompt):
+            start = time.perf_counter()
+            response = llm.query_llm(prompt, include_memory=False, use_cache=False)
+            return response != llm.ERROR_MESSAGE, time.perf_counter() - start
+    elif path == "stream":
+        def request(prompt):
+            start = time.perf_counter()
+            first = None
+            pieces = []
+            for piece in llm.stream_llm(prompt, include_memory=False, use_cache=False):
+                if first is None:
+                    first = time.perf_counter() - start
+                pieces.append(piece)
+            return "".join(pieces) != llm.ERROR_MESSAGE, first
+    else:
+        # The complete voice path: unknown commands go through the learning
+        # module before the LLM fallback (needs the desktop dependencies)
+        from brain.tasks import process_command
+
+        def request(prompt):
+            start = time.perf_counter()
+            response = process_command(prompt)
+            return response != llm.ERROR_MESSAGE, time.perf_counter() - start
+    return request
+
+
+def run_policy(policy, args, server):
+    """Drive one policy and return its report row"""
+    from brain import llm
+    from brain.llm_dispatch import provider_stats
+    from brain.llm_scheduler import LLMScheduler
+    from brain.provider_health import HealthRegistry
+    from config import LLM_RATE_LIMITS, LLM_QUEUE_TIMEOUTS
+
+    # Every policy starts with fresh provider health and empty queues
+    llm.LLM_POLICY = policy
+    llm.HEALTH = HealthRegistry()
+    for name, function in llm.PROVIDERS:
+        llm.HEALTH.register(name, function)
+    llm.SCHEDULER = LLMScheduler(LLM_RATE_LIMITS if args.rate_limits else {}, LLM_QUEUE_TIMEOUTS)
+    server.reset_stats()
+    wins_before = {name: stats["wins"] for name, stats in provider_stats().items()}
+
+    request = make_request(args.path)
+    prompts = [f"stand-in load test {policy} request {i}: what is the capital of France?"
+               for i in range(args.requests)]
+    latencies = []
+    firsts = []
+    failures = 0
+
+    def timed(prompt):
+        start = time.perf_counter()
+        ok, first = request(prompt)
+        return ok, time.perf_counter() - start, first
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        for ok, latency, first in pool.map(timed, prompts):
+            latencies.append(latency)
+            if first is not None:
+                firsts.append(first)
+            failures += not ok
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    firsts.sort()
+    wins = {name: stats["wins"] - wins_before.get(name, 0) for name, stats in provider_stats().items()}
+    upstream = sum(stats["requests"] for stats in server.stats().values())
+    return {
+        "policy": policy,
+        "ok": len(prompts) - failures,
+        "failed": failures,
+        "throughput": len(prompts) / elapsed,
+        "p50": percentile(latencies, 0.50),
+        "p95": percentile(latencies, 0.95),
+        "p99": percentile(latencies, 0.99),
+        "first_p50": percentile(firsts, 0.50),
+        "upstream": upstream,
+        "wins": wins,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--scenario", choices=sorted(SCENARIOS), default="slow")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--policies", default="sequential,hedged,race")
+    parser.add_argument("--path", choices=("query", "stream", "command"), default="query")
+    parser.add_argument("--rate-limits", action="store_true",
+                        help="keep the client-side LLM_RATE_LIMITS scheduling (off by default)")
+    parser.add_argument("--seed", type=int, default=1)
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+
+    server = start_server(profiles_from_arguments(args, SCENARIOS[args.scenario]), seed=args.seed)
+    # The clients read their endpoints and keys when config is imported, and
+    # log and cache relative to the working directory
+    os.environ.update(server.environment())
+    workdir = tempfile.mkdtemp(prefix="jarvis-load-")
+    os.chdir(workdir)
+    os.makedirs("data", exist_ok=True)
+
+    from brain.llm_dispatch import DISPATCH_POLICIES
+    policies = [policy.strip() for policy in args.policies.split(",") if policy.strip()]
+    for policy in policies:
+        if policy not in DISPATCH_POLICIES:
+            parser.error(f"unknown policy {policy!r}, expected one of {', '.join(DISPATCH_POLICIES)}")
+    if args.path == "stream" and policies != ["sequential"]:
+        print("Note: stream_llm always tries providers one after another; the policy only names the run")
+
+    print(f"\nScenario {args.scenario}: {args.requests} requests via {args.path}, concurrency {args.concurrency}")
+    for provider, profile in server.profiles.items():
+        print(f"  {provider:<7}{profile.distribution} {profile.latency:g} s (jitter {profile.jitter:g}), "
+              f"errors {profile.errors:g}, throttle {profile.throttle:g}, rpm {profile.rpm or '-'}")
+    rows = [run_policy(policy, args, server) for policy in policies]
+    server.shutdown()
+
+    first = f"{'first p50':>11}" if args.path == "stream" else ""
+    print(f"\n{'policy':<12}{'ok':>6}{'failed':>8}{'req/s':>8}{'p50 s':>8}{'p95 s':>8}{'p99 s':>8}"
+          f"{first}{'upstream':>10}  wins")
+    for row in rows:
+        wins = ", ".join(f"{name} {count}" for name, count in row["wins"].items() if count)
+        first = f"{row['first_p50']:>11.3f}" if args.path == "stream" else ""
+        print(f"{row['policy']:<12}{row['ok']:>6}{row['failed']:>8}{row['throughput']:>8.1f}"
+              f"{row['p50']:>8.3f}{row['p95']:>8.3f}{row['p99']:>8.3f}{first}{row['upstream']:>10}  {wins}")
+    print(f"\nLogs and caches of the run are in {workdir}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""
+Benchmark recent-context retrieval from the event log
+Compares the original whole-file readers of brain/memory.py with the indexed
+event store and its reverse memory-mapped tail reader on logs of several sizes
+
+Usage: python benchmarks/bench_memory_tail.py [sizes]   e.g. 1MB,100MB,1GB
+"""
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from brain.event_store import EventStore
+
+EVENT_TYPES = ["USER_COMMAND", "ACTION", "LLM_QUERY", "SPEECH_OUTPUT", "SYSTEM"]
+WORDS = ["open", "chrome", "screenshot", "weather", "volume", "play", "music", "notepad",
+         "search", "jarvis", "window", "close", "file", "today", "remind", "email"]
+SIZE_UNITS = {"KB": 1024, "MB": 1024 ** 2, "GB": 1024 ** 3}
+
+
+def parse_size(text):
+    """Parse a size such as 100MB into bytes"""
+    text = text.strip().upper()
+    for unit, factor in SIZE_UNITS.items():
+        if text.endswith(unit):
+            return int(float(text[:-len(unit)]) * factor)
+    return int(text)
+
+
+def write_log(path, size):
+    """Write a synthetic log of about size bytes in the jarvis_log.txt format"""
+    rng = random.Random(42)
+    written = 0
+    second = 0
+    with open(path, "w", encoding="utf-8") as f:
+        while written < size:
+            chunk = []
+            for _ in range(1000):
+                stamp = time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime(1700000000 + second))
+                second += 1
+                content = " ".join(rng.choice(WORDS) for _ in range(rng.randint(3, 12)))
+                chunk.append(f"[{stamp}] ({rng.choice(EVENT_TYPES)}) {content}\n")
+            text = "".join(chunk)
+            f.write(text)
+            written += len(text)
+
+
+def legacy_last_n_events(path, n):
+    """get_last_n_events as originally written: read every line"""
+    with open(path, "r", encoding="utf-8") as f:
+        lines = f.readlines()
+    return "".join(lines[-n:])
+
+
+def legacy_events_by_type(path, event_type, limit):
+    """get_events_by_type as originally written: reversed scan of every line"""
+    with open(path, "r", encoding="utf-8") as f:
+        lines = f.readlines()
+    events = []
+    for line in reversed(lines):
+        if f"({event_type})" in line:
+            events.append(line.split(")", 1)[1].strip())
+            if len(events) >= limit:
+                break
+    return events
+
+
+def legacy_search(path, query, limit):
+    """search_memory as originally written: reversed scan of every line"""
+    with open(path, "r", encoding="utf-8") as f:
+        lines = f.readlines()
+    results = []
+    for line in reversed(lines):
+        if query.lower() in line.lower():
+            results.append(line.strip())
+            if len(results) >= limit:
+                break
+    return results
+
+
+def best_time(function, repeat=5):
+    """Best wall-clock time of several calls, in milliseconds"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def run(size):
+    directory = tempfile.mkdtemp(prefix="jarvis_bench_")
+    try:
+        path = os.path.join(directory, "jarvis_log.txt")
+        write_log(path, size)
+        start = time.perf_counter()
+        store = EventStore(path, segment_max_bytes=float("inf"))
+        store.refresh()
+        build = time.perf_counter() - start
+        repeat = 1 if size > 200 * 1024 ** 2 else 5
+
+        print(f"\n{size / 1024 ** 2:.0f} MB log, {len(store.active)} lines "
+              f"(one-time index build {build:.1f} s)")
+        cases = [
+            ("last 10 events", lambda: legacy_last_n_events(path, 10), lambda: store.tail(10)),
+            ("last 10 ACTION events", lambda: legacy_events_by_type(path, "ACTION", 10),
+             lambda: store.by_type("ACTION", 10)),
+            ("search 'chrome'", lambda: legacy_search(path, "chrome", 10),
+             lambda: store.search("chrome", 10)),
+            ("search '12:3' (scan)", lambda: legacy_search(path, "12:3", 10),
+             lambda: store.search("12:3", 10)),
+        ]
+        print(f"{'query':<24}{'original ms':>14}{'store ms':>12}{'speedup':>10}")
+        for name, legacy, current in cases:
+            before = best_time(legacy, repeat)
+            after = best_time(current, repeat)
+            print(f"{name:<24}{before:>14.2f}{after:>12.3f}{before / after:>9.0f}x")
+        store.close()
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    sizes = sys.argv[1] if len(sys.argv) > 1 else "1MB,100MB,1GB"
+    for size in sizes.split(","):
+        run(parse_size(size))
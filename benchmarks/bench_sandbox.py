@@ -0,0 +1,87 @@
+"""
+Benchmark running learned code in sandbox workers against exec in process
+A typical learned snippet (imports, a handler function, a call to it) is run
+with exec the way execute_learned_command used to, then in warm pool
+workers. Then a snippet that never finishes is run in the pool while a
+heartbeat thread stands in for the voice loop: it reports how late its ticks
+were and how long the caller waited before the job was given up on.
+
+Usage: python benchmarks/bench_sandbox.py [runs] [workers]
+"""
+import os
+import sys
+import threading
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from brain.sandbox_pool import SandboxPool
+
+SNIPPET = """
+import os
+import subprocess
+
+def handle_open_notes():
+    path = os.path.join(os.path.expanduser("~"), "notes.txt")
+    return [path, subprocess.list2cmdline(["notepad", path])]
+"""
+
+HUNG = "while True:\n    pass\n"
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+def in_process(code):
+    scope = {}
+    exec(code, scope)
+    scope["handle_open_notes"]()
+
+
+def run(runs, workers):
+    code = compile(SNIPPET, "<learned>", "exec")
+    pool = SandboxPool(size=workers, timeout=5.0, memory_limit_mb=256, preload=("os", "subprocess"))
+    start = time.perf_counter()
+    pool.start()
+    while pool.stats()["workers"] < workers:
+        time.sleep(0.01)
+    warm = time.perf_counter() - start
+
+    print(f"\n{runs} runs of a learned snippet, {workers} warm workers (ready in {warm:.2f} s)")
+    print(f"{'mode':<12}{'p50 ms':>10}{'p99 ms':>10}")
+    timings = {"exec": [], "sandbox": []}
+    for _ in range(runs):
+        start = time.perf_counter()
+        in_process(code)
+        timings["exec"].append(time.perf_counter() - start)
+        start = time.perf_counter()
+        result = pool.run(code, ["handle_open_notes"])
+        timings["sandbox"].append(time.perf_counter() - start)
+        assert result["status"] == "ok", result
+    for mode, values in timings.items():
+        print(f"{mode:<12}{percentile(values, 0.5) * 1000:>10.3f}{percentile(values, 0.99) * 1000:>10.3f}")
+
+    # A hung snippet: the caller gets control back at the timeout, and the
+    # rest of the process keeps running meanwhile
+    lateness = []
+    stop = threading.Event()
+
+    def heartbeat():
+        while not stop.is_set():
+            tick = time.perf_counter()
+            time.sleep(0.01)
+            lateness.append(time.perf_counter() - tick - 0.01)
+
+    thread = threading.Thread(target=heartbeat)
+    thread.start()
+    result = pool.run(compile(HUNG, "<learned>", "exec"), timeout=1.0)
+    stop.set()
+    thread.join()
+    print(f"\nHung snippet: {result['status']} after {result['seconds']:.2f} s, "
+          f"heartbeat late by {max(lateness) * 1000:.1f} ms at most")
+    pool.close()
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 500,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 2)
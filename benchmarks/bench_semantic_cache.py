@@ -0,0 +1,79 @@
+"""
+Benchmark the semantic LLM cache
+Fills brain/semantic_cache.py with synthetic prompts and measures lookup
+latency, rephrased-prompt hits and the time to save and reload the index
+
+Usage: python benchmarks/bench_semantic_cache.py [entries]   e.g. 1000,10000,100000
+"""
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from brain.semantic_cache import SemanticCache, context_key
+
+VERBS = ["open", "close", "play", "search for", "explain", "write code to", "show", "find", "convert", "list"]
+OBJECTS = ["chrome", "notepad", "music", "python decorators", "a zip file", "my downloads folder",
+           "the volume settings", "a fibonacci function", "prime numbers", "a csv parser", "screenshots",
+           "the calculator", "bluetooth devices", "recursion", "sorting algorithms", "a rest api"]
+EXTRAS = ["", "please", "quickly", "for me", "in python", "step by step", "right away", "jarvis"]
+
+
+def make_prompt(rng, i):
+    """A synthetic spoken command, made unique by a numbered object"""
+    return f"{rng.choice(VERBS)} {rng.choice(OBJECTS)} {i} {rng.choice(EXTRAS)}".strip()
+
+
+def rephrase(prompt):
+    """A near-duplicate of a prompt, as speech recognition might produce"""
+    return prompt.replace(" ", "  ").capitalize() + " now?"
+
+
+def run(entries):
+    directory = tempfile.mkdtemp(prefix="jarvis_bench_")
+    try:
+        rng = random.Random(42)
+        cache = SemanticCache(os.path.join(directory, "semantic.npz"), max_entries=entries)
+        cache.loaded = True
+        context = context_key("system", "model")
+        prompts = [make_prompt(rng, i) for i in range(entries)]
+        start = time.perf_counter()
+        for i, prompt in enumerate(prompts):
+            cache.add(prompt, context, f"answer {i}")
+        fill = time.perf_counter() - start
+
+        samples = rng.sample(range(entries), min(entries, 1000))
+        start = time.perf_counter()
+        found = sum(cache.lookup(prompts[i], context) is not None for i in samples)
+        exact = (time.perf_counter() - start) / len(samples)
+        start = time.perf_counter()
+        near = sum(cache.lookup(rephrase(prompts[i]), context) is not None for i in samples)
+        rephrased = (time.perf_counter() - start) / len(samples)
+        start = time.perf_counter()
+        missed = sum(cache.lookup(f"how tall is mount everest {i}", context) is None for i in range(200))
+        unrelated = (time.perf_counter() - start) / 200
+
+        start = time.perf_counter()
+        cache.save()
+        saved = time.perf_counter() - start
+        start = time.perf_counter()
+        reloaded = SemanticCache(cache.path, max_entries=entries)
+        reloaded.load()
+        load = time.perf_counter() - start
+
+        print(f"\n{entries} entries (filled in {fill:.1f} s, {os.path.getsize(cache.path) / 1024 ** 2:.1f} MB on disk)")
+        print(f"{'lookup':<20}{'mean ms':>10}{'hit rate':>10}")
+        print(f"{'same prompt':<20}{exact * 1000:>10.3f}{found / len(samples):>10.0%}")
+        print(f"{'rephrased prompt':<20}{rephrased * 1000:>10.3f}{near / len(samples):>10.0%}")
+        print(f"{'unrelated prompt':<20}{unrelated * 1000:>10.3f}{1 - missed / 200:>10.0%}")
+        print(f"save {saved * 1000:.0f} ms, load {load * 1000:.0f} ms ({len(reloaded)} entries)")
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    sizes = sys.argv[1] if len(sys.argv) > 1 else "1000,10000,100000"
+    for size in sizes.split(","):
+        run(int(size))
@@ -0,0 +1,98 @@
+"""
+Benchmark time to first spoken word for streamed LLM answers
+A local server streams an OpenAI-style server-sent event response at a fixed
+token rate; the answer is spoken either after it is complete (the original
+behaviour) or sentence by sentence as utils.speech.speak_stream does. Speech
+is simulated by sleeping for each word, so no audio device is needed.
+
+Usage: python benchmarks/bench_stream_tts.py [tokens_per_second] [seconds_per_word]
+"""
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from brain import http_pool
+from brain.streaming import iter_sse_data, speak_sentences
+
+ANSWER = ("The capital of France is Paris. It has been the country's capital for most of its history. "
+          "Paris is known for the Eiffel Tower, the Louvre and its cafes. About two million people live "
+          "in the city itself, and more than twelve million in the wider region. Would you like to know more?")
+
+
+def make_handler(tokens_per_second):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):
+            pass
+
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            tokens = [word + " " for word in ANSWER.split(" ")]
+            if not body.get("stream"):
+                time.sleep(len(tokens) / tokens_per_second)
+                payload = json.dumps({"choices": [{"message": {"content": ANSWER}}]}).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            for token in tokens + [None]:
+                if token is None:
+                    data = b"data: [DONE]\n\n"
+                else:
+                    time.sleep(1 / tokens_per_second)
+                    event = {"choices": [{"delta": {"content": token}}]}
+                    data = f"data: {json.dumps(event)}\n\n".encode()
+                self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+                self.wfile.flush()
+            self.wfile.write(b"0\r\n\r\n")
+    return Handler
+
+
+def run(tokens_per_second, seconds_per_word):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(tokens_per_second))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/v1/chat/completions"
+    spoken = []
+
+    def fake_speak(text):
+        spoken.append(time.perf_counter())
+        time.sleep(len(text.split()) * seconds_per_word)
+
+    # Original behaviour: wait for the whole completion, then speak it
+    start = time.perf_counter()
+    response = http_pool.post("bench", url, json={"stream": False})
+    fake_speak(response.json()["choices"][0]["message"]["content"])
+    batch_first, batch_done = spoken[0] - start, time.perf_counter() - start
+
+    def chunks():
+        with http_pool.post("bench", url, json={"stream": True}, stream=True) as streamed:
+            for event in iter_sse_data(streamed):
+                yield event["choices"][0]["delta"]["content"]
+
+    spoken.clear()
+    start = time.perf_counter()
+    text, first_word = speak_sentences(chunks(), fake_speak)
+    stream_done = time.perf_counter() - start
+    server.shutdown()
+
+    print(f"\n{len(ANSWER.split())} words at {tokens_per_second:g} tokens/s, speech {seconds_per_word:g} s/word")
+    print(f"{'mode':<12}{'first word s':>14}{'finished s':>12}")
+    print(f"{'batch':<12}{batch_first:>14.2f}{batch_done:>12.2f}")
+    print(f"{'streamed':<12}{first_word:>14.2f}{stream_done:>12.2f}   ({len(spoken)} sentences)")
+    assert text.strip() == ANSWER.strip()
+
+
+if __name__ == "__main__":
+    rate = float(sys.argv[1]) if len(sys.argv) > 1 else 30
+    word = float(sys.argv[2]) if len(sys.argv) > 2 else 0.3
+    run(rate, word)
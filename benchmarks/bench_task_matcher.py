@@ -0,0 +1,164 @@
+"""
+Benchmark matching reworded commands against learned tasks
+Builds a synthetic knowledge base of learned tasks ("open the quarterly
+budget spreadsheet", ...) with solutions, then asks for them the way speech
+recognition delivers commands: other verbs, fillers, politeness, number
+words, inflections. Commands about things that were never learned must be
+rejected. Reports precision, recall and false accepts of the ranked matcher
+at several thresholds next to the original substring test, and the latency
+of both.
+
+Usage: python benchmarks/bench_task_matcher.py [tasks] [queries]
+"""
+import os
+import random
+import sys
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from brain.task_index import TaskIndex
+from brain.task_matcher import TaskMatcher
+
+# Task verb, then ways a user might say it
+VERBS = {
+    "open": ["open", "launch", "start", "bring up", "pull up", "open up"],
+    "close": ["close", "shut", "quit", "exit", "close down"],
+    "delete": ["delete", "remove", "get rid of", "trash"],
+    "print": ["print", "print out", "send to the printer"],
+    "email": ["email", "send by email", "mail"],
+    "rename": ["rename", "change the name of"],
+    "copy": ["copy", "duplicate", "make a copy of"],
+    "search for": ["search for", "find", "look up", "look for"],
+    "minimize": ["minimize", "hide", "shrink"],
+    "share": ["share", "send a link to"],
+}
+ADJECTIVES = ["quarterly", "weekly", "annual", "personal", "shared", "old", "new", "draft", "final",
+              "budget", "travel", "marketing", "sales", "team", "project", "family", "school", "tax",
+              "meeting", "research", "design", "client", "vendor", "holiday", "training", "backup",
+              "monthly", "daily", "invoice", "payroll", "product", "launch", "support", "legal",
+              "hiring", "music", "photo", "recipe", "fitness", "garden"]
+NOUNS = ["spreadsheet", "report", "presentation", "folder", "notes", "calendar", "playlist", "document",
+         "slides", "checklist", "invoice", "contract", "photos", "album", "budget", "plan", "summary",
+         "agenda", "minutes", "tracker", "dashboard", "template", "letter", "form", "schedule",
+         "roadmap", "proposal", "receipt", "statement", "timeline", "journal", "list", "memo",
+         "newsletter", "brochure", "diagram", "manual", "guide", "portfolio", "archive",
+         "inventory", "ledger", "survey", "backlog", "wiki", "readme", "script", "recording",
+         "video", "podcast", "ebook", "map", "poster", "flyer", "catalog", "resume", "chart",
+         "sheet", "log", "draft", "outline"]
+UNSEEN_NOUNS = ["spaceship", "volcano", "submarine", "dinosaur", "telescope", "lighthouse", "glacier",
+                "pyramid", "cathedral", "rainforest"]
+NUMBER_WORDS = {"1": "one", "2": "two", "3": "three", "4": "four", "5": "five"}
+PREFIXES = ["", "", "please ", "hey jarvis ", "jarvis ", "can you ", "could you please ", "i want to ",
+            "i need you to "]
+SUFFIXES = ["", "", " please", " for me", " now", " right now"]
+
+
+def make_corpus(size, rng):
+    """Unique learned tasks with solutions"""
+    tasks = {}
+    seen = set()
+    verbs = list(VERBS)
+    while len(tasks) < size:
+        verb = rng.choice(verbs)
+        name = f"{rng.choice(ADJECTIVES)} {rng.choice(NOUNS)}"
+        if rng.random() < 0.3:
+            name += f" {rng.randint(1, 5)}"
+        if (verb, name) not in seen:
+            seen.add((verb, name))
+            task = f"{verb} the {name}" if rng.random() < 0.5 else f"{verb} {name}"
+            tasks[task] = {"status": "learned", "solution": (
+                f"To {verb} the {name}, locate it with os.path and use pyautogui:\n"
+                f"```python\nimport pyautogui\npyautogui.hotkey('ctrl', 'o')\n"
+                f"pyautogui.write('{name}')\n```")}
+    return tasks
+
+
+def reword(task, rng):
+    """Say a task the way a user might"""
+    for verb, spoken in VERBS.items():
+        if task.startswith(verb + " "):
+            rest = task[len(verb) + 1:]
+            break
+    rest = rest.replace("the ", "", 1) if rng.random() < 0.5 else rest
+    if rng.random() < 0.5 and not rest.startswith("the "):
+        rest = rng.choice(["the ", "my ", "our "]) + rest
+    words = [NUMBER_WORDS.get(word, word) if rng.random() < 0.6 else word for word in rest.split()]
+    return f"{rng.choice(PREFIXES)}{rng.choice(spoken)} {' '.join(words)}{rng.choice(SUFFIXES)}"
+
+
+def unseen_command(rng):
+    """A command about something never learned"""
+    verb = rng.choice(list(VERBS))
+    return f"{rng.choice(PREFIXES)}{rng.choice(VERBS[verb])} the {rng.choice(ADJECTIVES)} {rng.choice(UNSEEN_NOUNS)}"
+
+
+def substring_match(tasks, command):
+    """The original find_similar_task: first task that contains or is contained in the command"""
+    for known_task in tasks:
+        if known_task in command or command in known_task:
+            return known_task
+    return None
+
+
+def main(size, queries):
+    rng = random.Random(7)
+    corpus = make_corpus(size, rng)
+    tasks = list(corpus)
+    asked = rng.sample(tasks, queries)
+    positives = [(reword(task, rng), task) for task in asked]
+    negatives = [unseen_command(rng) for _ in range(queries)]
+
+    matcher = TaskMatcher(background=False)
+    start = time.perf_counter()
+    matcher.rebuild(corpus)
+    build = time.perf_counter() - start
+
+    # A reload as the knowledge store makes it: the caller only hands over the entries
+    background = TaskMatcher()
+    start = time.perf_counter()
+    background.rebuild(corpus)
+    handover = time.perf_counter() - start
+    # The first search waits for the background build to finish
+    background.search(tasks[0], limit=1)
+
+    start = time.perf_counter()
+    best = [matcher.search(command, limit=1) for command, _ in positives]
+    latency = (time.perf_counter() - start) / len(positives)
+    rejected = [matcher.search(command, limit=1) for command in negatives]
+
+    print(f"\n{size} learned tasks, {queries} reworded commands and {queries} unseen commands")
+    print(f"Matcher build {build:.2f} s ({handover * 1000:.1f} ms in the caller when built in the background), "
+          f"{latency * 1000:.2f} ms per command")
+    print(f"\n{'matcher':<22}{'precision':>10}{'recall':>8}{'false accepts':>15}")
+    for threshold in (0.5, 0.6, 0.7, 0.8, 0.9):
+        accepted = [(match[0][0], task) for match, (_, task) in zip(best, positives)
+                    if match and match[0][1] >= threshold]
+        correct = sum(found == task for found, task in accepted)
+        false = sum(1 for match in rejected if match and match[0][1] >= threshold)
+        print(f"{'threshold ' + format(threshold, 'g'):<22}{correct / max(1, len(accepted)):>10.1%}"
+              f"{correct / len(positives):>8.1%}{false / len(negatives):>15.1%}")
+
+    sample = positives[:min(len(positives), 200)]
+    start = time.perf_counter()
+    found = [substring_match(tasks, command) for command, _ in sample]
+    substring_latency = (time.perf_counter() - start) / len(sample)
+    accepted = [(match, task) for match, (_, task) in zip(found, sample) if match]
+    correct = sum(match == task for match, task in accepted)
+    false = sum(1 for command in negatives[:len(sample)] if substring_match(tasks, command))
+    print(f"{'substring (original)':<22}{correct / max(1, len(accepted)):>10.1%}{correct / len(sample):>8.1%}"
+          f"{false / len(sample):>15.1%}   {substring_latency * 1000:.2f} ms per command")
+
+    index = TaskIndex()
+    index.rebuild(corpus)
+    start = time.perf_counter()
+    found = [index.search(command, limit=1) for command, _ in positives]
+    index_latency = (time.perf_counter() - start) / len(positives)
+    accepted = [(match[0][0], task) for match, (_, task) in zip(found, positives) if match]
+    correct = sum(match == task for match, task in accepted)
+    false = sum(1 for command in negatives if index.search(command, limit=1))
+    print(f"{'substring (indexed)':<22}{correct / max(1, len(accepted)):>10.1%}{correct / len(positives):>8.1%}"
+          f"{false / len(negatives):>15.1%}   {index_latency * 1000:.2f} ms per command")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 50000,
+         int(sys.argv[2]) if len(sys.argv) > 2 else 1000)
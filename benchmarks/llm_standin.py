@@ -0,0 +1,340 @@
+"""
+Offline stand-in for the LLM providers
+Serves the Groq/OpenAI chat completions and the Gemini generateContent APIs,
+plain or streamed, with configurable latency, errors and rate limits, so the
+LLM clients can be exercised and benchmarked without API keys.
+
+Routes:
+    /groq/openai/v1/chat/completions
+    /openai/v1/chat/completions
+    /gemini/v1beta/models/<model>:generateContent
+    /gemini/v1beta/models/<model>:streamGenerateContent?alt=sse
+
+Usage: python benchmarks/llm_standin.py [--port 8400] [--latency 0.5] [--jitter 0.4]
+           [--distribution lognormal] [--errors 0.05] [--throttle 0.02] [--rpm 60]
+           [--provider groq:latency=2,errors=0.2 ...]
+Then start JARVIS with the environment variables it prints.
+"""
+import argparse
+import collections
+import json
+import math
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+PROVIDERS = ("groq", "gemini", "openai")
+DISTRIBUTIONS = ("fixed", "uniform", "lognormal", "exponential")
+
+GEMINI_PATH_RE = re.compile(r"^/gemini/v1beta/models/([^/:]+):(generateContent|streamGenerateContent)$")
+CHAT_PATHS = {"/groq/openai/v1/chat/completions": "groq", "/openai/v1/chat/completions": "openai"}
+
+
+class Profile:
+    """
+    How one stand-in provider behaves
+
+    Args:
+        latency (float): Median seconds before the response (or its first
+            streamed token) is sent
+        jitter (float): Spread of the latency; the fraction either side of it
+            for "uniform", the log-space standard deviation for "lognormal"
+        distribution (str): "fixed", "uniform", "lognormal" or "exponential"
+        errors (float): Fraction of requests answered with a 500
+        throttle (float): Fraction of requests answered with a 429
+        rpm (int): Requests per minute before every request gets a 429, 0 for no limit
+        retry_after (float): Retry-After of random 429 responses
+        tokens_per_second (float): Rate of streamed tokens
+    """
+
+    def __init__(self, latency=0.5, jitter=0.4, distribution="lognormal", errors=0.0, throttle=0.0,
+                 rpm=0, retry_after=1.0, tokens_per_second=50.0):
+        if distribution not in DISTRIBUTIONS:
+            raise ValueError(f"Unknown latency distribution: {distribution}")
+        self.latency = float(latency)
+        self.jitter = float(jitter)
+        self.distribution = distribution
+        self.errors = float(errors)
+        self.throttle = float(throttle)
+        self.rpm = int(rpm)
+        self.retry_after = float(retry_after)
+        self.tokens_per_second = float(tokens_per_second)
+
+    def sample_latency(self, rng):
+        """Draw one response latency in seconds"""
+        if self.distribution == "uniform":
+            return max(0.0, self.latency * rng.uniform(1 - self.jitter, 1 + self.jitter))
+        if self.distribution == "lognormal":
+            return self.latency * math.exp(rng.gauss(0.0, self.jitter))
+        if self.distribution == "exponential":
+            return rng.expovariate(1 / self.latency) if self.latency > 0 else 0.0
+        return self.latency
+
+    def updated(self, **changes):
+        """Copy of the profile with some settings changed"""
+        settings = dict(vars(self))
+        settings.update(changes)
+        return Profile(**settings)
+
+
+def parse_profile_override(text, base):
+    """
+    Parse a "provider:key=value,..." override such as "groq:latency=2,errors=0.2"
+
+    Returns:
+        tuple: Provider name and the base profile with the overrides applied
+    """
+    provider, _, settings = text.partition(":")
+    if provider not in PROVIDERS:
+        raise ValueError(f"Unknown provider {provider!r}, expected one of {', '.join(PROVIDERS)}")
+    changes = {}
+    for item in filter(None, settings.split(",")):
+        key, _, value = item.partition("=")
+        key = key.strip().replace("-", "_")
+        changes[key] = value if key == "distribution" else float(value)
+    return provider, base.updated(**changes)
+
+
+def answer_text(provider, prompt):
+    """Deterministic multi-sentence answer, so streamed speech has sentences to split"""
+    words = len(prompt.split())
+    return (f"This is the {provider} stand-in answering your request. "
+            f"Your prompt had {words} words. "
+            "Configure a real provider to get a real answer.")
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def _send_json(self, status, payload, headers=None):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_events(self, events, delay):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        for index, event in enumerate(events):
+            if index:
+                time.sleep(delay)
+            data = b"data: " + (event if isinstance(event, bytes) else json.dumps(event).encode()) + b"\n\n"
+            self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+            self.wfile.flush()
+        self.wfile.write(b"0\r\n\r\n")
+
+    def do_POST(self):
+        path, _, _ = self.path.partition("?")
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        gemini = GEMINI_PATH_RE.match(path)
+        if gemini:
+            provider = "gemini"
+            stream = gemini.group(2) == "streamGenerateContent"
+            prompt = " ".join(part.get("text", "") for content in body.get("contents", [])
+                              for part in content.get("parts", []))
+        elif path in CHAT_PATHS:
+            provider = CHAT_PATHS[path]
+            stream = bool(body.get("stream"))
+            prompt = " ".join(message.get("content", "") for message in body.get("messages", []))
+        else:
+            self._send_json(404, {"error": {"message": f"No stand-in route for {path}"}})
+            return
+
+        server = self.server
+        profile = server.profiles[provider]
+        status, latency, retry_after = server.admit(provider, profile)
+        if status == 429:
+            self._send_json(429, {"error": {"message": "Rate limit reached (stand-in)", "code": 429}},
+                            {"Retry-After": f"{retry_after:g}"})
+            return
+        time.sleep(latency)
+        if status == 500:
+            self._send_json(500, {"error": {"message": "Internal error (stand-in)", "code": 500}})
+            return
+
+        text = answer_text(provider, prompt)
+        if not stream:
+            if provider == "gemini":
+                payload = {"candidates": [{"content": {"parts": [{"text": text}], "role": "model"}}]}
+            else:
+                payload = {"choices": [{"index": 0, "message": {"role": "assistant", "content": text}}]}
+            self._send_json(200, payload)
+            return
+
+        tokens = [word + " " for word in text.split(" ")]
+        if provider == "gemini":
+            events = [{"candidates": [{"content": {"parts": [{"text": token}], "role": "model"}}]}
+                      for token in tokens]
+        else:
+            events = [{"choices": [{"index": 0, "delta": {"content": token}}]} for token in tokens]
+            events.append(b"[DONE]")
+        self._send_events(events, 1 / profile.tokens_per_second)
+
+
+class StandinServer(ThreadingHTTPServer):
+    """
+    Stand-in providers on one local port
+
+    Args:
+        address (tuple): (host, port) to listen on; port 0 picks a free one
+        profiles (dict): Provider name to Profile; missing providers use Profile()
+        seed (int): Seed of the latency and error draws
+    """
+    daemon_threads = True
+
+    def __init__(self, address, profiles=None, seed=None):
+        super().__init__(address, Handler)
+        self.profiles = {provider: Profile() for provider in PROVIDERS}
+        self.profiles.update(profiles or {})
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._recent = {provider: collections.deque() for provider in PROVIDERS}
+        self.reset_stats()
+
+    def admit(self, provider, profile):
+        """
+        Decide the outcome of one request
+
+        Returns:
+            tuple: (status, latency, retry_after) with status 200, 429 or 500
+        """
+        now = time.monotonic()
+        with self._lock:
+            stats = self._stats[provider]
+            stats["requests"] += 1
+            recent = self._recent[provider]
+            while recent and recent[0] <= now - 60:
+                recent.popleft()
+            if profile.rpm and len(recent) >= profile.rpm:
+                stats["429"] += 1
+                return 429, 0.0, math.ceil(recent[0] + 60 - now)
+            recent.append(now)
+            if self._rng.random() < profile.throttle:
+                stats["429"] += 1
+                return 429, 0.0, profile.retry_after
+            latency = profile.sample_latency(self._rng)
+            status = 500 if self._rng.random() < profile.errors else 200
+            stats[str(status)] += 1
+            return status, latency, 0.0
+
+    def reset_stats(self):
+        """Zero the request counters"""
+        with self._lock:
+            self._stats = {provider: {"requests": 0, "200": 0, "429": 0, "500": 0} for provider in PROVIDERS}
+
+    def stats(self):
+        """
+        Get the request counters
+
+        Returns:
+            dict: Per provider the requests received and how many got a 200, 429 or 500
+        """
+        with self._lock:
+            return {provider: dict(stats) for provider, stats in self._stats.items()}
+
+    def environment(self):
+        """
+        Environment variables pointing JARVIS at this server
+
+        Returns:
+            dict: Base URLs of every provider and placeholder API keys
+        """
+        host, port = self.server_address[:2]
+        root = f"http://{host}:{port}"
+        return {
+            "GROQ_BASE_URL": f"{root}/groq/openai/v1",
+            "GEMINI_BASE_URL": f"{root}/gemini/v1beta",
+            "OPENAI_BASE_URL": f"{root}/openai/v1",
+            "GROQ_API_KEY": "standin",
+            "GEMINI_API_KEY": "standin",
+            "OPENAI_API_KEY": "standin",
+        }
+
+
+def start_server(profiles=None, host="127.0.0.1", port=0, seed=None):
+    """
+    Start a stand-in server in a background thread
+
+    Args:
+        profiles (dict): Provider name to Profile
+        host (str): Interface to listen on
+        port (int): Port, 0 for any free one
+        seed (int): Seed of the latency and error draws
+
+    Returns:
+        StandinServer: The running server; call shutdown() to stop it
+    """
+    server = StandinServer((host, port), profiles, seed)
+    threading.Thread(target=server.serve_forever, name="llm-standin", daemon=True).start()
+    return server
+
+
+def add_profile_arguments(parser):
+    """Add the options describing the stand-in providers to an argument parser"""
+    parser.add_argument("--latency", type=float, default=0.5, help="median response latency in seconds")
+    parser.add_argument("--jitter", type=float, default=0.4, help="latency spread")
+    parser.add_argument("--distribution", choices=DISTRIBUTIONS, default="lognormal")
+    parser.add_argument("--errors", type=float, default=0.0, help="fraction of 500 responses")
+    parser.add_argument("--throttle", type=float, default=0.0, help="fraction of random 429 responses")
+    parser.add_argument("--rpm", type=int, default=0, help="requests per minute before 429s, 0 for none")
+    parser.add_argument("--tokens-per-second", type=float, default=50.0, help="streaming rate")
+    parser.add_argument("--provider", action="append", default=[], metavar="NAME:KEY=VALUE,...",
+                        help="override settings of one provider, e.g. groq:latency=2,errors=0.2")
+
+
+def profiles_from_arguments(args, defaults=None):
+    """
+    Build the provider profiles from parsed add_profile_arguments options
+
+    Args:
+        args (argparse.Namespace): Parsed options
+        defaults (dict): Provider profiles the --provider overrides apply to
+            instead of the common options
+
+    Returns:
+        dict: Provider name to Profile
+    """
+    base = Profile(latency=args.latency, jitter=args.jitter, distribution=args.distribution,
+                   errors=args.errors, throttle=args.throttle, rpm=args.rpm,
+                   tokens_per_second=args.tokens_per_second)
+    profiles = dict(defaults) if defaults else {provider: base for provider in PROVIDERS}
+    for override in args.provider:
+        name = override.partition(":")[0]
+        provider, profile = parse_profile_override(override, profiles.get(name, base))
+        profiles[provider] = profile
+    return profiles
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8400)
+    parser.add_argument("--seed", type=int, default=None)
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+
+    server = StandinServer((args.host, args.port), profiles_from_arguments(args), args.seed)
+    print(f"LLM stand-in listening on http://{args.host}:{server.server_address[1]}")
+    for provider, profile in server.profiles.items():
+        print(f"  {provider:<7}{profile.distribution} {profile.latency:g} s (jitter {profile.jitter:g}), "
+              f"errors {profile.errors:g}, throttle {profile.throttle:g}, rpm {profile.rpm or '-'}")
+    print("\nPoint JARVIS at it with:")
+    for name, value in server.environment().items():
+        print(f"  export {name}={value}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
@@ -0,0 +1,177 @@
+"""
+Non-blocking HTTP for the LLM providers
+Requests go through one shared aiohttp connection pool per provider and event
+loop, with the same timeouts and retry-with-backoff as brain/http_pool.py.
+aiohttp is in requirements.txt; where it is missing anyway, requests fall
+back to the pooled blocking sessions, run in worker threads so the event
+loop is never blocked. A background event loop lets
+synchronous code run coroutines and keep the pools alive between calls.
+"""
+import asyncio
+import json
+import os
+import sys
+import threading
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from brain import http_pool
+from brain.http_pool import RETRY_STATUSES
+from config import (LLM_CONNECT_TIMEOUT, LLM_READ_TIMEOUT, LLM_MAX_RETRIES, LLM_RETRY_BACKOFF,
+                    LLM_ASYNC_CONCURRENCY)
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+# Sessions of each event loop, keyed by provider; aiohttp sessions are bound
+# to the loop they were created on
+_sessions = weakref.WeakKeyDictionary()
+_stats = {}
+_stats_lock = threading.Lock()
+
+# Blocking requests of the fallback path; the event loop's default executor
+# has only a handful of threads on small machines, which would cap the
+# requests in flight below LLM_ASYNC_CONCURRENCY
+_executor = ThreadPoolExecutor(max_workers=32, thread_name_prefix="jarvis-llm-http")
+
+_loop = None
+_loop_thread = None
+_loop_lock = threading.Lock()
+
+
+class AsyncResponse:
+    """Completed response with the parts of requests.Response the providers use"""
+
+    def __init__(self, status_code, text, headers):
+        self.status_code = status_code
+        self.text = text
+        self.headers = headers
+
+    def json(self):
+        return json.loads(self.text)
+
+
+def _get_session(provider):
+    sessions = _sessions.setdefault(asyncio.get_running_loop(), {})
+    session = sessions.get(provider)
+    if session is None or session.closed:
+        timeout = aiohttp.ClientTimeout(sock_connect=LLM_CONNECT_TIMEOUT, sock_read=LLM_READ_TIMEOUT)
+        connector = aiohttp.TCPConnector(limit=LLM_ASYNC_CONCURRENCY)
+        session = sessions[provider] = aiohttp.ClientSession(timeout=timeout, connector=connector)
+    return session
+
+
+def _count(provider, **changes):
+    with _stats_lock:
+        stats = _stats.setdefault(provider, {"requests": 0, "retries": 0, "errors": 0})
+        for key, value in changes.items():
+            stats[key] += value
+
+
+def _retry_delay(response, attempt):
+    """Seconds to wait before retrying, honouring Retry-After"""
+    try:
+        return float(response.headers.get("Retry-After"))
+    except (AttributeError, TypeError, ValueError):
+        return LLM_RETRY_BACKOFF * 2 ** attempt
+
+
+async def post(provider, url, **kwargs):
+    """
+    POST without blocking the event loop
+
+    Args:
+        provider (str): Provider name such as "groq"
+        url (str): Endpoint URL
+        **kwargs: headers and json of the request
+
+    Returns:
+        AsyncResponse: The final response after any retries (a
+            requests.Response when aiohttp is not installed)
+    """
+    if aiohttp is None:
+        return await asyncio.get_running_loop().run_in_executor(
+            _executor, lambda: http_pool.post(provider, url, **kwargs))
+
+    session = _get_session(provider)
+    for attempt in range(LLM_MAX_RETRIES + 1):
+        try:
+            async with session.post(url, **kwargs) as raw:
+                response = AsyncResponse(raw.status, await raw.text(), raw.headers)
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            if attempt == LLM_MAX_RETRIES:
+                _count(provider, requests=1, errors=1)
+                raise
+            _count(provider, retries=1)
+            await asyncio.sleep(LLM_RETRY_BACKOFF * 2 ** attempt)
+            continue
+        if response.status_code not in RETRY_STATUSES or attempt == LLM_MAX_RETRIES:
+            break
+        _count(provider, retries=1)
+        await asyncio.sleep(_retry_delay(response, attempt))
+    _count(provider, requests=1)
+    return response
+
+
+def connection_stats():
+    """
+    Get per-provider request counters of the async clients
+
+    Returns:
+        dict: For each provider the number of requests, retries and failed
+            requests (the blocking pools' counters when aiohttp is missing)
+    """
+    if aiohttp is None:
+        return http_pool.connection_stats()
+    with _stats_lock:
+        return {provider: dict(stats) for provider, stats in _stats.items()}
+
+
+async def close_sessions():
+    """
+    Close the sessions of the running event loop
+
+    Await this before closing an event loop of your own that sent LLM
+    requests; the background loop's sessions are closed by shutdown().
+    """
+    for session in _sessions.pop(asyncio.get_running_loop(), {}).values():
+        await session.close()
+
+
+def _background_loop():
+    global _loop, _loop_thread
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            _loop_thread = threading.Thread(target=_loop.run_forever, name="jarvis-llm-loop", daemon=True)
+            _loop_thread.start()
+        return _loop
+
+
+def run_sync(coroutine):
+    """
+    Run a coroutine on the background event loop and wait for its result
+
+    Args:
+        coroutine: Coroutine to run
+
+    Returns:
+        The coroutine's result
+    """
+    loop = _background_loop()
+    if threading.current_thread() is _loop_thread:
+        coroutine.close()
+        raise RuntimeError("run_sync called from the background event loop; await the coroutine instead")
+    return asyncio.run_coroutine_threadsafe(coroutine, loop).result()
+
+
+def shutdown():
+    """Close the background loop's sessions and stop it"""
+    global _loop
+    with _loop_lock:
+        loop, _loop = _loop, None
+    if loop is not None:
+        asyncio.run_coroutine_threadsafe(close_sessions(), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
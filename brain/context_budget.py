@@ -0,0 +1,151 @@
+"""
+Token-budgeted "Recent history" for LLM prompts
+Picks the useful events from the end of the log, drops duplicates and echoes,
+truncates long payloads and keeps the newest events that fit a token budget
+"""
+import datetime
+import re
+import threading
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import (LLM_CONTEXT_TOKEN_BUDGET, LLM_CONTEXT_MAX_EVENTS, LLM_CONTEXT_MAX_EVENT_CHARS,
+                    LLM_CONTEXT_EVENT_TYPES)
+
+# Roughly one token per short word, per four characters of a longer word and
+# per punctuation mark, which is close to what BPE tokenizers produce for
+# English text and code
+TOKEN_RE = re.compile(r"\w{1,4}|[^\w\s]")
+
+EVENT_RE = re.compile(r"\[(\d{4}-\d{2}-\d{2}) (\d{2}:\d{2}:\d{2})\] \((\w+)\) ?(.*)")
+WHITESPACE_RE = re.compile(r"\s+")
+
+# Words by which a prompt points back at the conversation; with
+# LLM_CACHE_SELF_CONTAINED, prompts without them are answered without the
+# recent history (and may then be cached)
+HISTORY_RE = re.compile(
+    r"\b(it|its|that|this|these|those|them|they|he|she|him|her|his|again|previous(ly)?|last|"
+    r"earlier|before|above|same|more|another|else|continue|remember|said|say|told|asked|we|us|our)\b",
+    re.IGNORECASE)
+
+_totals = {"requests": 0, "raw_tokens": 0, "context_tokens": 0}
+_totals_lock = threading.Lock()
+
+
+def estimate_tokens(text):
+    """
+    Estimate how many tokens a text takes, without a tokenizer
+
+    Args:
+        text (str): Text to measure
+
+    Returns:
+        int: Approximate token count
+    """
+    return len(TOKEN_RE.findall(text))
+
+
+def parse_events(lines):
+    """
+    Group log lines into events
+
+    Args:
+        lines (list): Log lines, oldest first
+
+    Returns:
+        list: (date, time, event type, content) tuples, oldest first;
+            continuation lines are joined onto their event's content
+    """
+    events = []
+    for line in lines:
+        match = EVENT_RE.match(line)
+        if match:
+            events.append(list(match.groups()))
+        elif events and line.strip():
+            events[-1][3] += " " + line.strip()
+    return [tuple(event) for event in events]
+
+
+def refers_to_history(prompt):
+    """
+    Check whether a prompt may need the recent history to be understood
+
+    Args:
+        prompt (str): Prompt as spoken or typed
+
+    Returns:
+        bool: True if it refers back to the conversation ("do it again",
+            "what did I say"), False for a self-contained prompt
+    """
+    return bool(HISTORY_RE.search(prompt))
+
+
+def _normalize(text):
+    return WHITESPACE_RE.sub(" ", text).strip().lower()
+
+
+def build_context(lines, budget=LLM_CONTEXT_TOKEN_BUDGET, max_events=LLM_CONTEXT_MAX_EVENTS,
+                  max_chars=LLM_CONTEXT_MAX_EVENT_CHARS, event_types=LLM_CONTEXT_EVENT_TYPES, exclude=None):
+    """
+    Build a compact "Recent history" block from the end of the log
+
+    Args:
+        lines (list): Recent log lines, oldest first
+        budget (int): Most tokens the block may take
+        max_events (int): Most events to include
+        max_chars (int): Longer event contents are truncated to this
+        event_types (list): Event types worth including
+        exclude (str): Content to leave out, normally the prompt being
+            answered, which was just logged as a command and a query
+
+    Returns:
+        tuple: The block (oldest event first) and a report dict with the
+            token estimates of the raw last max_events lines and of the block
+    """
+    events = parse_events(lines)
+    today = datetime.date.today().isoformat()
+    seen = {_normalize(exclude)} if exclude else set()
+    kept = []
+    used = 0
+    for day, clock, event_type, content in reversed(events):
+        if len(kept) >= max_events:
+            break
+        key = _normalize(content)
+        if event_type not in event_types or not key or key in seen:
+            continue
+        seen.add(key)
+        content = WHITESPACE_RE.sub(" ", content).strip()
+        if len(content) > max_chars:
+            content = content[:max_chars].rstrip() + "..."
+        stamp = clock if day == today else f"{day} {clock}"
+        line = f"[{stamp}] ({event_type}) {content}"
+        cost = estimate_tokens(line) + 1
+        if used + cost > budget:
+            break
+        kept.append(line)
+        used += cost
+
+    context = "\n".join(reversed(kept))
+    raw_tokens = estimate_tokens("".join(lines[-max_events:])) if max_events > 0 else 0
+    report = {"raw_tokens": raw_tokens, "context_tokens": estimate_tokens(context),
+              "events": len(kept)}
+    report["reduction"] = 1 - report["context_tokens"] / raw_tokens if raw_tokens else 0.0
+    with _totals_lock:
+        _totals["requests"] += 1
+        _totals["raw_tokens"] += report["raw_tokens"]
+        _totals["context_tokens"] += report["context_tokens"]
+    return context, report
+
+
+def context_stats():
+    """
+    Get the prompt-size savings of every context built in this process
+
+    Returns:
+        dict: Requests, total estimated tokens of the raw and the budgeted
+            history, and the overall reduction
+    """
+    with _totals_lock:
+        stats = dict(_totals)
+    stats["reduction"] = 1 - stats["context_tokens"] / stats["raw_tokens"] if stats["raw_tokens"] else 0.0
+    return stats
@@ -0,0 +1,1120 @@
+"""
+Indexed append-only event store for the JARVIS memory system
+Keeps the familiar "[timestamp] (TYPE) content" log text and maintains small
+sidecar index files so readers can seek straight to the lines they need
+"""
+import bisect
+import collections
+import datetime
+import functools
+import itertools
+import mmap
+import os
+import re
+import struct
+import threading
+import zlib
+from array import array
+
+from brain.log_compression import (COMPRESSION_SUFFIXES, compress_file, is_compressed, open_segment,
+                                   resolve_compression)
+from brain.rollups import DayCounter, RollupArchive, day_key, empty_rollup, merge_rollups
+from brain.text_index import TermIndex, index_terms, tokenize
+
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+EPOCH = datetime.datetime(1970, 1, 1)
+
+# One .idx entry per log line: byte offset of the line and its timestamp in
+# seconds since EPOCH (naive local time, exactly as written in the log).
+# Continuation lines of a multi-line event inherit the timestamp of the
+# header line that started the event.
+ENTRY = struct.Struct("<qq")
+
+# One .typ byte per log line: 0 for continuation lines, otherwise a hash of
+# the event type. Different types may share an id, so callers confirm the
+# type against the line text before trusting a match.
+NO_TYPE = 0
+
+HEADER_RE = re.compile(rb"\[(\d{4}-\d{2}-\d{2}) (\d{2}):(\d{2}):(\d{2})\] \(([^)\r\n]*)\)")
+
+# Length of the "[YYYY-MM-DD HH:MM:SS]" prefix; the search index skips it
+STAMP_PREFIX = 21
+
+# How much text or index data to pull from disk per read while scanning
+READ_CHUNK = 1024 * 1024
+ENTRY_BLOCK = 4096
+
+# The active segment's search index and day rollups are saved after this many
+# new lines (and when the store is closed); lines indexed after the last save
+# are re-read from the log on the next start
+SIDECAR_SAVE_EVERY = 10000
+
+# Every CHECKPOINT_INTERVAL-th line's timestamp is kept in memory so time
+# range lookups can binary search to a block of the index instead of walking it
+CHECKPOINT_INTERVAL = 256
+
+# Sealed segment file names carry the timestamps of their first and last
+# lines, e.g. jarvis_log.000003.20250528T122215-20250529T080102.txt.gz
+SEGMENT_RANGE_FORMAT = "%Y%m%dT%H%M%S"
+
+# Search candidates read per pass over a compressed segment; every pass
+# decompresses the segment up to the furthest line it needs
+COMPRESSED_READ_BATCH = 256
+
+
+@functools.lru_cache(maxsize=1024)
+def type_id(event_type):
+    """
+    Map an event type name to its one-byte index id
+
+    Args:
+        event_type (str): Event type such as USER_COMMAND
+
+    Returns:
+        int: Id between 1 and 254
+    """
+    return zlib.crc32(event_type.encode("utf-8")) % 254 + 1
+
+
+def to_stamp(moment):
+    """
+    Convert a naive datetime to the integer timestamp used by the index
+
+    Args:
+        moment (datetime.datetime): Time to convert
+
+    Returns:
+        int: Seconds since EPOCH
+    """
+    return int((moment - EPOCH).total_seconds())
+
+
+def from_stamp(stamp):
+    """
+    Convert an index timestamp back to a naive datetime
+
+    Args:
+        stamp (int): Seconds since EPOCH
+
+    Returns:
+        datetime.datetime: The corresponding local time
+    """
+    return EPOCH + datetime.timedelta(seconds=stamp)
+
+
+@functools.lru_cache(maxsize=4096)
+def _day_stamp(day):
+    """Timestamp of midnight for a b"YYYY-MM-DD" date (raises ValueError if invalid)"""
+    return to_stamp(datetime.datetime.strptime(day.decode("ascii"), "%Y-%m-%d"))
+
+
+def parse_header(line):
+    """
+    Parse the "[timestamp] (TYPE)" header of a raw log line
+
+    Args:
+        line (bytes): Raw line as stored on disk
+
+    Returns:
+        tuple: (stamp, event_type) or None for continuation/invalid lines
+    """
+    match = HEADER_RE.match(line)
+    if not match:
+        return None
+    day, hour, minute, second, event_type = match.groups()
+    hour, minute, second = int(hour), int(minute), int(second)
+    if hour > 23 or minute > 59 or second > 59:
+        return None
+    try:
+        stamp = _day_stamp(day) + hour * 3600 + minute * 60 + second
+    except ValueError:
+        return None
+    return stamp, event_type.decode("utf-8", "replace")
+
+
+def decode_line(raw):
+    """Decode a raw log line, normalising Windows line endings"""
+    text = raw.decode("utf-8", "replace")
+    if text.endswith("\r\n"):
+        text = text[:-2] + "\n"
+    return text
+
+
+def line_type(line):
+    """
+    Get the event type from the header of a decoded log line
+
+    Args:
+        line (str): Log line
+
+    Returns:
+        str: Event type or None if the line has no header
+    """
+    header = parse_header(line.encode("utf-8"))
+    return header[1] if header else None
+
+
+class Segment:
+    """
+    A log text file together with its .idx, .typ, .inv and .days sidecar files
+
+    Sealed segments may be compressed. Their text is then only read as a
+    forward stream and their search index is loaded by the first search.
+
+    Args:
+        path (str): Text file of the segment
+        number (int): Sequence number of a sealed segment (0 for the active one)
+        time_range (tuple): (first, last) timestamps taken from a sealed
+            segment's file name, None if unknown
+    """
+
+    def __init__(self, path, number=0, time_range=None):
+        self.number = number
+        self.time_range = time_range
+        self.types = bytearray()
+        self.checkpoints = array("q")
+        self.terms = TermIndex(path + ".inv")
+        self.days = DayCounter(path + ".days")
+        self._set_path(path)
+        self.end = 0
+        self.last_stamp = -1
+        self.loaded = False
+        self.terms_loaded = False
+
+    def __len__(self):
+        return len(self.types)
+
+    def _set_path(self, path):
+        self.path = path
+        self.index_path = path + ".idx"
+        self.types_path = path + ".typ"
+        self.terms.path = path + ".inv"
+        self.days.path = path + ".days"
+        self.compressed = is_compressed(path)
+
+    def sidecar_paths(self):
+        """Paths of the .idx, .typ, .inv and .days files"""
+        return [self.index_path, self.types_path, self.terms.path, self.days.path]
+
+    def move(self, path):
+        """
+        Follow the segment text to a new path, renaming the sidecar files
+
+        Args:
+            path (str): Where the caller already placed the text
+        """
+        sources = self.sidecar_paths()
+        self._set_path(path)
+        for source, target in zip(sources, self.sidecar_paths()):
+            if os.path.exists(source):
+                os.replace(source, target)
+
+    def disk_size(self):
+        """Bytes used by the text and its sidecar files"""
+        total = 0
+        for path in [self.path] + self.sidecar_paths():
+            try:
+                total += os.path.getsize(path)
+            except OSError:
+                pass
+        return total
+
+    def remove(self):
+        """Delete the text and its sidecar files"""
+        for path in [self.path] + self.sidecar_paths():
+            if os.path.exists(path):
+                os.remove(path)
+
+    def load(self):
+        """
+        Load the sidecar index and bring it up to date with the text
+
+        An index that no longer matches its text (truncated or replaced log)
+        is thrown away and rebuilt. Compressed text never changes after it
+        was sealed, so the sidecars written with it are trusted as they are.
+        """
+        self.types = bytearray()
+        self.end = 0
+        self.last_stamp = -1
+        try:
+            with open(self.types_path, "rb") as f:
+                types = f.read()
+            count = min(len(types), os.path.getsize(self.index_path) // ENTRY.size)
+        except OSError:
+            types, count = b"", 0
+
+        if count and self.compressed:
+            self.types = bytearray(types[:count])
+            # The text length is unknown without decompressing; reads of the
+            # last line simply run to the end of the stream
+            self.end = None
+            self.last_stamp = self.read_entries(count - 1, count)[0][1]
+        elif count:
+            offset, stamp = self.read_entries(count - 1, count)[0]
+            raw = self._read_raw_line(offset)
+            header = parse_header(raw)
+            expected = type_id(header[1]) if header else NO_TYPE
+            if raw.endswith(b"\n") and expected == types[count - 1]:
+                self.types = bytearray(types[:count])
+                self.end = offset + len(raw)
+                self.last_stamp = stamp
+
+        self._truncate_sidecars()
+        self._load_checkpoints()
+        lazy_terms = self.compressed and self.end is None
+        days_covered = self.days.load(len(self.types))
+        terms_covered = len(self.types) if lazy_terms else self.terms.load(len(self.types))
+        self._reindex(terms_covered, days_covered)
+        self.terms_loaded = not lazy_terms
+        self.loaded = True
+        self.catch_up()
+
+    def _reindex(self, terms_covered, days_covered):
+        """Feed the lines the saved search index or day rollups are missing"""
+        for line_no, line, stamp in self.iter_lines(min(terms_covered, days_covered)):
+            header = self.types[line_no] != NO_TYPE
+            if line_no >= terms_covered:
+                self.terms.add(line_no, line[STAMP_PREFIX:] if header else line)
+            if line_no >= days_covered:
+                self.days.add(line_no, stamp, line_type(line) if header else None,
+                              line.encode("utf-8"))
+
+    def search_index(self):
+        """
+        Get the segment's inverted index, loading it on first use
+
+        Returns:
+            TermIndex: Word postings of this segment
+        """
+        if not self.terms_loaded:
+            self._reindex(self.terms.load(len(self.types)), len(self.types))
+            self.terms_loaded = True
+        return self.terms
+
+    def _load_checkpoints(self):
+        """Rebuild the in-memory checkpoints with a strided pass over the .idx file"""
+        self.checkpoints = array("q")
+        stride = CHECKPOINT_INTERVAL * ENTRY.size
+        with open(self.index_path, "rb") as f:
+            while True:
+                data = f.read(stride * ENTRY_BLOCK)
+                if not data:
+                    break
+                for position in range(0, len(data), stride):
+                    self.checkpoints.append(ENTRY.unpack_from(data, position)[1])
+
+    def ensure_loaded(self):
+        if not self.loaded:
+            self.load()
+
+    def _truncate_sidecars(self):
+        count = len(self.types)
+        for path, size in ((self.index_path, count * ENTRY.size), (self.types_path, count)):
+            with open(path, "ab") as f:
+                f.truncate(size)
+
+    def _read_raw_line(self, offset):
+        try:
+            with open_segment(self.path) as f:
+                f.seek(offset)
+                return f.readline()
+        except OSError:
+            return b""
+
+    def catch_up(self):
+        """
+        Index complete lines appended to the text since the last call
+
+        Returns:
+            int: Number of newly indexed lines
+        """
+        if self.compressed:
+            # Sealed text never grows; it is only read here to rebuild its index
+            if self.end is None:
+                return 0
+        else:
+            try:
+                size = os.path.getsize(self.path)
+            except OSError:
+                size = 0
+            if size < self.end:
+                # The log was truncated or replaced underneath us
+                self.types = bytearray()
+                self.checkpoints = array("q")
+                self.terms.reset()
+                self.days.reset()
+                self.end = 0
+                self.last_stamp = -1
+                self._truncate_sidecars()
+            if size == self.end:
+                return 0
+
+        added = 0
+        with open_segment(self.path) as text, \
+                open(self.index_path, "ab") as index, \
+                open(self.types_path, "ab") as types:
+            text.seek(self.end)
+            pending = b""
+            while True:
+                chunk = text.read(READ_CHUNK)
+                if not chunk:
+                    break
+                data = pending + chunk
+                cut = data.rfind(b"\n") + 1
+                pending = data[cut:]
+                if not cut:
+                    continue
+
+                entries = bytearray()
+                new_types = bytearray()
+                offset = self.end
+                line_no = len(self.types)
+                for raw in data[:cut].split(b"\n")[:-1]:
+                    header = parse_header(raw)
+                    if header:
+                        self.last_stamp = header[0]
+                        new_types.append(type_id(header[1]))
+                        searchable = raw[STAMP_PREFIX:]
+                    else:
+                        new_types.append(NO_TYPE)
+                        searchable = raw
+                    self.days.add(line_no, self.last_stamp, header[1] if header else None, raw)
+                    entries += ENTRY.pack(offset, self.last_stamp)
+                    if line_no % CHECKPOINT_INTERVAL == 0:
+                        self.checkpoints.append(self.last_stamp)
+                    self.terms.add(line_no, searchable.decode("utf-8", "replace"))
+                    line_no += 1
+                    offset += len(raw) + 1
+
+                index.write(entries)
+                types.write(new_types)
+                self.types += new_types
+                self.end = offset
+                added += len(new_types)
+
+        if max(self.terms.unsaved, self.days.unsaved) >= SIDECAR_SAVE_EVERY:
+            self.save_sidecars()
+        return added
+
+    def save_sidecars(self, force=False):
+        """
+        Persist the search index and day rollups if they have unsaved lines
+
+        Args:
+            force (bool): Save even if nothing changed since the last save
+        """
+        for sidecar in (self.terms, self.days):
+            if sidecar.unsaved or force:
+                try:
+                    sidecar.save()
+                except OSError as e:
+                    print(f"Error saving {sidecar.path}: {e}")
+
+    def read_entries(self, start, stop):
+        """
+        Read raw index entries
+
+        Args:
+            start (int): First line number
+            stop (int): Line number to stop before
+
+        Returns:
+            list: (offset, stamp) tuples
+        """
+        if stop <= start:
+            return []
+        with open(self.index_path, "rb") as f:
+            f.seek(start * ENTRY.size)
+            data = f.read((stop - start) * ENTRY.size)
+        return list(ENTRY.iter_unpack(data))
+
+    def offset_of(self, line_no):
+        """Byte offset where a line starts (the text end for line_no == len, None if unknown)"""
+        if line_no >= len(self.types):
+            return self.end
+        return self.read_entries(line_no, line_no + 1)[0][0]
+
+    def read_range(self, start, stop):
+        """
+        Read a contiguous run of lines
+
+        Args:
+            start (int): First line number
+            stop (int): Line number to stop before
+
+        Returns:
+            list: Decoded lines, each ending with a newline
+        """
+        stop = min(stop, len(self.types))
+        if stop <= start:
+            return []
+        begin = self.offset_of(start)
+        finish = self.offset_of(stop)
+        with open_segment(self.path) as f:
+            f.seek(begin)
+            data = f.read(-1 if finish is None else finish - begin)
+        return [decode_line(raw + b"\n") for raw in data.split(b"\n")[:-1]]
+
+    def read_lines(self, line_numbers):
+        """
+        Read scattered lines in one pass over the text
+
+        Args:
+            line_numbers (list): Line numbers in ascending order
+
+        Returns:
+            list: Decoded lines in the same order
+        """
+        if not line_numbers:
+            return []
+        lines = []
+        with open_segment(self.path) as text, open(self.index_path, "rb") as index:
+            for line_no in line_numbers:
+                index.seek(line_no * ENTRY.size)
+                text.seek(ENTRY.unpack(index.read(ENTRY.size))[0])
+                lines.append(decode_line(text.readline()))
+        return lines
+
+    def read_line(self, line_no):
+        """Read a single line by its number"""
+        lines = self.read_lines([line_no])
+        return lines[0] if lines else ""
+
+    def iter_lines(self, start=0):
+        """
+        Stream the lines from a given line number to the end of the segment
+
+        Args:
+            start (int): First line number
+
+        Yields:
+            tuple: (line number, decoded line, timestamp)
+        """
+        count = len(self.types)
+        if start >= count:
+            return
+        with open_segment(self.path) as text:
+            text.seek(self.offset_of(start))
+            for block in range(start, count, ENTRY_BLOCK):
+                entries = self.read_entries(block, min(block + ENTRY_BLOCK, count))
+                for line_no, (_, stamp) in enumerate(entries, block):
+                    yield line_no, decode_line(text.readline()), stamp
+
+    def find_first_at_or_after(self, stamp):
+        """
+        Find the first line whose timestamp is at or after a given stamp
+
+        Binary searches the checkpoints, then scans the single index block
+        between two checkpoints, so the cost is O(log n) plus one block read.
+
+        Args:
+            stamp (int): Timestamp to look for
+
+        Returns:
+            int: Line number (len(self) if every line is older)
+        """
+        count = len(self.types)
+        if not count or self.last_stamp < stamp:
+            return count
+        position = bisect.bisect_left(self.checkpoints, stamp)
+        if position == 0:
+            return 0
+        start = (position - 1) * CHECKPOINT_INTERVAL + 1
+        stop = min(position * CHECKPOINT_INTERVAL, count)
+        for number, (_, entry_stamp) in enumerate(self.read_entries(start, stop), start):
+            if entry_stamp >= stamp:
+                return number
+        return stop
+
+    def iter_lines_reverse(self):
+        """
+        Walk an uncompressed segment backwards from its end through a memory map
+
+        Nothing before the last line the caller consumes is touched, so the
+        cost depends on how far back the caller reads, not on the log size.
+
+        Yields:
+            tuple: (line number, decoded line), newest first
+        """
+        line_no = len(self.types)
+        if not line_no:
+            return
+        with open(self.path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as view:
+            stop = self.end
+            while line_no > 0:
+                start = view.rfind(b"\n", 0, stop - 1) + 1
+                line_no -= 1
+                yield line_no, decode_line(view[start:stop])
+                stop = start
+
+
+class EventStore:
+    """
+    Append-only event log split into segments
+
+    The active segment is the log file itself. Once it grows past
+    segment_max_bytes, or its oldest event is segment_max_age seconds old, it
+    is sealed into the log_segments directory next to it, keeping its index,
+    and a fresh active file is started. Sealed segments carry their time
+    range in their file name, so queries skip the ones outside their window
+    without opening them. A background thread compresses sealed segments and
+    deletes the oldest ones once they fall outside the retention limits.
+
+    A log written before the store managed it (no index sidecars yet) is
+    adopted rather than sealed for its age: its age counts from the moment
+    it was adopted, kept in a ".adopted" file next to it, so upgrading never
+    seals old history at once and hands it straight to retention.
+
+    Args:
+        log_file (str): Path of the active log
+        segment_max_bytes (int): Size that triggers sealing
+        segment_max_age (int): Age in seconds that triggers sealing (0 disables)
+        compression (str): "none", "gzip" or "zstd" for sealed segments
+        retention_age (int): Delete sealed segments whose newest event is
+            older than this many seconds (0 keeps them)
+        retention_max_bytes (int): Delete the oldest sealed segments while
+            they use more disk than this (0 for no limit)
+    """
+
+    def __init__(self, log_file, segment_max_bytes=64 * 1024 * 1024, segment_max_age=0,
+                 compression="none", retention_age=0, retention_max_bytes=0):
+        self.log_file = log_file
+        directory = os.path.dirname(log_file) or "."
+        self.segment_dir = os.path.join(directory, "log_segments")
+        self.segment_max_bytes = segment_max_bytes
+        self.segment_max_age = segment_max_age
+        self.compression = resolve_compression(compression)
+        self.retention_age = retention_age
+        self.retention_max_bytes = retention_max_bytes
+        self.lock = threading.RLock()
+        self.active = Segment(log_file)
+        self.adopted_path = log_file + ".adopted"
+        self._adopted = None
+        self.sealed = []
+        self._handle = None
+        self._listing_mtime = None
+        self._maintenance = None
+        self._maintenance_pending = False
+        self.archive = RollupArchive(os.path.splitext(log_file)[0] + "_rollups.json")
+        base, ext = os.path.splitext(os.path.basename(log_file))
+        self._name_pattern = re.compile(
+            re.escape(base) + r"\.(\d+)(?:\.(\d{8}T\d{6})-(\d{8}T\d{6}))?" + re.escape(ext)
+            + "(" + "|".join(re.escape(suffix) for suffix in COMPRESSION_SUFFIXES.values()) + ")?$")
+        with self.lock:
+            self._discover_sealed()
+            if self.sealed:
+                self._start_maintenance()
+
+    def exists(self):
+        """Check whether the active log file exists"""
+        return os.path.exists(self.log_file)
+
+    def create(self):
+        """Create an empty active log file if there is none"""
+        os.makedirs(os.path.dirname(self.log_file) or ".", exist_ok=True)
+        with open(self.log_file, "a", encoding="utf-8"):
+            pass
+
+    def _segment_name(self, number, time_range, suffix=""):
+        base, ext = os.path.splitext(os.path.basename(self.log_file))
+        span = ""
+        if time_range is not None:
+            first, last = (from_stamp(stamp).strftime(SEGMENT_RANGE_FORMAT) for stamp in time_range)
+            span = f".{first}-{last}"
+        return f"{base}.{number:06d}{span}{ext}{suffix}"
+
+    def _discover_sealed(self):
+        try:
+            self._listing_mtime = os.stat(self.segment_dir).st_mtime_ns
+            names = os.listdir(self.segment_dir)
+        except OSError:
+            self._listing_mtime, names = None, []
+        known = {segment.path: segment for segment in self.sealed}
+        found = {}
+        for name in names:
+            match = self._name_pattern.match(name)
+            if not match:
+                continue
+            number = int(match.group(1))
+            path = os.path.join(self.segment_dir, name)
+            # While a segment is being compressed both copies exist; the one
+            # holding the sidecars wins, the plain text on a tie
+            rank = (os.path.exists(path + ".idx"), not is_compressed(path))
+            if number in found and found[number][0] >= rank:
+                continue
+            time_range = None
+            if match.group(2):
+                time_range = tuple(to_stamp(datetime.datetime.strptime(text, SEGMENT_RANGE_FORMAT))
+                                   for text in match.group(2, 3))
+            found[number] = (rank, known.get(path) or Segment(path, number, time_range))
+        self.sealed = [found[number][1] for number in sorted(found)]
+
+    def _seal(self):
+        self._close_handle()
+        os.makedirs(self.segment_dir, exist_ok=True)
+        number = self.sealed[-1].number + 1 if self.sealed else 1
+        time_range = (self.active.checkpoints[0], self.active.last_stamp)
+        target = os.path.join(self.segment_dir, self._segment_name(number, time_range))
+        for source, suffix in ((self.active.path, ""), (self.active.index_path, ".idx"),
+                               (self.active.types_path, ".typ")):
+            os.replace(source, target + suffix)
+
+        sealed = Segment(target, number, time_range)
+        sealed.types, sealed.end, sealed.last_stamp = self.active.types, self.active.end, self.active.last_stamp
+        sealed.checkpoints = self.active.checkpoints
+        sealed.terms, sealed.days = self.active.terms, self.active.days
+        sealed.terms.path = target + ".inv"
+        sealed.days.path = target + ".days"
+        sealed.save_sidecars(force=True)
+        for suffix in (".inv", ".days", ".adopted"):
+            if os.path.exists(self.log_file + suffix):
+                os.remove(self.log_file + suffix)
+        self._adopted = None
+        sealed.loaded = sealed.terms_loaded = True
+        self.sealed.append(sealed)
+
+        self.active = Segment(self.log_file)
+        open(self.log_file, "a", encoding="utf-8").close()
+        self.active.load()
+        self._start_maintenance()
+
+    def _should_seal(self):
+        if self.active.end > self.segment_max_bytes:
+            return True
+        if not self.segment_max_age or not len(self.active):
+            return False
+        started = self.active.checkpoints[0]
+        if self._adopted is not None:
+            started = max(started, self._adopted)
+        return started <= to_stamp(datetime.datetime.now()) - self.segment_max_age
+
+    def _load_active(self):
+        """Load the active segment, adopting a log that was never indexed"""
+        unindexed = not os.path.exists(self.active.index_path) and os.path.exists(self.log_file)
+        self.active.load()
+        self._adopted = None
+        if unindexed and len(self.active):
+            self._adopted = to_stamp(datetime.datetime.now())
+            try:
+                with open(self.adopted_path, "w", encoding="utf-8") as f:
+                    f.write(str(self._adopted))
+            except OSError as e:
+                print(f"Error recording adopted log: {e}")
+            return
+        try:
+            with open(self.adopted_path, "r", encoding="utf-8") as f:
+                self._adopted = int(f.read().strip())
+        except (OSError, ValueError):
+            pass
+
+    def refresh(self):
+        """Index lines written since the last call, by this or another process"""
+        with self.lock:
+            if not self.active.loaded:
+                self._load_active()
+            before = self.active.end
+            self.active.catch_up()
+            try:
+                listing_mtime = os.stat(self.segment_dir).st_mtime_ns
+            except OSError:
+                listing_mtime = None
+            if self.active.end < before or listing_mtime != self._listing_mtime:
+                # Another process sealed, compressed or deleted segments
+                self._discover_sealed()
+            if self._should_seal():
+                try:
+                    self._seal()
+                except OSError as e:
+                    # Typically another process holds the file open on Windows;
+                    # sealing is retried on the next refresh
+                    print(f"Error sealing log segment: {e}")
+
+    def _start_maintenance(self):
+        """Compress and expire sealed segments on a background thread"""
+        if self.compression == "none" and not (self.retention_age or self.retention_max_bytes):
+            return
+        with self.lock:
+            if self._maintenance is not None:
+                self._maintenance_pending = True
+                return
+            self._maintenance = threading.Thread(target=self._maintain, name="jarvis-log-maintenance",
+                                                 daemon=True)
+            self._maintenance.start()
+
+    def _maintain(self):
+        while True:
+            try:
+                if self.compression != "none":
+                    with self.lock:
+                        pending = [segment for segment in self.sealed if not segment.compressed]
+                    for segment in pending:
+                        self._compress(segment)
+                self._apply_retention()
+            except Exception as e:
+                print(f"Error maintaining log segments: {e}")
+            with self.lock:
+                if not self._maintenance_pending:
+                    self._maintenance = None
+                    return
+                self._maintenance_pending = False
+
+    def _compress(self, segment):
+        """
+        Replace a sealed segment's text with a compressed copy
+
+        The copy is written without holding the lock since sealed text never
+        changes; only the final swap blocks readers.
+        """
+        source = segment.path
+        with self.lock:
+            if segment not in self.sealed or segment.compressed:
+                return
+            segment.ensure_loaded()
+            segment.save_sidecars()
+            time_range = segment.time_range
+            if time_range is None and len(segment):
+                time_range = (segment.checkpoints[0], segment.last_stamp)
+            suffix = COMPRESSION_SUFFIXES[self.compression]
+            target = os.path.join(self.segment_dir, self._segment_name(segment.number, time_range, suffix))
+        temp_path = target + ".tmp"
+        try:
+            compress_file(source, temp_path, self.compression)
+            with self.lock:
+                if segment not in self.sealed or segment.path != source:
+                    os.remove(temp_path)
+                    return
+                os.replace(temp_path, target)
+                segment.move(target)
+                segment.time_range = time_range
+                os.remove(source)
+        except OSError as e:
+            print(f"Error compressing log segment {source}: {e}")
+
+    def _apply_retention(self):
+        """Delete the oldest sealed segments that are past the retention limits"""
+        if not (self.retention_age or self.retention_max_bytes):
+            return
+        with self.lock:
+            oldest_kept = to_stamp(datetime.datetime.now()) - self.retention_age
+            total = sum(segment.disk_size() for segment in self.sealed)
+            while self.sealed:
+                oldest = self.sealed[0]
+                oldest.ensure_loaded()
+                newest_stamp = oldest.time_range[1] if oldest.time_range else oldest.last_stamp
+                expired = self.retention_age and newest_stamp < oldest_kept
+                if not expired and not (self.retention_max_bytes and total > self.retention_max_bytes):
+                    break
+                # Archive the days this segment holds so their summaries survive it
+                self.day_rollups(sorted(oldest.days.days))
+                size = oldest.disk_size()
+                oldest.remove()
+                if oldest in self.sealed:
+                    self.sealed.remove(oldest)
+                total -= size
+
+    def _open_handle(self):
+        """Get the append handle for the active log, reopening it if the file moved"""
+        if self._handle is not None:
+            try:
+                current = os.stat(self.log_file)
+                if os.path.samestat(current, os.fstat(self._handle.fileno())):
+                    return self._handle
+            except OSError:
+                pass
+            self._close_handle()
+        os.makedirs(os.path.dirname(self.log_file) or ".", exist_ok=True)
+        self._handle = open(self.log_file, "a", encoding="utf-8")
+        return self._handle
+
+    def _close_handle(self):
+        if self._handle is not None:
+            try:
+                self._handle.close()
+            except OSError as e:
+                print(f"Error closing log file: {e}")
+            self._handle = None
+
+    def append(self, text, durability="flush"):
+        """
+        Append already formatted log text and index it
+
+        Args:
+            text (str): One or more complete log lines
+            durability (str): "none" leaves the text in the write buffer,
+                "flush" hands it to the OS, "fsync" also forces it to disk
+        """
+        with self.lock:
+            handle = self._open_handle()
+            handle.write(text)
+            if durability != "none":
+                handle.flush()
+            if durability == "fsync":
+                os.fsync(handle.fileno())
+            self.refresh()
+
+    def sync(self, fsync=False):
+        """
+        Push buffered writes to the OS so readers in any process can see them
+
+        Args:
+            fsync (bool): Also force the written text to disk
+        """
+        with self.lock:
+            if self._handle is not None:
+                self._handle.flush()
+                if fsync:
+                    os.fsync(self._handle.fileno())
+
+    def close(self):
+        """Flush and close the append handle and save the search indexes"""
+        with self.lock:
+            self._close_handle()
+            for segment in [self.active] + self.sealed:
+                if segment.loaded:
+                    segment.save_sidecars()
+
+    def segments(self, start_stamp=None, end_stamp=None):
+        """
+        Segments overlapping a time window, newest first, with their indexes loaded
+
+        Sealed segments outside the window are skipped by the time range in
+        their file name, without being opened.
+
+        Args:
+            start_stamp (int): Inclusive lower bound, None for no bound
+            end_stamp (int): Exclusive upper bound, None for no bound
+
+        Yields:
+            Segment: The active segment followed by the sealed ones
+        """
+        yield self.active
+        for segment in reversed(self.sealed):
+            if segment.time_range is not None:
+                first, last = segment.time_range
+                if start_stamp is not None and last < start_stamp:
+                    break
+                if end_stamp is not None and first >= end_stamp:
+                    continue
+            segment.ensure_loaded()
+            yield segment
+
+    def tail(self, n):
+        """
+        Get the last n lines of the log
+
+        Args:
+            n (int): Number of lines
+
+        Returns:
+            list: Decoded lines, oldest first
+        """
+        with self.lock:
+            self.refresh()
+            lines = []
+            for segment in self.segments():
+                need = n - len(lines)
+                if need <= 0:
+                    break
+                if segment.compressed:
+                    lines[0:0] = segment.read_range(max(0, len(segment) - need), len(segment))
+                else:
+                    recent = [line for _, line in itertools.islice(segment.iter_lines_reverse(), need)]
+                    lines[0:0] = recent[::-1]
+            return lines
+
+    def by_type(self, event_type, limit):
+        """
+        Get the most recent lines of a given event type
+
+        Args:
+            event_type (str): Event type to match
+            limit (int): Maximum number of lines
+
+        Returns:
+            list: Decoded lines, newest first
+        """
+        needle = bytes([type_id(event_type)])
+        matches = []
+        with self.lock:
+            self.refresh()
+            for segment in self.segments():
+                position = len(segment)
+                while len(matches) < limit and position > 0:
+                    # Read as many lines as are still wanted in one pass
+                    batch = []
+                    while len(batch) < limit - len(matches):
+                        position = segment.types.rfind(needle, 0, position)
+                        if position < 0:
+                            break
+                        batch.append(position)
+                    for line in reversed(segment.read_lines(batch[::-1])):
+                        if line_type(line) == event_type:
+                            matches.append(line)
+                if len(matches) >= limit:
+                    break
+        return matches
+
+    def between(self, start_stamp=None, end_stamp=None, event_type=None):
+        """
+        Get header lines with start_stamp <= timestamp < end_stamp
+
+        Only segments overlapping the window are touched, and inside each one
+        the bounds are found through the timestamp checkpoints.
+
+        Args:
+            start_stamp (int): Inclusive lower bound, None for no bound
+            end_stamp (int): Exclusive upper bound, None for no bound
+            event_type (str): Only return events of this type
+
+        Returns:
+            list: Decoded event header lines, oldest first
+        """
+        wanted = type_id(event_type) if event_type else None
+        chunks = []
+        with self.lock:
+            self.refresh()
+            for segment in self.segments(start_stamp, end_stamp):
+                if not len(segment):
+                    continue
+                if start_stamp is not None and segment.last_stamp < start_stamp:
+                    break
+                if end_stamp is not None and segment.checkpoints[0] >= end_stamp:
+                    continue
+                first = 0 if start_stamp is None else segment.find_first_at_or_after(start_stamp)
+                stop = len(segment) if end_stamp is None else segment.find_first_at_or_after(end_stamp)
+                if first >= stop:
+                    continue
+                selected = []
+                for number, line in zip(range(first, stop), segment.read_range(first, stop)):
+                    line_id = segment.types[number]
+                    if line_id == NO_TYPE or (wanted is not None and line_id != wanted):
+                        continue
+                    if wanted is None or line_type(line) == event_type:
+                        selected.append(line)
+                chunks.append(selected)
+        return [line for chunk in reversed(chunks) for line in chunk]
+
+    def day_rollups(self, keys):
+        """
+        Get per-day event counters and examples
+
+        Days before today come from the immutable archive; days not archived
+        yet are merged from the counters of the segments holding them and
+        archived once they are over.
+
+        Args:
+            keys (list): Dates as YYYY-MM-DD
+
+        Returns:
+            dict: Day records keyed by date
+        """
+        records = {}
+        missing = []
+        for key in keys:
+            record = self.archive.get(key)
+            if record is None:
+                missing.append(key)
+            else:
+                records[key] = record
+        if not missing:
+            return records
+
+        earliest = to_stamp(datetime.datetime.strptime(min(missing), "%Y-%m-%d"))
+        latest = to_stamp(datetime.datetime.strptime(max(missing), "%Y-%m-%d")) + 86400
+        parts = {key: [] for key in missing}
+        with self.lock:
+            self.refresh()
+            for segment in self.segments(earliest, latest):
+                if len(segment) and segment.last_stamp < earliest:
+                    break
+                for key in missing:
+                    if key in segment.days.days:
+                        parts[key].insert(0, segment.days.days[key])
+
+        today = day_key(to_stamp(datetime.datetime.now()))
+        finished = {}
+        for key in missing:
+            records[key] = merge_rollups(parts[key]) if parts[key] else empty_rollup()
+            if key < today:
+                finished[key] = records[key]
+        if finished:
+            try:
+                self.archive.freeze(finished)
+            except OSError as e:
+                print(f"Error archiving day rollups: {e}")
+        return records
+
+    def search(self, query, limit, event_type=None, all_terms=False):
+        """
+        Find the most recent lines matching a query (case-insensitive)
+
+        Candidate lines come from each segment's inverted index and are then
+        checked against the text, so results match a plain substring scan.
+        Queries without any indexed words (e.g. only digits or punctuation)
+        fall back to scanning.
+
+        Args:
+            query (str): Text to look for
+            limit (int): Maximum number of lines
+            event_type (str): Only match events of this type
+            all_terms (bool): Match lines containing every word of the query
+                in any order instead of the query as one string
+
+        Returns:
+            list: Decoded lines, newest first
+        """
+        needle = query.lower()
+        terms = tokenize(query)
+        lookup_terms = index_terms(query)
+        wanted = type_id(event_type) if event_type else None
+
+        def accept(line):
+            lowered = line.lower()
+            if all_terms and terms:
+                found = all(term in lowered for term in terms)
+            else:
+                found = needle in lowered
+            return found and (wanted is None or line_type(line) == event_type)
+
+        matches = []
+        with self.lock:
+            self.refresh()
+            for segment in self.segments():
+                if lookup_terms:
+                    candidates = segment.search_index().candidates(lookup_terms)
+                    if wanted is not None:
+                        candidates = (line_no for line_no in candidates if segment.types[line_no] == wanted)
+                    while True:
+                        # Each batch is one pass over the text, which matters
+                        # when a compressed segment has to be decompressed
+                        size = limit - len(matches)
+                        if segment.compressed:
+                            size = max(size, COMPRESSED_READ_BATCH)
+                        batch = list(itertools.islice(candidates, size))
+                        if not batch:
+                            break
+                        for line in reversed(segment.read_lines(batch[::-1])):
+                            if accept(line):
+                                matches.append(line)
+                                if len(matches) >= limit:
+                                    return matches
+                    continue
+                if segment.compressed:
+                    # Compressed text only streams forwards, so keep the
+                    # newest matches seen while reading it front to back
+                    recent = collections.deque(maxlen=limit - len(matches))
+                    for line_no, line, _ in segment.iter_lines():
+                        if (wanted is None or segment.types[line_no] == wanted) and accept(line):
+                            recent.append(line)
+                    matches.extend(reversed(recent))
+                    if len(matches) >= limit:
+                        return matches
+                    continue
+                for line_no, line in segment.iter_lines_reverse():
+                    if wanted is not None and segment.types[line_no] != wanted:
+                        continue
+                    if accept(line):
+                        matches.append(line)
+                        if len(matches) >= limit:
+                            return matches
+        return matches
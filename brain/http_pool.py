@@ -0,0 +1,120 @@
+"""
+Pooled HTTP sessions for the LLM providers
+Each provider gets its own keep-alive requests.Session with connect/read
+timeouts and retry-with-backoff on rate limits and server errors
+"""
+import os
+import sys
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import LLM_CONNECT_TIMEOUT, LLM_READ_TIMEOUT, LLM_MAX_RETRIES, LLM_RETRY_BACKOFF, LLM_POOL_SIZE
+
+# Responses worth retrying: rate limited or a transient server failure
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+_sessions = {}
+_stats = {}
+_lock = threading.Lock()
+
+
+def _new_session():
+    """Create a session whose connections are kept alive and retried with backoff"""
+    retry = Retry(total=LLM_MAX_RETRIES,
+                  backoff_factor=LLM_RETRY_BACKOFF,
+                  status_forcelist=RETRY_STATUSES,
+                  # The provider calls are POSTs, which urllib3 does not retry by default
+                  allowed_methods=None,
+                  respect_retry_after_header=True,
+                  raise_on_status=False)
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=LLM_POOL_SIZE, max_retries=retry)
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def get_session(provider):
+    """
+    Get the pooled session of a provider
+
+    Args:
+        provider (str): Provider name such as "groq"
+
+    Returns:
+        requests.Session: Session shared by every request to that provider
+    """
+    with _lock:
+        session = _sessions.get(provider)
+        if session is None:
+            session = _sessions[provider] = _new_session()
+            _stats[provider] = {"requests": 0, "retries": 0, "errors": 0}
+        return session
+
+
+def post(provider, url, timeout=None, **kwargs):
+    """
+    POST through a provider's pooled session
+
+    Args:
+        provider (str): Provider name such as "groq"
+        url (str): Endpoint URL
+        timeout (tuple): (connect, read) seconds, defaults to the configured timeouts
+        **kwargs: Passed on to requests (headers, json, stream, ...)
+
+    Returns:
+        requests.Response: The final response after any retries
+    """
+    session = get_session(provider)
+    if timeout is None:
+        timeout = (LLM_CONNECT_TIMEOUT, LLM_READ_TIMEOUT)
+    try:
+        response = session.post(url, timeout=timeout, **kwargs)
+    except requests.RequestException:
+        with _lock:
+            _stats[provider]["requests"] += 1
+            _stats[provider]["errors"] += 1
+        raise
+    retries = getattr(response.raw, "retries", None)
+    with _lock:
+        _stats[provider]["requests"] += 1
+        if retries is not None:
+            _stats[provider]["retries"] += len(retries.history)
+    return response
+
+
+def connection_stats():
+    """
+    Get per-provider request and connection reuse counters
+
+    Returns:
+        dict: For each provider the number of requests, retries and failed
+            requests, plus the HTTP requests sent, connections opened and
+            the resulting reuse ratio from the connection pools
+    """
+    stats = {}
+    with _lock:
+        for provider, session in _sessions.items():
+            sent = opened = 0
+            for adapter in set(session.adapters.values()):
+                pools = adapter.poolmanager.pools
+                for key in pools.keys():
+                    pool = pools[key]
+                    sent += pool.num_requests
+                    opened += pool.num_connections
+            stats[provider] = dict(_stats[provider],
+                                   http_requests=sent,
+                                   connections_opened=opened,
+                                   reuse_ratio=(sent - opened) / sent if sent else 0.0)
+    return stats
+
+
+def close_sessions():
+    """Close every pooled connection"""
+    with _lock:
+        for session in _sessions.values():
+            session.close()
+        _sessions.clear()
+        _stats.clear()
@@ -0,0 +1,190 @@
+"""
+In-memory knowledge base with write-behind persistence
+data/knowledge.json is parsed once and served from memory; edits made by
+other programs are picked up by its modification time, and changes are
+written back by a background thread that coalesces rapid updates into one
+atomic replace of the file. Indexes over the tasks are kept in step with
+every change and reload.
+"""
+import json
+import os
+import threading
+
+
+class KnowledgeStore:
+    """
+    Process-wide view of the knowledge file
+
+    Hold `lock` around a get and the set that depends on it to make the
+    update atomic; every method takes it too.
+
+    Args:
+        path (str): Path of the knowledge JSON file
+        write_delay (float): Seconds a change waits for others to join its write
+        indexes (list): Objects with add(task, entry) and rebuild(entries)
+            methods, told about every change and reload
+    """
+
+    def __init__(self, path, write_delay=1.0, indexes=()):
+        self.path = path
+        self.write_delay = write_delay
+        self.indexes = list(indexes)
+        self.lock = threading.RLock()
+        self._condition = threading.Condition(self.lock)
+        self._data = None
+        # (mtime, size) of the file as last loaded or written
+        self._signature = None
+        # Changes not written yet, re-applied if the file is reloaded meanwhile
+        self._pending = {}
+        self._closed = False
+        self._thread = None
+        self._stats = {"reads": 0, "loads": 0, "changes": 0, "writes": 0}
+
+    def _file_signature(self):
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def _current(self):
+        """The data, reloaded first if the file changed on disk"""
+        signature = self._file_signature()
+        if self._data is None or signature != self._signature:
+            data = {}
+            if signature is not None:
+                try:
+                    with open(self.path, "r", encoding="utf-8") as f:
+                        data = json.load(f)
+                except (OSError, json.JSONDecodeError) as e:
+                    print(f"Error loading knowledge file: {e}")
+                    # Keep serving what we had rather than an empty knowledge base
+                    data = self._data if self._data is not None else {}
+            self._data = data if isinstance(data, dict) else {}
+            self._data.update(self._pending)
+            self._signature = signature
+            self._stats["loads"] += 1
+            for index in self.indexes:
+                index.rebuild(self._data)
+        return self._data
+
+    def refresh(self):
+        """Reload the file if it changed, so the indexes are current"""
+        with self.lock:
+            self._current()
+
+    def get(self, task):
+        """
+        Get a task's entry
+
+        Args:
+            task (str): The task
+
+        Returns:
+            dict: A copy of the entry, or None if the task is unknown
+        """
+        with self.lock:
+            self._stats["reads"] += 1
+            entry = self._current().get(task)
+            return dict(entry) if isinstance(entry, dict) else None
+
+    def tasks(self):
+        """
+        Get every known task
+
+        Returns:
+            list: Task names, in the order they were added
+        """
+        with self.lock:
+            self._stats["reads"] += 1
+            return list(self._current())
+
+    def set(self, task, entry):
+        """
+        Add or replace a task's entry; it is written to disk shortly after
+
+        Args:
+            task (str): The task
+            entry (dict): Its status, timestamps, attempts and solution
+        """
+        self.set_many({task: entry})
+
+    def set_many(self, entries):
+        """
+        Add or replace several entries in one update
+
+        Args:
+            entries (dict): Task to entry
+        """
+        if not entries:
+            return
+        with self.lock:
+            data = self._current()
+            for task, entry in entries.items():
+                data[task] = self._pending[task] = dict(entry)
+                for index in self.indexes:
+                    index.add(task, data[task])
+            self._stats["changes"] += len(entries)
+            if self._thread is None and not self._closed:
+                self._thread = threading.Thread(target=self._run, name="jarvis-knowledge-writer", daemon=True)
+                self._thread.start()
+            elif self._closed:
+                self._write()
+            self._condition.notify_all()
+
+    def flush(self):
+        """Write pending changes now"""
+        with self.lock:
+            self._write()
+
+    def close(self):
+        """Write pending changes and stop the writer thread"""
+        with self.lock:
+            self._closed = True
+            self._condition.notify_all()
+            thread = self._thread
+        if thread is not None:
+            thread.join(5.0)
+        self.flush()
+
+    def stats(self):
+        """
+        Get the store's counters
+
+        Returns:
+            dict: Reads served, file loads, entries changed, file writes and
+                changes still waiting to be written
+        """
+        with self.lock:
+            return dict(self._stats, pending=len(self._pending))
+
+    def _run(self):
+        with self._condition:
+            while True:
+                self._condition.wait_for(lambda: self._pending or self._closed)
+                if self._closed:
+                    return
+                # Let a burst of updates settle into a single write
+                self._condition.wait_for(lambda: self._closed, timeout=self.write_delay)
+                self._write()
+
+    def _write(self):
+        """Replace the file with the current data (lock held)"""
+        if not self._pending:
+            return
+        # Pick up external edits first, so they are not overwritten
+        data = self._current()
+        temp_path = self.path + ".tmp"
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f, indent=4)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, self.path)
+        except OSError as e:
+            print(f"Error saving knowledge file: {e}")
+            return
+        self._signature = self._file_signature()
+        self._pending.clear()
+        self._stats["writes"] += 1
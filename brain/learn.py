@@ -7,12 +7,45 @@ import os
 import sys
 import datetime
 import re
+import atexit
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from brain.knowledge_store import KnowledgeStore
+from brain.learning_queue import LearningQueue
+from brain.sandbox_pool import SandboxPool
+from brain.solution_plans import SolutionPlanCache
+from brain.task_index import TaskIndex
+from brain.task_matcher import TaskMatcher
 from brain.llm import query_llm
+from config import (LEARN_IN_BACKGROUND, LEARN_BATCH_SIZE, LEARN_BATCH_DELAY, KNOWLEDGE_WRITE_DELAY,
+                    LEARN_MATCH_THRESHOLD, SOLUTION_PLAN_CACHE_SIZE, LEARNED_CODE_SANDBOX,
+                    SANDBOX_WORKERS, SANDBOX_TIMEOUT, SANDBOX_MEMORY_LIMIT_MB)
 
 # Path to knowledge database
 KNOWLEDGE_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "knowledge.json")
 
+# The knowledge base, read from memory and written back in the background;
+# its lock makes read-modify-write updates atomic between the interactive
+# path and the background learner
+TASK_INDEX = TaskIndex()
+TASK_MATCHER = TaskMatcher()
+KNOWLEDGE = KnowledgeStore(KNOWLEDGE_PATH, write_delay=KNOWLEDGE_WRITE_DELAY, indexes=[TASK_INDEX, TASK_MATCHER])
+atexit.register(KNOWLEDGE.close)
+
+# Parsed and compiled solutions, so repeat executions skip parsing
+SOLUTION_PLANS = SolutionPlanCache(SOLUTION_PLAN_CACHE_SIZE)
+
+# Worker processes that run learned code; None runs it in this process
+SANDBOX = (SandboxPool(SANDBOX_WORKERS, SANDBOX_TIMEOUT, SANDBOX_MEMORY_LIMIT_MB)
+           if LEARNED_CODE_SANDBOX else None)
+if SANDBOX is not None:
+    atexit.register(SANDBOX.close)
+
+LEARN_SYSTEM_MESSAGE = (
+    "You are the learning module of JARVIS, an AI assistant that automates a desktop with Python. "
+    "For each numbered command, give concise step-by-step instructions on how to implement code that "
+    "handles it, with any Python code in ```python blocks. Reply only with a JSON object that maps each "
+    "command's number to its instructions as a string, with no other text.")
+
 def ensure_knowledge_file():
     """
     Ensure the knowledge JSON file exists
@@ -34,6 +67,9 @@ def save_unknown(task, status="unknown"):
     """
     Save an unknown task to the knowledge database
     
+    Unknown tasks are also queued for background learning when
+    LEARN_IN_BACKGROUND is set.
+    
     Args:
         task (str): The unknown task
         status (str): Status of task (unknown, learning, learned)
@@ -41,8 +77,6 @@ def save_unknown(task, status="unknown"):
     Returns:
         bool: True if successful, False otherwise
     """
-    ensure_knowledge_file()
-    
     # Log this learning action
     try:
         from brain.memory import log_event
@@ -51,29 +85,25 @@ def save_unknown(task, status="unknown"):
         pass
     
     try:
-        with open(KNOWLEDGE_PATH, 'r+') as f:
-            try:
-                data = json.load(f)
-            except json.JSONDecodeError:
-                data = {}
-            
-            if task not in data:
-                data[task] = {
+        with KNOWLEDGE.lock:
+            entry = KNOWLEDGE.get(task)
+            if entry is None:
+                entry = {
                     "status": status,
                     "timestamp": str(datetime.datetime.now()),
                     "attempts": 0,
                     "solution": None
                 }
             else:
-                data[task]["attempts"] += 1
-            
-            f.seek(0)
-            f.truncate()
-            json.dump(data, f, indent=4)
-        return True
+                entry["attempts"] = entry.get("attempts", 0) + 1
+            KNOWLEDGE.set(task, entry)
     except Exception as e:
         print(f"Error saving unknown task: {e}")
         return False
+    
+    if LEARN_IN_BACKGROUND and status == "unknown":
+        LEARNING_QUEUE.submit(task)
+    return True
 
 def get_solution(task):
     """
@@ -85,13 +115,10 @@ def get_solution(task):
     Returns:
         str: Solution or None
     """
-    ensure_knowledge_file()
-    
     try:
-        with open(KNOWLEDGE_PATH, 'r') as f:
-            data = json.load(f)
-            if task in data and data[task]["solution"]:
-                return data[task]["solution"]
+        entry = KNOWLEDGE.get(task)
+        if entry and entry.get("solution"):
+            return entry["solution"]
     except Exception as e:
         print(f"Error getting solution: {e}")
     
@@ -107,18 +134,51 @@ def find_similar_task(task):
     Returns:
         str: Most similar task or None
     """
-    ensure_knowledge_file()
+    matches = find_similar_tasks(task, limit=1)
+    return matches[0][0] if matches else None
+
+def find_similar_tasks(task, limit=5):
+    """
+    Find known tasks that contain the task or are contained in it
+    
+    Args:
+        task (str): The task to find similar matches for
+        limit (int): Most matches to return
     
+    Returns:
+        list: (known task, score) pairs, best first; the score is the
+            fraction of the longer string the shorter one covers
+    """
     try:
-        with open(KNOWLEDGE_PATH, 'r') as f:
-            data = json.load(f)
-            # Very basic similarity: check if any known task is a subset
-            for known_task in data.keys():
-                if known_task in task or task in known_task:
-                    return known_task
+        with KNOWLEDGE.lock:
+            KNOWLEDGE.refresh()
+            return TASK_INDEX.search(task, limit)
     except Exception as e:
         print(f"Error finding similar task: {e}")
     
+    return []
+
+def match_learned_task(command, threshold=LEARN_MATCH_THRESHOLD):
+    """
+    Find the learned task a possibly reworded command asks for
+    
+    Args:
+        command (str): The command, as recognized
+        threshold (float): Lowest acceptable match score (0-1)
+    
+    Returns:
+        tuple: (task, score) of the best learned task, or None if no task
+            scores at least threshold
+    """
+    try:
+        with KNOWLEDGE.lock:
+            KNOWLEDGE.refresh()
+            matches = TASK_MATCHER.search(command, limit=1)
+    except Exception as e:
+        print(f"Error matching learned tasks: {e}")
+        return None
+    if matches and matches[0][1] >= threshold:
+        return matches[0]
     return None
 
 def learn_from_llm(task):
@@ -137,35 +197,121 @@ def learn_from_llm(task):
     Keep the answer concise and focused on the implementation details."""
     
     try:
-        solution = query_llm(prompt)
+        # Learning can wait behind interactive commands for a rate limit slot
+        solution = query_llm(prompt, priority="background", caller="learning")
         if solution:
             # Save the learned solution
-            ensure_knowledge_file()
-            with open(KNOWLEDGE_PATH, 'r+') as f:
-                data = json.load(f)
-                if task in data:
-                    data[task]["status"] = "learned"
-                    data[task]["solution"] = solution
-                    data[task]["learned_timestamp"] = str(datetime.datetime.now())
-                else:
-                    data[task] = {
-                        "status": "learned",
-                        "timestamp": str(datetime.datetime.now()),
-                        "learned_timestamp": str(datetime.datetime.now()),
-                        "attempts": 0,
-                        "solution": solution
-                    }
-                
-                f.seek(0)
-                f.truncate()
-                json.dump(data, f, indent=4)
-            
+            save_solutions({task: solution})
             return solution
     except Exception as e:
         print(f"Error learning from LLM: {e}")
     
     return None
 
+def save_solutions(solutions):
+    """
+    Save learned solutions to the knowledge database in a single update
+    
+    Args:
+        solutions (dict): Task to its learned solution
+    """
+    if not solutions:
+        return
+    now = str(datetime.datetime.now())
+    with KNOWLEDGE.lock:
+        entries = {}
+        for task, solution in solutions.items():
+            entry = KNOWLEDGE.get(task)
+            if entry is not None:
+                if entry.get("solution") and entry["solution"] != solution:
+                    SOLUTION_PLANS.discard(entry["solution"])
+                entry["status"] = "learned"
+                entry["solution"] = solution
+                entry["learned_timestamp"] = now
+            else:
+                entry = {
+                    "status": "learned",
+                    "timestamp": now,
+                    "learned_timestamp": now,
+                    "attempts": 0,
+                    "solution": solution
+                }
+            entries[task] = entry
+        KNOWLEDGE.set_many(entries)
+
+def parse_batch_solutions(text, tasks):
+    """
+    Parse the JSON answer to a batched learning prompt
+    
+    Args:
+        text (str): The LLM's answer
+        tasks (list): Tasks of the batch, in the order they were numbered
+    
+    Returns:
+        dict: Task to solution, for the tasks the answer solved
+    """
+    # Models sometimes wrap the object in a code fence or a sentence
+    start, end = text.find("{"), text.rfind("}")
+    if start < 0 or end < start:
+        return {}
+    try:
+        data = json.loads(text[start:end + 1])
+    except json.JSONDecodeError:
+        return {}
+    if not isinstance(data, dict):
+        return {}
+    
+    solutions = {}
+    for key, value in data.items():
+        key = str(key).strip().rstrip(".")
+        if key.isdigit() and 1 <= int(key) <= len(tasks):
+            task = tasks[int(key) - 1]
+        elif key in tasks:
+            task = key
+        else:
+            continue
+        if isinstance(value, dict):
+            value = value.get("solution") or value.get("instructions")
+        if isinstance(value, list):
+            value = "\n".join(str(step) for step in value)
+        if isinstance(value, str) and value.strip():
+            solutions[task] = value.strip()
+    return solutions
+
+def learn_batch(tasks):
+    """
+    Learn several tasks with one LLM prompt and save what was learned
+    
+    Args:
+        tasks (list): Tasks to learn
+    
+    Returns:
+        dict: Task to solution, for the tasks that were learned
+    """
+    numbered = "\n".join(f'{number}. "{task}"' for number, task in enumerate(tasks, 1))
+    prompt = f"Commands to learn:\n{numbered}"
+    
+    # Learning can wait behind interactive commands for a rate limit slot
+    answer = query_llm(prompt, system_message=LEARN_SYSTEM_MESSAGE, include_memory=False,
+                       use_cache=False, priority="background", caller="learning")
+    solutions = parse_batch_solutions(answer, tasks)
+    try:
+        save_solutions(solutions)
+    except Exception as e:
+        print(f"Error saving learned solutions: {e}")
+        return {}
+    
+    try:
+        from brain.memory import log_event
+        log_event("LEARNING", f"Learned {len(solutions)} of {len(tasks)} queued tasks: "
+                              + ", ".join(f"'{task}'" for task in solutions))
+    except ImportError:
+        pass
+    return solutions
+
+# Unknown tasks waiting to be learned in the background
+LEARNING_QUEUE = LearningQueue(learn_batch, batch_size=LEARN_BATCH_SIZE, batch_delay=LEARN_BATCH_DELAY)
+
 def handle_unknown_command(command):
     """
     Handle an unknown command using the knowledge base and learning
@@ -174,7 +320,8 @@ def handle_unknown_command(command):
         command (str): The unknown command
     
     Returns:
-        str: Response or None if can't handle
+        str: Response or None if can't handle (yet; with LEARN_IN_BACKGROUND
+            the command is then queued and learned in the background)
     """
     # Check if we already know this command
     solution = get_solution(command)
@@ -185,23 +332,21 @@ def handle_unknown_command(command):
             return f"I've executed the command: {command}"
         return f"I know how to handle this: {solution}"
     
-    # Check for similar commands
-    similar_task = find_similar_task(command)
+    # Check for learned commands worded differently
+    match = match_learned_task(command)
+    similar_task = match[0] if match else None
     if similar_task:
         solution = get_solution(similar_task)
         if solution:
             # Log that we found a similar command
             try:
                 from brain.memory import log_event
-                log_event("LEARNING", f"Found similar task for '{command}': '{similar_task}'")
+                log_event("LEARNING", f"Found similar task for '{command}': '{similar_task}' (score {match[1]:.2f})")
             except ImportError:
                 pass
                 
-            # Try to execute the similar command if it's something we can execute
-            executed = execute_learned_command(command)  # Try with original command first
-            if not executed:
-                executed = execute_learned_command(similar_task)  # Try with similar command
-                
+            # Try to execute the matched command if it's something we can execute
+            executed = execute_learned_command(similar_task)
             if executed:
                 return f"I've executed a similar command: {similar_task}"
             return f"I know something similar: {solution}"
@@ -211,8 +356,16 @@ def handle_unknown_command(command):
     if executed:
         return f"I've figured out how to execute: {command}"
     
-    # Log the unknown command
+    # Log the unknown command; with background learning this also queues it,
+    # and the caller answers the user without waiting for the lesson
     save_unknown(command)
+    if LEARN_IN_BACKGROUND:
+        try:
+            from brain.memory import log_event
+            log_event("LEARNING", f"Queued unknown command for background learning: '{command}'")
+        except ImportError:
+            pass
+        return None
     
     # Log this learning attempt
     try:
@@ -257,10 +410,8 @@ def execute_learned_command(command):
     if not solution:
         return False
         
-    # Parse the solution to identify executable code
-    # Look for Python code blocks in the solution
-    import re
-    code_blocks = re.findall(r'```(?:python)?\s*(.*?)```', solution, re.DOTALL)
+    # Code block, key presses and handlers of the solution, parsed once
+    plan = SOLUTION_PLANS.get(solution)
     
     # Handle keyboard shortcuts - common patterns
     if ("key" in command.lower() or "press" in command.lower() or 
@@ -288,36 +439,28 @@ def execute_learned_command(command):
         try:
             import pyautogui
             
-            # Look for key combinations in the solution
-            key_patterns = [
-                r'press[^\n]*?[\'"`](.+?)[\'"`]',  # press('key')
-                r'key(?:Down|Up|Press)[^\n]*?[\'"`](.+?)[\'"`]',  # keyDown('key')
-                r'hotkey\([\'"`](.+?)[\'"`]',  # hotkey('key1', 'key2')
-                r'(?:alt|ctrl|shift|win|cmd)\s*\+\s*([a-z0-9])',  # alt+key syntax
-            ]
-            
-            for pattern in key_patterns:
-                keys = re.findall(pattern, solution, re.IGNORECASE)
-                if keys:
-                    # Log this execution
-                    try:
-                        from brain.memory import log_event
-                        log_event("ACTION_EXECUTED", f"Executing keyboard command: {keys}")
-                    except ImportError:
-                        pass
-                    
-                    for key in keys:
-                        if '+' in key:  # Handle combinations like 'alt+tab'
-                            key_parts = [k.strip() for k in key.split('+')]
-                            pyautogui.hotkey(*key_parts)
-                        else:
-                            pyautogui.press(key)
-                    return True
+            # Key combinations found in the solution
+            keys = plan.keys
+            if keys:
+                # Log this execution
+                try:
+                    from brain.memory import log_event
+                    log_event("ACTION_EXECUTED", f"Executing keyboard command: {keys}")
+                except ImportError:
+                    pass
+                
+                for key in keys:
+                    if '+' in key:  # Handle combinations like 'alt+tab'
+                        key_parts = [k.strip() for k in key.split('+')]
+                        pyautogui.hotkey(*key_parts)
+                    else:
+                        pyautogui.press(key)
+                return True
         except Exception as e:
             print(f"Error executing keyboard command: {e}")
     
-    # Execute code blocks if found
-    if code_blocks:
+    # Execute the first code block if found
+    if plan.has_code:
         try:
             # Log this execution
             try:
@@ -326,24 +469,26 @@ def execute_learned_command(command):
             except ImportError:
                 pass
             
-            # Execute the first code block found
+            if plan.code is None:
+                raise SyntaxError(plan.error)
+            
+            # Run it in a sandbox worker, so a hung or heavy snippet cannot
+            # freeze the assistant
+            if SANDBOX is not None:
+                result = SANDBOX.run(plan.code, plan.handlers)
+                if result["status"] != "ok":
+                    raise RuntimeError(result["error"])
+                return True
+            
             # We use locals() to capture any functions defined in the code
             local_vars = {}
-            exec(code_blocks[0], globals(), local_vars)
-            
-            # Try to find a function that matches the command name or a common handler pattern
-            handler_patterns = [
-                r'handle_([a-z_]+)',
-                r'def ([a-z_]+_command)',
-                r'def ([a-z_]+)',
-            ]
+            exec(plan.code, globals(), local_vars)
             
-            for pattern in handler_patterns:
-                for func_name in local_vars.keys():
-                    if re.match(pattern, func_name) and callable(local_vars[func_name]):
-                        # Execute the function
-                        local_vars[func_name]()
-                        return True
+            # Call the first handler function the code defined
+            for func_name in plan.handlers:
+                if callable(local_vars.get(func_name)):
+                    local_vars[func_name]()
+                    return True
             
             # If we didn't find a matching function but the code executed without errors
             return True
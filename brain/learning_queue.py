@@ -0,0 +1,146 @@
+"""
+Background batched learning of unknown commands
+Unknown tasks are queued as they are saved; a single learner thread collects
+them into batches and hands each batch to one learn call, so the user never
+waits for learning and several tasks share one LLM round trip
+"""
+import queue
+import threading
+import time
+
+# Queue markers that are not tasks
+_FLUSH = object()
+_STOP = object()
+
+
+class LearningQueue:
+    """
+    Queue-backed learner that batches tasks on a size or time threshold
+
+    Args:
+        learn (callable): Takes a list of tasks and returns a dict of the
+            tasks it learned to their solutions
+        batch_size (int): Learn as soon as this many tasks are waiting
+        batch_delay (float): Longest time in seconds a task waits for others
+            to join its batch
+    """
+
+    def __init__(self, learn, batch_size=5, batch_delay=2.0):
+        self.learn = learn
+        self.batch_size = max(1, batch_size)
+        self.batch_delay = batch_delay
+        self._queue = queue.Queue()
+        self._condition = threading.Condition()
+        # Tasks queued or being learned, so repeats are not learned twice
+        self._pending = set()
+        self._submitted = 0
+        self._done = 0
+        self._stats = {"batches": 0, "learned": 0, "failed": 0}
+        self._closed = False
+        self._thread = None
+
+    def submit(self, task):
+        """
+        Queue a task for learning
+
+        Args:
+            task (str): The unknown task
+
+        Returns:
+            bool: True if queued, False if it is already queued or the queue is closed
+        """
+        with self._condition:
+            if self._closed or task in self._pending:
+                return False
+            self._pending.add(task)
+            self._submitted += 1
+            # Started on first use, so importing brain.learn starts no thread
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="jarvis-learner", daemon=True)
+                self._thread.start()
+            self._queue.put(task)
+            return True
+
+    def flush(self, timeout=None):
+        """
+        Wait until every task submitted so far was learned or given up on
+
+        Args:
+            timeout (float): Maximum seconds to wait (None waits indefinitely)
+
+        Returns:
+            bool: True if all submitted tasks were processed in time
+        """
+        with self._condition:
+            target = self._submitted
+            if self._done < target and self._thread is not None and self._thread.is_alive():
+                self._queue.put(_FLUSH)
+                self._condition.wait_for(lambda: self._done >= target or not self._thread.is_alive(),
+                                         timeout=timeout)
+            return self._done >= target
+
+    def close(self, timeout=5.0):
+        """
+        Stop the learner thread; tasks still queued stay unlearned in the knowledge base
+
+        Args:
+            timeout (float): Maximum seconds to wait for a batch in progress
+        """
+        with self._condition:
+            if self._closed:
+                return
+            self._closed = True
+            thread = self._thread
+        if thread is not None:
+            self._queue.put(_STOP)
+            thread.join(timeout)
+
+    def stats(self):
+        """
+        Get the learning counters
+
+        Returns:
+            dict: Tasks waiting, batches sent, tasks learned and tasks the
+                LLM gave no usable solution for
+        """
+        with self._condition:
+            return dict(self._stats, waiting=len(self._pending))
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            item = self._queue.get()
+            if item is _STOP:
+                break
+            batch = [] if item is _FLUSH else [item]
+            deadline = time.monotonic() + self.batch_delay
+            while item is not _FLUSH and len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                if item is not _FLUSH:
+                    batch.append(item)
+            self._learn(batch)
+
+    def _learn(self, batch):
+        learned = {}
+        if batch:
+            try:
+                learned = self.learn(batch) or {}
+            except Exception as e:
+                print(f"Error learning batch of {len(batch)} tasks: {e}")
+        with self._condition:
+            if batch:
+                self._stats["batches"] += 1
+                self._stats["learned"] += sum(1 for task in batch if task in learned)
+                self._stats["failed"] += sum(1 for task in batch if task not in learned)
+            self._pending.difference_update(batch)
+            self._done += len(batch)
+            self._condition.notify_all()
@@ -1,26 +1,39 @@
 """
 LLM (Language Model) integration with fallback for JARVIS
 """
-import requests
+import asyncio
+import atexit
 import json
 import sys
 import os
+import time
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from config import GROQ_API_KEY, GEMINI_API_KEY, OPENAI_API_KEY
+from brain import async_http, http_pool
+from brain.context_budget import build_context, estimate_tokens
+from brain.llm_dispatch import adispatch
+from brain.llm_scheduler import LLMScheduler, PRIORITIES
+from brain.provider_health import HealthRegistry, ProviderError, ProviderNotConfigured
+from brain.response_cache import ResponseCache, is_time_sensitive
+from brain.semantic_cache import SemanticCache, context_key
+from brain.single_flight import SingleFlight
+from brain.streaming import iter_sse_data
+from config import (GROQ_API_KEY, GEMINI_API_KEY, OPENAI_API_KEY, GROQ_BASE_URL, GEMINI_BASE_URL,
+                    OPENAI_BASE_URL, LLM_POLICY, LLM_HEDGE_DELAY,
+                    LLM_ASYNC_CONCURRENCY, LLM_CONTEXT_SCAN_EVENTS, LLM_CACHE_ENABLED, LLM_CACHE_FILE,
+                    LLM_CACHE_TTL, LLM_CACHE_MAX_ENTRIES,
+                    LLM_SEMANTIC_CACHE_ENABLED, LLM_SEMANTIC_CACHE_FILE, LLM_SEMANTIC_THRESHOLD,
+                    LLM_SEMANTIC_WORD_OVERLAP, LLM_SEMANTIC_MAX_ENTRIES, LLM_RATE_LIMITS, LLM_QUEUE_TIMEOUTS,
+                    LLM_EXPECTED_OUTPUT_TOKENS, LLM_SINGLE_FLIGHT)
 
-def query_groq(prompt, model="llama3-70b-8192"):
-    """
-    Query Groq LLM API
-    
-    Args:
-        prompt (str): The input prompt
-        model (str): Model name to use
-    
-    Returns:
-        str: Response from Groq
-    """
+# Default model of each provider
+GROQ_MODEL = "llama3-70b-8192"
+GEMINI_MODEL = "gemini-2.0-flash"
+OPENAI_MODEL = "gpt-4o-mini"
+
+def _groq_request(prompt, model, stream=False):
+    """Build the URL, headers and body of a Groq chat completion"""
     if not GROQ_API_KEY or GROQ_API_KEY == "your_groq_key":
-        raise ValueError("Groq API key not set")
+        raise ProviderNotConfigured("Groq API key not set")
     
     headers = {
         "Authorization": f"Bearer {GROQ_API_KEY}",
@@ -31,31 +44,20 @@ def query_groq(prompt, model="llama3-70b-8192"):
         "messages": [{"role": "user", "content": prompt}],
         "model": model
     }
+    if stream:
+        data["stream"] = True
     
-    response = requests.post("https://api.groq.com/openai/v1/chat/completions", 
-                            headers=headers, 
-                            json=data)
-    
-    if response.status_code == 200:
-        return response.json()['choices'][0]['message']['content'].strip()
-    else:
-        raise Exception(f"Groq API Error: {response.status_code}, {response.text}")
+    return f"{GROQ_BASE_URL}/chat/completions", headers, data
 
-def query_gemini(prompt, model="gemini-2.0-flash"):
-    """
-    Query Google's Gemini LLM API
-    
-    Args:
-        prompt (str): The input prompt
-        model (str): Model name to use
-    
-    Returns:
-        str: Response from Gemini
-    """
+def _gemini_request(prompt, model, stream=False):
+    """Build the URL, headers and body of a Gemini content generation"""
     if not GEMINI_API_KEY or GEMINI_API_KEY == "your_gemini_key":
-        raise ValueError("Gemini API key not set")
+        raise ProviderNotConfigured("Gemini API key not set")
     
-    url = f"https://generativelanguage.googleapis.com/v1beta/models/{model}:generateContent?key={GEMINI_API_KEY}"
+    if stream:
+        url = f"{GEMINI_BASE_URL}/models/{model}:streamGenerateContent?alt=sse&key={GEMINI_API_KEY}"
+    else:
+        url = f"{GEMINI_BASE_URL}/models/{model}:generateContent?key={GEMINI_API_KEY}"
     
     headers = {
         "Content-Type": "application/json"
@@ -73,15 +75,90 @@ def query_gemini(prompt, model="gemini-2.0-flash"):
         ]
     }
     
-    response = requests.post(url, headers=headers, json=data)
+    return url, headers, data
+
+def _openai_request(prompt, model, stream=False):
+    """Build the URL, headers and body of an OpenAI chat completion"""
+    if not OPENAI_API_KEY or OPENAI_API_KEY == "your_openai_key":
+        raise ProviderNotConfigured("OpenAI API key not set")
     
-    if response.status_code == 200:
-        response_json = response.json()
-        return response_json['candidates'][0]['content']['parts'][0]['text'].strip()
-    else:
-        raise Exception(f"Gemini API Error: {response.status_code}, {response.text}")
+    headers = {
+        "Authorization": f"Bearer {OPENAI_API_KEY}",
+        "Content-Type": "application/json"
+    }
+    
+    data = {
+        "model": model,
+        "messages": [{"role": "user", "content": prompt}],
+        "temperature": 0.7
+    }
+    if stream:
+        data["stream"] = True
+    
+    return f"{OPENAI_BASE_URL}/chat/completions", headers, data
+
+def _check_response(label, response):
+    """Raise a ProviderError unless a provider answered successfully"""
+    if response.status_code != 200:
+        raise ProviderError(f"{label} API Error: {response.status_code}, {response.text}",
+                            status=response.status_code, retry_after=response.headers.get("Retry-After"))
+
+def _chat_text(response):
+    """Text of a Groq or OpenAI chat completion"""
+    return response.json()['choices'][0]['message']['content'].strip()
+
+def _gemini_text(response):
+    """Text of a Gemini content generation"""
+    return response.json()['candidates'][0]['content']['parts'][0]['text'].strip()
+
+def _chat_deltas(response):
+    """Text pieces of a streamed Groq or OpenAI chat completion"""
+    for event in iter_sse_data(response):
+        text = event['choices'][0]['delta'].get('content') if event.get('choices') else None
+        if text:
+            yield text
+
+def _gemini_deltas(response):
+    """Text pieces of a streamed Gemini content generation"""
+    for event in iter_sse_data(response):
+        for candidate in event.get('candidates', [])[:1]:
+            for part in candidate.get('content', {}).get('parts', []):
+                if part.get('text'):
+                    yield part['text']
+
+def query_groq(prompt, model=GROQ_MODEL):
+    """
+    Query Groq LLM API
+    
+    Args:
+        prompt (str): The input prompt
+        model (str): Model name to use
+    
+    Returns:
+        str: Response from Groq
+    """
+    url, headers, data = _groq_request(prompt, model)
+    response = http_pool.post("groq", url, headers=headers, json=data)
+    _check_response("Groq", response)
+    return _chat_text(response)
+
+def query_gemini(prompt, model=GEMINI_MODEL):
+    """
+    Query Google's Gemini LLM API
+    
+    Args:
+        prompt (str): The input prompt
+        model (str): Model name to use
+    
+    Returns:
+        str: Response from Gemini
+    """
+    url, headers, data = _gemini_request(prompt, model)
+    response = http_pool.post("gemini", url, headers=headers, json=data)
+    _check_response("Gemini", response)
+    return _gemini_text(response)
 
-def query_openai(prompt, model="gpt-4o-mini"):
+def query_openai(prompt, model=OPENAI_MODEL):
     """
     Query OpenAI API
     
@@ -92,82 +169,388 @@ def query_openai(prompt, model="gpt-4o-mini"):
     Returns:
         str: Response from OpenAI
     """
-    if not OPENAI_API_KEY or OPENAI_API_KEY == "your_openai_key":
-        raise ValueError("OpenAI API key not set")
+    url, headers, data = _openai_request(prompt, model)
+    response = http_pool.post("openai", url, headers=headers, json=data)
+    _check_response("OpenAI", response)
+    return _chat_text(response)
+
+def stream_groq(prompt, model=GROQ_MODEL):
+    """
+    Stream a response from the Groq LLM API
     
-    headers = {
-        "Authorization": f"Bearer {OPENAI_API_KEY}",
-        "Content-Type": "application/json"
-    }
+    Args:
+        prompt (str): The input prompt
+        model (str): Model name to use
     
-    data = {
-        "model": model,
-        "messages": [{"role": "user", "content": prompt}],
-        "temperature": 0.7
-    }
+    Yields:
+        str: Pieces of the response as they are generated
+    """
+    url, headers, data = _groq_request(prompt, model, stream=True)
+    with http_pool.post("groq", url, headers=headers, json=data, stream=True) as response:
+        _check_response("Groq", response)
+        yield from _chat_deltas(response)
+
+def stream_gemini(prompt, model=GEMINI_MODEL):
+    """
+    Stream a response from Google's Gemini LLM API
     
-    response = requests.post("https://api.openai.com/v1/chat/completions", 
-                            headers=headers, 
-                            json=data)
+    Args:
+        prompt (str): The input prompt
+        model (str): Model name to use
     
-    if response.status_code == 200:
-        return response.json()['choices'][0]['message']['content'].strip()
-    else:
-        raise Exception(f"OpenAI API Error: {response.status_code}, {response.text}")
+    Yields:
+        str: Pieces of the response as they are generated
+    """
+    url, headers, data = _gemini_request(prompt, model, stream=True)
+    with http_pool.post("gemini", url, headers=headers, json=data, stream=True) as response:
+        _check_response("Gemini", response)
+        yield from _gemini_deltas(response)
+
+def stream_openai(prompt, model=OPENAI_MODEL):
+    """
+    Stream a response from the OpenAI API
+    
+    Args:
+        prompt (str): The input prompt
+        model (str): Model name to use
+    
+    Yields:
+        str: Pieces of the response as they are generated
+    """
+    url, headers, data = _openai_request(prompt, model, stream=True)
+    with http_pool.post("openai", url, headers=headers, json=data, stream=True) as response:
+        _check_response("OpenAI", response)
+        yield from _chat_deltas(response)
+
+async def aquery_groq(prompt, model=GROQ_MODEL):
+    """
+    Query Groq LLM API without blocking the event loop
+    
+    Args:
+        prompt (str): The input prompt
+        model (str): Model name to use
+    
+    Returns:
+        str: Response from Groq
+    """
+    url, headers, data = _groq_request(prompt, model)
+    response = await async_http.post("groq", url, headers=headers, json=data)
+    _check_response("Groq", response)
+    return _chat_text(response)
 
-def query_llm(prompt, system_message = (
+async def aquery_gemini(prompt, model=GEMINI_MODEL):
+    """
+    Query Google's Gemini LLM API without blocking the event loop
+    
+    Args:
+        prompt (str): The input prompt
+        model (str): Model name to use
+    
+    Returns:
+        str: Response from Gemini
+    """
+    url, headers, data = _gemini_request(prompt, model)
+    response = await async_http.post("gemini", url, headers=headers, json=data)
+    _check_response("Gemini", response)
+    return _gemini_text(response)
+
+async def aquery_openai(prompt, model=OPENAI_MODEL):
+    """
+    Query OpenAI API without blocking the event loop
+    
+    Args:
+        prompt (str): The input prompt
+        model (str): Model name to use
+    
+    Returns:
+        str: Response from OpenAI
+    """
+    url, headers, data = _openai_request(prompt, model)
+    response = await async_http.post("openai", url, headers=headers, json=data)
+    _check_response("OpenAI", response)
+    return _chat_text(response)
+
+# Providers in order of preference, as (name, query function) pairs
+PROVIDERS = [("Groq", query_groq), ("Gemini", query_gemini), ("OpenAI", query_openai)]
+
+# Streaming and asynchronous client of each provider
+STREAMING_PROVIDERS = {"Groq": stream_groq, "Gemini": stream_gemini, "OpenAI": stream_openai}
+ASYNC_PROVIDERS = {"Groq": aquery_groq, "Gemini": aquery_gemini, "OpenAI": aquery_openai}
+
+# Latency, error rate and circuit breaker state of each provider; queries try
+# the fastest healthy provider first
+HEALTH = HealthRegistry()
+for _name, _function in PROVIDERS:
+    HEALTH.register(_name, _function)
+
+# Responses to prompts that do not depend on history or on the time they are
+# asked; any provider may have answered, so the key covers all their models
+RESPONSE_CACHE = ResponseCache(LLM_CACHE_FILE, ttl=LLM_CACHE_TTL, max_entries=LLM_CACHE_MAX_ENTRIES)
+CACHE_MODEL = "|".join([GROQ_MODEL, GEMINI_MODEL, OPENAI_MODEL])
+
+# Answers to rephrased prompts, matched by similarity when the exact cache
+# misses; held in memory and saved when JARVIS exits
+SEMANTIC_CACHE = SemanticCache(LLM_SEMANTIC_CACHE_FILE, threshold=LLM_SEMANTIC_THRESHOLD,
+                               max_entries=LLM_SEMANTIC_MAX_ENTRIES, ttl=LLM_CACHE_TTL,
+                               word_overlap=LLM_SEMANTIC_WORD_OVERLAP)
+atexit.register(SEMANTIC_CACHE.save)
+atexit.register(async_http.shutdown)
+
+# Local rate limits of each provider; requests queue by priority and caller
+# instead of running into 429 responses
+SCHEDULER = LLMScheduler(LLM_RATE_LIMITS, LLM_QUEUE_TIMEOUTS)
+
+def scheduler_stats():
+    """
+    Get the request queue of every rate-limited provider
+    
+    Returns:
+        dict: Per provider (see LLMScheduler.stats)
+    """
+    return SCHEDULER.stats()
+
+# Provider requests in flight, so concurrent identical prompts share one
+SINGLE_FLIGHT = SingleFlight()
+
+def coalescing_stats():
+    """
+    Get how many LLM requests shared another request's provider call
+    
+    Returns:
+        dict: Calls, upstream calls, coalesced calls and calls in flight
+    """
+    return SINGLE_FLIGHT.stats()
+
+def provider_scoreboard():
+    """
+    Get the health of every LLM provider, in the order they are tried
+    
+    Returns:
+        list: One dict per provider (see HealthRegistry.scoreboard)
+    """
+    return HEALTH.scoreboard()
+
+SYSTEM_MESSAGE = (
     "You are JARVIS, an efficient AI assistant. Respond only with complete, functional Python code. Do not include explanations, steps, markdown formatting, or extra text. Use relative paths when needed. For GUI automation, use only the pyautogui module. Assume all required packages are installed. Output only Python code. If the question is related to the weather or like question just reply with normal answer.")
-, include_memory=True):
+
+ERROR_MESSAGE = "I'm sorry, I couldn't connect to my knowledge base at the moment. Please check your API keys and internet connection."
+
+def _is_cacheable(prompt, include_memory, use_cache):
+    # Answers that depend on fresh history or on the current time are never cached
+    return LLM_CACHE_ENABLED and use_cache and not include_memory and not is_time_sensitive(prompt)
+
+def _cached_response(prompt, system_message):
+    """Look a prompt up in the exact and then the semantic response cache"""
+    cached = RESPONSE_CACHE.get(prompt, system_message, CACHE_MODEL)
+    if cached is None and LLM_SEMANTIC_CACHE_ENABLED:
+        match = SEMANTIC_CACHE.lookup(prompt, context_key(system_message, CACHE_MODEL))
+        if match is not None:
+            cached = match[0]
+    return cached
+
+def _cache_response(prompt, system_message, response):
+    RESPONSE_CACHE.put(prompt, system_message, CACHE_MODEL, response)
+    if LLM_SEMANTIC_CACHE_ENABLED:
+        SEMANTIC_CACHE.add(prompt, context_key(system_message, CACHE_MODEL), response)
+
+def _request_tokens(prompt):
+    """Tokens a request is expected to use, prompt and answer together"""
+    return estimate_tokens(prompt) + LLM_EXPECTED_OUTPUT_TOKENS
+
+def _admission(priority, caller):
+    """Coroutine function that waits for a provider's rate limit slot for a prompt"""
+    async def admit(name, prompt):
+        await SCHEDULER.aacquire(name, _request_tokens(prompt), priority, caller)
+    return admit
+
+def _build_prompt(prompt, system_message, include_memory):
+    """Format the complete prompt with the system message and recent context"""
+    from brain.memory import get_last_n_events
+    
+    # Get recent context if enabled, trimmed to the relevant events that fit
+    # the token budget
+    context = ""
+    if include_memory:
+        lines = get_last_n_events(LLM_CONTEXT_SCAN_EVENTS).splitlines()
+        context, report = build_context(lines, exclude=prompt)
+        print(f"Recent history: {report['context_tokens']} of {report['raw_tokens']} tokens "
+              f"({report['reduction']:.0%} smaller, {report['events']} events)")
+    
+    if context:
+        return f"{system_message}\n\nRecent history:\n{context}\n\nUser: {prompt}"
+    return f"{system_message}\n\nUser: {prompt}"
+
+async def aquery_llm(prompt, system_message=SYSTEM_MESSAGE, include_memory=True, use_cache=True,
+                     priority="interactive", caller="default"):
     """
-    Query LLMs with fallback mechanism
+    Query LLMs with fallback mechanism without blocking the event loop
+    
+    Concurrent calls with the same complete prompt share one provider request
+    and its answer or error (see coalescing_stats).
     
     Args:
         prompt (str): User's query
         system_message (str): System message to prepend
         include_memory (bool): Whether to include recent memory/context
+        use_cache (bool): Whether the response cache may answer; it is always
+            bypassed with include_memory or for time-sensitive prompts
+        priority (str): "interactive", "normal" or "background"; decides who
+            goes first when a provider's rate limit makes requests queue
+        caller (str): Who is asking; callers of one priority share the limit fairly
     
     Returns:
         str: Response from one of the LLMs or an error message
     """
-    from brain.memory import get_last_n_events, log_event
+    from brain.memory import log_event
     
     # Log this query
     log_event("LLM_QUERY", prompt)
     
-    # Get recent context if enabled
-    context = ""
-    if include_memory:
-        context = get_last_n_events(10)
+    cacheable = _is_cacheable(prompt, include_memory, use_cache)
+    if cacheable:
+        cached = _cached_response(prompt, system_message)
+        if cached is not None:
+            log_event("LLM_RESPONSE", cached)
+            return cached
     
-    # Format the complete prompt with system message and context
-    if context:
-        full_prompt = f"{system_message}\n\nRecent history:\n{context}\n\nUser: {prompt}"
-    else:
-        full_prompt = f"{system_message}\n\nUser: {prompt}"
-    # Try each LLM in order
-    from brain.memory import log_event
+    full_prompt = _build_prompt(prompt, system_message, include_memory)
+    # Ask the providers according to the configured fallback policy
+    async def ask():
+        providers = [(name, ASYNC_PROVIDERS[name]) for name, _ in HEALTH.ordered()]
+        _, answer = await adispatch(providers, full_prompt, policy=LLM_POLICY, hedge_delay=LLM_HEDGE_DELAY,
+                                    health=HEALTH, admit=_admission(priority, caller))
+        if cacheable:
+            _cache_response(prompt, system_message, answer)
+        return answer
     
     try:
-        print("Trying Groq API...")
-        response = query_groq(full_prompt)
+        if LLM_SINGLE_FLIGHT:
+            # Identical prompts already being answered share that request
+            response = await SINGLE_FLIGHT.run(full_prompt, ask, PRIORITIES.index(priority))
+        else:
+            response = await ask()
         log_event("LLM_RESPONSE", response)
         return response
     except Exception as e:
-        print(f"Groq API failed: {e}")
+        log_event("LLM_ERROR", str(e))
+        return ERROR_MESSAGE
+
+def query_llm(prompt, system_message=SYSTEM_MESSAGE, include_memory=True, use_cache=True,
+              priority="interactive", caller="default"):
+    """
+    Query LLMs with fallback mechanism, blocking until the answer arrives
+    
+    Runs aquery_llm on the shared background event loop, so blocking callers
+    reuse the same connection pools as async ones.
+    
+    Args:
+        prompt (str): User's query
+        system_message (str): System message to prepend
+        include_memory (bool): Whether to include recent memory/context
+        use_cache (bool): Whether the response cache may answer; it is always
+            bypassed with include_memory or for time-sensitive prompts
+        priority (str): "interactive", "normal" or "background"; decides who
+            goes first when a provider's rate limit makes requests queue
+        caller (str): Who is asking; callers of one priority share the limit fairly
+    
+    Returns:
+        str: Response from one of the LLMs or an error message
+    """
+    return async_http.run_sync(aquery_llm(prompt, system_message, include_memory, use_cache, priority, caller))
+
+async def agather_llm(prompts, limit=LLM_ASYNC_CONCURRENCY, **kwargs):
+    """
+    Query LLMs for many prompts concurrently
+    
+    Args:
+        prompts (list): Prompts to answer
+        limit (int): Most prompts in flight at once
+        **kwargs: Passed on to aquery_llm (priority, caller, ...)
+    
+    Returns:
+        list: One response or error message per prompt, in order
+    """
+    semaphore = asyncio.Semaphore(limit)
+    
+    async def answer(prompt):
+        async with semaphore:
+            return await aquery_llm(prompt, **kwargs)
+    
+    return await asyncio.gather(*(answer(prompt) for prompt in prompts))
+
+def query_llm_many(prompts, limit=LLM_ASYNC_CONCURRENCY, **kwargs):
+    """
+    Query LLMs for many prompts concurrently, blocking until all are answered
+    
+    Args:
+        prompts (list): Prompts to answer
+        limit (int): Most prompts in flight at once
+        **kwargs: Passed on to aquery_llm (priority, caller, ...)
+    
+    Returns:
+        list: One response or error message per prompt, in order
+    """
+    return async_http.run_sync(agather_llm(prompts, limit, **kwargs))
+
+def stream_llm(prompt, system_message=SYSTEM_MESSAGE, include_memory=True, use_cache=True,
+               priority="interactive", caller="default"):
+    """
+    Query LLMs with fallback, yielding the response while it is generated
+    
+    Providers are tried in the same order as query_llm. A provider that fails
+    before sending any text falls back to the next one; once text was yielded
+    the response cannot switch provider, so a failure mid-stream ends it.
+    
+    Args:
+        prompt (str): User's query
+        system_message (str): System message to prepend
+        include_memory (bool): Whether to include recent memory/context
+        use_cache (bool): Whether the response cache may answer; it is always
+            bypassed with include_memory or for time-sensitive prompts
+        priority (str): "interactive", "normal" or "background"; decides who
+            goes first when a provider's rate limit makes requests queue
+        caller (str): Who is asking; callers of one priority share the limit fairly
+    
+    Yields:
+        str: Pieces of the response, or a single cached response or error message
+    """
+    from brain.memory import log_event
+    
+    log_event("LLM_QUERY", prompt)
+    
+    cacheable = _is_cacheable(prompt, include_memory, use_cache)
+    if cacheable:
+        cached = _cached_response(prompt, system_message)
+        if cached is not None:
+            log_event("LLM_RESPONSE", cached)
+            yield cached
+            return
+    
+    full_prompt = _build_prompt(prompt, system_message, include_memory)
+    last_error = ValueError("No LLM providers configured")
+    for name, _ in HEALTH.ordered():
+        print(f"Streaming from {name} API...")
+        pieces = []
         try:
-            print("Trying Gemini API...")
-            response = query_gemini(full_prompt)
-            log_event("LLM_RESPONSE", response)
-            return response
+            SCHEDULER.acquire(name, _request_tokens(full_prompt), priority, caller)
+            # Timed from here, so the local rate limit wait is not the provider's latency
+            start = time.perf_counter()
+            for piece in STREAMING_PROVIDERS[name](full_prompt):
+                pieces.append(piece)
+                yield piece
         except Exception as e:
-            print(f"Gemini API failed: {e}")
-            try:
-                print("Trying OpenAI API...")
-                response = query_openai(full_prompt)
-                log_event("LLM_RESPONSE", response)
-                return response
-            except Exception as e:
-                print(f"OpenAI API failed: {e}")
-                error_msg = "I'm sorry, I couldn't connect to my knowledge base at the moment. Please check your API keys and internet connection."
-                log_event("LLM_ERROR", str(e))
-                return error_msg
+            HEALTH.record_failure(name, e)
+            print(f"{name} API failed: {e}")
+            last_error = e
+            if not pieces:
+                continue
+            log_event("LLM_ERROR", str(e))
+            return
+        HEALTH.record_success(name, time.perf_counter() - start)
+        response = "".join(pieces).strip()
+        log_event("LLM_RESPONSE", response)
+        if cacheable and response:
+            _cache_response(prompt, system_message, response)
+        return
+    log_event("LLM_ERROR", str(last_error))
+    yield ERROR_MESSAGE
@@ -0,0 +1,165 @@
+"""
+Fallback policies for querying several LLM providers
+Providers can be tried one after another, hedged (the next one starts if the
+current one is slow) or raced, with each provider's wins and latency recorded.
+Providers are coroutine functions run on the event loop; blocking callers
+reach them through brain.llm's query_llm.
+"""
+import asyncio
+import threading
+import time
+
+DISPATCH_POLICIES = ("sequential", "hedged", "race")
+
+_stats = {}
+_stats_lock = threading.Lock()
+
+
+def _record(name, **changes):
+    with _stats_lock:
+        stats = _stats.setdefault(name, {"attempts": 0, "wins": 0, "failures": 0,
+                                         "latency_total": 0.0, "last_latency": None})
+        for key, value in changes.items():
+            stats[key] += value
+
+
+async def _atimed_call(name, function, prompt, health=None, admit=None, sent=None):
+    """Await a provider coroutine, recording its latency and whether it failed"""
+    try:
+        # Time spent waiting for a local rate limit slot is not the provider's latency
+        if admit is not None:
+            await admit(name, prompt)
+        if sent is not None:
+            sent.set()
+        start = time.perf_counter()
+        response = await function(prompt)
+    except Exception as e:
+        _record(name, attempts=1, failures=1)
+        if health is not None:
+            health.record_failure(name, e)
+        raise
+    latency = time.perf_counter() - start
+    if health is not None:
+        health.record_success(name, latency)
+    _record(name, attempts=1, latency_total=latency)
+    with _stats_lock:
+        _stats[name]["last_latency"] = latency
+    return response
+
+
+def provider_stats():
+    """
+    Get each provider's attempts, wins, failures and latency
+
+    Returns:
+        dict: Counters keyed by provider name, with the mean latency in
+            seconds of its successful calls
+    """
+    with _stats_lock:
+        stats = {}
+        for name, values in _stats.items():
+            succeeded = values["attempts"] - values["failures"]
+            stats[name] = dict(values, mean_latency=values["latency_total"] / succeeded if succeeded else None)
+        return stats
+
+
+async def adispatch(providers, prompt, policy="sequential", hedge_delay=1.0, health=None, admit=None):
+    """
+    Get the first good response from a list of async providers
+
+    "sequential" tries each provider after the previous one failed.
+    "hedged" also starts the next provider when no answer arrived within
+    hedge_delay seconds of the last request being sent. "race" starts every
+    provider at once. A failure always starts the next provider immediately.
+    Calls still running once a response wins are cancelled.
+
+    Args:
+        providers (list): (name, coroutine function) pairs in order of
+            preference; each takes the prompt and returns the response text
+        prompt (str): Complete prompt to send
+        policy (str): "sequential", "hedged" or "race"
+        hedge_delay (float): Seconds to wait before hedging
+        health (HealthRegistry): Registry told about every call's outcome
+        admit (function): Coroutine function taking the provider name and
+            prompt, awaited before each call is sent and timed (e.g. waiting
+            for a rate limit slot)
+
+    Returns:
+        tuple: (provider name, response)
+
+    Raises:
+        Exception: The last provider error if every provider failed
+    """
+    if policy not in DISPATCH_POLICIES:
+        raise ValueError(f"Unknown LLM dispatch policy: {policy}")
+    if not providers:
+        raise ValueError("No LLM providers configured")
+
+    if policy == "sequential":
+        last_error = None
+        for name, function in providers:
+            print(f"Trying {name} API...")
+            try:
+                response = await _atimed_call(name, function, prompt, health, admit)
+            except Exception as e:
+                print(f"{name} API failed: {e}")
+                last_error = e
+                continue
+            _record(name, wins=1)
+            return name, response
+        raise last_error
+
+    waiting = list(providers)
+    running = {}
+    # Set once the most recently launched call has been sent
+    latest_sent = None
+
+    def launch():
+        nonlocal latest_sent
+        name, function = waiting.pop(0)
+        print(f"Trying {name} API...")
+        latest_sent = asyncio.Event()
+        running[asyncio.ensure_future(_atimed_call(name, function, prompt, health, admit, latest_sent))] = name
+
+    launch()
+    while policy == "race" and waiting:
+        launch()
+
+    last_error = None
+    try:
+        while running:
+            if waiting and not latest_sent.is_set():
+                # The newest call is still queued locally, so it cannot be
+                # slow yet; the hedge delay starts once it is sent
+                sent = asyncio.ensure_future(latest_sent.wait())
+                done, _ = await asyncio.wait([*running, sent], return_when=asyncio.FIRST_COMPLETED)
+                sent.cancel()
+                await asyncio.gather(sent, return_exceptions=True)
+                done.discard(sent)
+                if not done:
+                    continue
+            else:
+                done, _ = await asyncio.wait(running, timeout=hedge_delay if waiting else None,
+                                             return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    # The running calls are slow; hedge with the next provider
+                    launch()
+                    continue
+            for task in done:
+                name = running.pop(task)
+                try:
+                    response = task.result()
+                except Exception as e:
+                    print(f"{name} API failed: {e}")
+                    last_error = e
+                    if waiting:
+                        launch()
+                    continue
+                _record(name, wins=1)
+                return name, response
+        raise last_error
+    finally:
+        for loser in running:
+            loser.cancel()
+        # Let the cancelled calls unwind before the caller moves on
+        await asyncio.gather(*running, return_exceptions=True)
@@ -0,0 +1,221 @@
+"""
+Request scheduling for the LLM providers
+Each provider gets token buckets for requests and tokens per minute. Callers
+wait in one queue per provider, served by priority class (interactive voice
+before background learning), fairly between callers of the same class, and
+give up once their deadline passes instead of running into 429 responses
+"""
+import asyncio
+import itertools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from brain.provider_health import QueueTimeout
+
+# Priority classes, most urgent first
+PRIORITIES = ("interactive", "normal", "background")
+
+# Async callers wait in these threads, apart from the threads doing HTTP
+_executor = ThreadPoolExecutor(max_workers=32, thread_name_prefix="jarvis-llm-queue")
+
+
+class TokenBucket:
+    """
+    Continuously refilled token bucket
+
+    Args:
+        per_minute (float): Refill rate, which is also the burst capacity
+    """
+
+    def __init__(self, per_minute):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now):
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def delay(self, amount, now):
+        """Seconds until amount can be taken (amounts above capacity wait for a full bucket)"""
+        self._refill(now)
+        missing = min(amount, self.capacity) - self.level
+        return max(0.0, missing / self.rate)
+
+    def take(self, amount, now):
+        self._refill(now)
+        self.level -= min(amount, self.capacity)
+
+
+class _Waiter:
+    def __init__(self, priority, caller, deadline, sequence):
+        self.priority = priority
+        self.caller = caller
+        self.deadline = deadline
+        self.sequence = sequence
+
+
+class ProviderScheduler:
+    """
+    Admission queue of one provider
+
+    Args:
+        name (str): Provider name, for messages
+        requests_per_minute (float): Request limit, 0 for none
+        tokens_per_minute (float): Token limit, 0 for none
+    """
+
+    def __init__(self, name, requests_per_minute=0, tokens_per_minute=0):
+        self.name = name
+        self.buckets = []
+        if requests_per_minute:
+            self.buckets.append(("requests", TokenBucket(requests_per_minute)))
+        if tokens_per_minute:
+            self.buckets.append(("tokens", TokenBucket(tokens_per_minute)))
+        self._condition = threading.Condition()
+        self._waiting = []
+        self._sequence = itertools.count()
+        # Tokens granted to each caller with requests queued; within a priority
+        # class the caller that received the least goes first
+        self._served = {}
+        self.stats = {priority: {"granted": 0, "timeouts": 0, "wait_total": 0.0} for priority in PRIORITIES}
+
+    def _head(self):
+        return min(self._waiting, key=lambda w: (PRIORITIES.index(w.priority), self._served[w.caller], w.sequence))
+
+    def _delay(self, tokens, now):
+        amounts = {"requests": 1, "tokens": tokens}
+        return max([bucket.delay(amounts[kind], now) for kind, bucket in self.buckets], default=0.0)
+
+    def acquire(self, tokens, priority="interactive", caller="default", timeout=30.0, cancelled=None):
+        """
+        Wait for a turn to send a request
+
+        Args:
+            tokens (int): Estimated tokens the request uses
+            priority (str): "interactive", "normal" or "background"
+            caller (str): Who is asking, for fair sharing within a priority
+            timeout (float): Seconds to wait at most
+            cancelled (threading.Event): Set, followed by wake(), to withdraw
+
+        Returns:
+            float: Seconds spent waiting
+
+        Raises:
+            QueueTimeout: If the request could not be sent within timeout
+        """
+        if priority not in PRIORITIES:
+            raise ValueError(f"Unknown LLM request priority: {priority}")
+        start = time.monotonic()
+        with self._condition:
+            # A caller returning after a pause catches up with the callers
+            # still waiting, so it cannot claim their share retroactively
+            active = [self._served[w.caller] for w in self._waiting if w.priority == priority]
+            self._served[caller] = max(self._served.get(caller, 0), min(active, default=0))
+            waiter = _Waiter(priority, caller, start + timeout, next(self._sequence))
+            self._waiting.append(waiter)
+            try:
+                while True:
+                    now = time.monotonic()
+                    if cancelled is not None and cancelled.is_set():
+                        raise QueueTimeout(f"{self.name} request cancelled while queued")
+                    wait = None
+                    if self._head() is waiter:
+                        wait = self._delay(tokens, now)
+                        if wait <= 0:
+                            for kind, bucket in self.buckets:
+                                bucket.take(1 if kind == "requests" else tokens, now)
+                            self._served[caller] += tokens
+                            waited = now - start
+                            self.stats[priority]["granted"] += 1
+                            self.stats[priority]["wait_total"] += waited
+                            return waited
+                    remaining = waiter.deadline - now
+                    if remaining <= 0:
+                        self.stats[priority]["timeouts"] += 1
+                        raise QueueTimeout(f"{self.name} request queue timed out after {timeout:g} s "
+                                           f"({len(self._waiting)} waiting)")
+                    self._condition.wait(remaining if wait is None else min(wait, remaining))
+            finally:
+                self._waiting.remove(waiter)
+                if not any(w.caller == caller for w in self._waiting):
+                    # Its next request catches up with the queue anyway
+                    del self._served[caller]
+                self._condition.notify_all()
+
+    def wake(self):
+        """Make every waiter re-check its state"""
+        with self._condition:
+            self._condition.notify_all()
+
+    def snapshot(self):
+        """Queue length and per-priority counters"""
+        with self._condition:
+            stats = {priority: dict(values, mean_wait=values["wait_total"] / values["granted"]
+                                    if values["granted"] else 0.0)
+                     for priority, values in self.stats.items()}
+            return {"waiting": len(self._waiting), "priorities": stats}
+
+
+class LLMScheduler:
+    """
+    Admission queues of every provider
+
+    Args:
+        limits (dict): Provider name to {"requests_per_minute": ..., "tokens_per_minute": ...}
+        timeouts (dict): Priority class to the longest wait in seconds
+    """
+
+    def __init__(self, limits, timeouts):
+        self.timeouts = timeouts
+        self.providers = {name: ProviderScheduler(name, **limit) for name, limit in limits.items()}
+
+    def acquire(self, name, tokens, priority="interactive", caller="default"):
+        """
+        Wait for a turn to send a request to a provider
+
+        Providers without configured limits are never queued.
+
+        Args:
+            name (str): Provider name
+            tokens (int): Estimated tokens the request uses
+            priority (str): "interactive", "normal" or "background"
+            caller (str): Who is asking, for fair sharing within a priority
+
+        Returns:
+            float: Seconds spent waiting
+
+        Raises:
+            QueueTimeout: If the priority's deadline passed while queued
+        """
+        scheduler = self.providers.get(name)
+        if scheduler is None:
+            return 0.0
+        return scheduler.acquire(tokens, priority, caller, self.timeouts.get(priority, 30.0))
+
+    async def aacquire(self, name, tokens, priority="interactive", caller="default"):
+        """acquire without blocking the event loop; cancelling the task leaves the queue"""
+        scheduler = self.providers.get(name)
+        if scheduler is None:
+            return 0.0
+        cancelled = threading.Event()
+        future = asyncio.get_running_loop().run_in_executor(
+            _executor, scheduler.acquire, tokens, priority, caller, self.timeouts.get(priority, 30.0), cancelled)
+        try:
+            return await future
+        except asyncio.CancelledError:
+            cancelled.set()
+            scheduler.wake()
+            raise
+
+    def stats(self):
+        """
+        Get the queue of every rate-limited provider
+
+        Returns:
+            dict: Per provider the number waiting and, per priority class,
+                requests granted, queue timeouts and mean wait in seconds
+        """
+        return {name: scheduler.snapshot() for name, scheduler in self.providers.items()}
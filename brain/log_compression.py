@@ -0,0 +1,149 @@
+"""
+Compressed storage for sealed event log segments
+Sealed segments are compressed with gzip, or zstd when the optional zstandard
+package is installed, and read back by decompressing them as a stream
+"""
+import gzip
+import os
+import shutil
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+COMPRESSION_METHODS = ("none", "gzip", "zstd")
+
+# File suffix added to a sealed segment by each compression method
+COMPRESSION_SUFFIXES = {"gzip": ".gz", "zstd": ".zst"}
+
+# Bytes pulled through the decompressor per read
+STREAM_CHUNK = 256 * 1024
+
+
+def resolve_compression(method):
+    """
+    Pick the compression method that can actually be used
+
+    Args:
+        method (str): "none", "gzip" or "zstd"
+
+    Returns:
+        str: The method, with zstd falling back to gzip if zstandard is missing
+    """
+    if method not in COMPRESSION_METHODS:
+        raise ValueError(f"Unknown log compression method: {method}")
+    if method == "zstd" and zstandard is None:
+        print("zstandard is not installed, compressing log segments with gzip")
+        return "gzip"
+    return method
+
+
+def is_compressed(path):
+    """Check whether a segment file is stored compressed"""
+    return path.endswith(tuple(COMPRESSION_SUFFIXES.values()))
+
+
+class _ForwardReader:
+    """
+    Minimal read/readline/seek file interface over a zstd decompression stream
+
+    Only forward seeks are supported, which is all segment reads need since
+    they visit lines in ascending order.
+    """
+
+    def __init__(self, path):
+        self._file = open(path, "rb")
+        self._stream = zstandard.ZstdDecompressor().stream_reader(self._file)
+        self._buffer = b""
+        self._position = 0
+
+    def tell(self):
+        return self._position
+
+    def seek(self, offset):
+        if offset < self._position:
+            raise OSError("Compressed log segments can only be read forwards")
+        skip = offset - self._position
+        if skip <= len(self._buffer):
+            self._buffer = self._buffer[skip:]
+        else:
+            self._stream.seek(offset)
+            self._buffer = b""
+        self._position = offset
+        return offset
+
+    def _fill(self):
+        chunk = self._stream.read(STREAM_CHUNK)
+        self._buffer += chunk
+        return bool(chunk)
+
+    def read(self, size=-1):
+        while (size < 0 or len(self._buffer) < size) and self._fill():
+            pass
+        if size < 0:
+            size = len(self._buffer)
+        data, self._buffer = self._buffer[:size], self._buffer[size:]
+        self._position += len(data)
+        return data
+
+    def readline(self):
+        searched = 0
+        while True:
+            cut = self._buffer.find(b"\n", searched)
+            if cut >= 0:
+                return self.read(cut + 1)
+            searched = len(self._buffer)
+            if not self._fill():
+                return self.read()
+
+    def close(self):
+        self._stream.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def open_segment(path):
+    """
+    Open a segment's text for binary reading, decompressing it as a stream
+
+    Compressed segments support forward seeks only; each one decompresses
+    and discards the data it skips.
+
+    Args:
+        path (str): Segment file, plain or compressed
+
+    Returns:
+        file: Object with read, readline, seek and tell
+    """
+    if path.endswith(COMPRESSION_SUFFIXES["gzip"]):
+        return gzip.open(path, "rb")
+    if path.endswith(COMPRESSION_SUFFIXES["zstd"]):
+        if zstandard is None:
+            raise OSError(f"zstandard is needed to read {path}")
+        return _ForwardReader(path)
+    return open(path, "rb")
+
+
+def compress_file(source, target, method):
+    """
+    Compress a sealed segment into a new file
+
+    Args:
+        source (str): Plain segment file
+        target (str): File to write
+        method (str): "gzip" or "zstd"
+    """
+    with open(source, "rb") as src, open(target, "wb") as dst:
+        if method == "zstd":
+            zstandard.ZstdCompressor(level=10).copy_stream(src, dst)
+        else:
+            with gzip.GzipFile(fileobj=dst, mode="wb", mtime=0) as stream:
+                shutil.copyfileobj(src, stream, STREAM_CHUNK)
+        dst.flush()
+        os.fsync(dst.fileno())
@@ -0,0 +1,128 @@
+"""
+Background batched writer for the JARVIS event log
+log_event hands records to a queue; a single writer thread appends them to
+the event store in batches so callers never wait on file I/O
+"""
+import queue
+import threading
+import time
+
+DURABILITY_POLICIES = ("none", "flush", "fsync")
+
+# Queue markers that are not log text
+_FLUSH = object()
+_STOP = object()
+
+
+class LogWriter:
+    """
+    Queue-backed writer that batches log records on a size or time threshold
+
+    Args:
+        store (EventStore): Store the batches are appended to
+        durability (str): "none", "flush" or "fsync" (see EventStore.append)
+        batch_size (int): Write as soon as this many records are waiting
+        flush_interval (float): Longest time in seconds a record waits in the queue
+    """
+
+    def __init__(self, store, durability="flush", batch_size=64, flush_interval=0.2):
+        if durability not in DURABILITY_POLICIES:
+            raise ValueError(f"Unknown log durability policy: {durability}")
+        self.store = store
+        self.durability = durability
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self._queue = queue.Queue()
+        self._condition = threading.Condition()
+        self._submitted = 0
+        self._written = 0
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="jarvis-log-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, text):
+        """
+        Queue log text for writing
+
+        Args:
+            text (str): One or more complete log lines
+        """
+        with self._condition:
+            if not self._closed:
+                self._submitted += 1
+                self._queue.put(text)
+                return
+        # After close() fall back to writing synchronously
+        self.store.append(text, self.durability)
+
+    def flush(self, timeout=None):
+        """
+        Wait until everything submitted so far has been written
+
+        The text is pushed to the OS regardless of the durability policy, so a
+        reader that calls this sees its own writes.
+
+        Args:
+            timeout (float): Maximum seconds to wait (None waits indefinitely)
+
+        Returns:
+            bool: True if all submitted records were written in time
+        """
+        with self._condition:
+            target = self._submitted
+            if self._written < target and self._thread.is_alive():
+                self._queue.put(_FLUSH)
+                self._condition.wait_for(lambda: self._written >= target or not self._thread.is_alive(),
+                                         timeout=timeout)
+            done = self._written >= target
+        self.store.sync()
+        return done
+
+    def close(self, timeout=5.0):
+        """
+        Write any queued records and stop the writer thread
+
+        Args:
+            timeout (float): Maximum seconds to wait for the thread
+        """
+        with self._condition:
+            if self._closed:
+                return
+            self._closed = True
+            self._queue.put(_STOP)
+        self._thread.join(timeout)
+        self.store.sync(fsync=self.durability == "fsync")
+        self.store.close()
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            item = self._queue.get()
+            if item is _STOP:
+                break
+            batch = [] if item is _FLUSH else [item]
+            deadline = time.monotonic() + self.flush_interval
+            while item is not _FLUSH and len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                if item is not _FLUSH:
+                    batch.append(item)
+            self._write(batch)
+
+    def _write(self, batch):
+        if batch:
+            try:
+                self.store.append("".join(batch), self.durability)
+            except Exception as e:
+                print(f"Error writing log batch: {e}")
+        with self._condition:
+            self._written += len(batch)
+            self._condition.notify_all()
@@ -1,9 +1,96 @@
+import atexit
 import datetime
 import json
 import os
+import sys
+import threading
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from brain.event_store import EventStore, TIMESTAMP_FORMAT, to_stamp
+from brain.log_writer import LogWriter
+from brain.rollups import merge_rollups
+from brain.sqlite_store import SqliteEventStore
+from config import (MEMORY_BACKEND, LOG_SEGMENT_MAX_BYTES, LOG_SEGMENT_MAX_AGE_HOURS, LOG_COMPRESSION,
+                    LOG_RETENTION_DAYS, LOG_RETENTION_MAX_BYTES, LOG_DURABILITY,
+                    LOG_BATCH_SIZE, LOG_FLUSH_INTERVAL)
 
 LOG_FILE = "data/jarvis_log.txt"
 
+_store = None
+_store_key = None
+_writer = None
+_writer_lock = threading.Lock()
+
+# Storage backends selectable with MEMORY_BACKEND; each factory takes the log
+# file path and returns a store with the EventStore query interface
+STORE_BACKENDS = {
+    "file": lambda log_file: EventStore(log_file, segment_max_bytes=LOG_SEGMENT_MAX_BYTES,
+                                        segment_max_age=LOG_SEGMENT_MAX_AGE_HOURS * 3600,
+                                        compression=LOG_COMPRESSION,
+                                        retention_age=LOG_RETENTION_DAYS * 86400,
+                                        retention_max_bytes=LOG_RETENTION_MAX_BYTES),
+    "sqlite": lambda log_file: SqliteEventStore(os.path.splitext(log_file)[0] + ".db"),
+}
+
+def get_store():
+    """
+    Get the event store for the current LOG_FILE and MEMORY_BACKEND
+    
+    Returns:
+        EventStore: Store shared by all memory functions in this process
+    """
+    global _store, _store_key
+    if _store is None or _store_key != (MEMORY_BACKEND, LOG_FILE):
+        if MEMORY_BACKEND not in STORE_BACKENDS:
+            raise ValueError(f"Unknown memory backend: {MEMORY_BACKEND}")
+        os.makedirs(os.path.dirname(LOG_FILE) or ".", exist_ok=True)
+        _store = STORE_BACKENDS[MEMORY_BACKEND](LOG_FILE)
+        _store_key = (MEMORY_BACKEND, LOG_FILE)
+    return _store
+
+def get_writer():
+    """
+    Get the background writer feeding the event store
+    
+    Returns:
+        LogWriter: Writer shared by all log_event calls in this process
+    """
+    global _writer
+    with _writer_lock:
+        store = get_store()
+        if _writer is None or _writer.store is not store:
+            if _writer is not None:
+                _writer.close()
+            _writer = LogWriter(store, durability=LOG_DURABILITY,
+                                batch_size=LOG_BATCH_SIZE,
+                                flush_interval=LOG_FLUSH_INTERVAL)
+        return _writer
+
+def flush_log(timeout=None):
+    """
+    Wait until every event logged so far is written to the log file
+    
+    Args:
+        timeout (float): Maximum seconds to wait (None waits indefinitely)
+    """
+    if _writer is not None:
+        _writer.flush(timeout)
+
+def shutdown_logging():
+    """
+    Write any queued events and stop the background log writer
+    
+    Events logged afterwards are written synchronously.
+    """
+    with _writer_lock:
+        if _writer is not None:
+            _writer.close()
+
+atexit.register(shutdown_logging)
+
+def _event_content(line):
+    """Extract the content part of a log line"""
+    return line.split(")", 1)[1].strip()
+
 def log_event(event_type, content):
     """
     Log an event to the JARVIS log file
@@ -12,9 +99,11 @@ def log_event(event_type, content):
         event_type (str): Type of event (USER_COMMAND, ACTION, LLM_QUERY, etc.)
         content (str): The content of the event
     """
-    with open(LOG_FILE, "a", encoding="utf-8") as f:
-        timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        f.write(f"[{timestamp}] ({event_type}) {content}\n")
+    writer = get_writer()
+    # Stamp and queue under one lock so the log stays in time order
+    with _writer_lock:
+        timestamp = datetime.datetime.now().strftime(TIMESTAMP_FORMAT)
+        writer.submit(f"[{timestamp}] ({event_type}) {content}\n")
 
 def get_last_n_events(n=10):
     """
@@ -26,16 +115,13 @@ def get_last_n_events(n=10):
     Returns:
         str: The last n events as a string
     """
-    try:
-        with open(LOG_FILE, "r", encoding="utf-8") as f:
-            lines = f.readlines()
-            return "".join(lines[-n:]) if lines else ""
-    except FileNotFoundError:
-        # Create the file if it doesn't exist
-        os.makedirs(os.path.dirname(LOG_FILE), exist_ok=True)
-        with open(LOG_FILE, "w", encoding="utf-8") as f:
-            f.write("")
+    flush_log()
+    store = get_store()
+    if not store.exists():
+        # Create the log if it doesn't exist
+        store.create()
         return ""
+    return "".join(store.tail(n)) if n > 0 else ""
 
 def get_events_by_timeframe(minutes=5):
     """
@@ -47,31 +133,31 @@ def get_events_by_timeframe(minutes=5):
     Returns:
         str: Events in the specified timeframe
     """
-    try:
-        with open(LOG_FILE, "r", encoding="utf-8") as f:
-            lines = f.readlines()
-            if not lines:
-                return ""
-                
-            now = datetime.datetime.now()
-            cutoff_time = now - datetime.timedelta(minutes=minutes)
-            
-            recent_events = []
-            for line in lines:
-                try:
-                    # Extract timestamp from log line
-                    timestamp_str = line.split(']')[0].replace('[', '')
-                    timestamp = datetime.datetime.strptime(timestamp_str, "%Y-%m-%d %H:%M:%S")
-                    
-                    if timestamp >= cutoff_time:
-                        recent_events.append(line)
-                except (ValueError, IndexError):
-                    # Skip lines with invalid format
-                    continue
-                    
-            return "".join(recent_events)
-    except FileNotFoundError:
+    return get_events_between(datetime.datetime.now() - datetime.timedelta(minutes=minutes))
+
+def get_events_between(start=None, end=None, event_type=None):
+    """
+    Get events logged between two points in time
+    
+    Args:
+        start (datetime.datetime): Inclusive start (None for the beginning of the log)
+        end (datetime.datetime): Exclusive end (None for now)
+        event_type (str): Only return events of this type (None for all)
+        
+    Returns:
+        str: Matching event lines, oldest first
+    """
+    flush_log()
+    if not get_store().exists():
         return ""
+    
+    # Log timestamps have whole-second precision, so round the bounds up
+    def stamp(moment):
+        if moment is None:
+            return None
+        return to_stamp(moment.replace(microsecond=0)) + (1 if moment.microsecond else 0)
+    
+    return "".join(get_store().between(stamp(start), stamp(end), event_type=event_type))
 
 def get_events_by_type(event_type, limit=10):
     """
@@ -82,53 +168,45 @@ def get_events_by_type(event_type, limit=10):
         limit (int): Maximum number of events to return
         
     Returns:
-        list: List of matching event contents
-    """
-    try:
-        with open(LOG_FILE, "r", encoding="utf-8") as f:
-            lines = f.readlines()
-            
-            matching_events = []
-            for line in reversed(lines):  # Start from most recent
-                if f"({event_type})" in line:
-                    # Extract the content part
-                    try:
-                        content = line.split(")", 1)[1].strip()
-                        matching_events.append(content)
-                        if len(matching_events) >= limit:
-                            break
-                    except IndexError:
-                        continue
-                    
-            return matching_events
-    except FileNotFoundError:
+        list: List of matching event contents, most recent first
+    """
+    flush_log()
+    if not get_store().exists():
         return []
+    return [_event_content(line) for line in get_store().by_type(event_type, limit)]
 
-def search_memory(query, limit=10):
+def search_memory(query, limit=10, event_type=None, match_all_terms=False):
     """
     Search memory for events containing the query string
     
     Args:
         query (str): Search term
         limit (int): Maximum number of events to return
+        event_type (str): Only return events of this type (None for all)
+        match_all_terms (bool): Match events containing every word of the
+            query in any order instead of the exact query string
         
     Returns:
-        list: List of matching log lines
-    """
-    try:
-        with open(LOG_FILE, "r", encoding="utf-8") as f:
-            lines = f.readlines()
-            
-            matches = []
-            for line in reversed(lines):  # Start from most recent
-                if query.lower() in line.lower():
-                    matches.append(line.strip())
-                    if len(matches) >= limit:
-                        break
-                    
-            return matches
-    except FileNotFoundError:
+        list: List of matching log lines, most recent first
+    """
+    flush_log()
+    if not get_store().exists():
         return []
+    matches = get_store().search(query, limit, event_type=event_type, all_terms=match_all_terms)
+    return [line.strip() for line in matches]
+
+# Event types counted by summarize_day and summarize_range
+SUMMARY_TYPES = ["USER_COMMAND", "LLM_QUERY", "ACTION", "SPEECH_OUTPUT", "VISION_ACTION", "LEARNING", "ERROR"]
+
+def _build_summary(record):
+    """Turn a day rollup record into the summary dictionary"""
+    summary = {event_type: record["types"].get(event_type, 0) for event_type in SUMMARY_TYPES}
+    summary["total_events"] = record["total"]
+    summary["examples"] = {
+        "USER_COMMAND": record["examples"].get("USER_COMMAND", [])[:3],
+        "ACTION": record["examples"].get("ACTION", [])[:3]
+    }
+    return summary
 
 def summarize_day(date=None):
     """
@@ -142,48 +220,35 @@ def summarize_day(date=None):
     """
     if date is None:
         date = datetime.datetime.now().date()
+    
+    flush_log()
+    if not get_store().exists():
+        return {"total_events": 0, "error": "No log file found"}
+    
+    key = date.isoformat()
+    return _build_summary(get_store().day_rollups([key])[key])
+
+def summarize_range(start_date, end_date=None):
+    """
+    Summarize events over a range of days
+    
+    Args:
+        start_date (datetime.date): First day to include
+        end_date (datetime.date): Last day to include (None for today)
         
-    date_str = date.strftime("%Y-%m-%d")
-    
-    try:
-        with open(LOG_FILE, "r", encoding="utf-8") as f:
-            lines = f.readlines()
-            
-            summary = {
-                "USER_COMMAND": 0,
-                "LLM_QUERY": 0,
-                "ACTION": 0,
-                "SPEECH_OUTPUT": 0,
-                "VISION_ACTION": 0,
-                "LEARNING": 0,
-                "ERROR": 0,
-                "total_events": 0
-            }
-            
-            # Track some example events
-            examples = {
-                "USER_COMMAND": [],
-                "ACTION": []
-            }
-            
-            for line in lines:
-                if date_str in line:
-                    summary["total_events"] += 1
-                    
-                    # Count by event type
-                    for event_type in summary.keys():
-                        if f"({event_type})" in line:
-                            summary[event_type] += 1
-                            
-                            # Save a few examples
-                            if event_type in examples and len(examples[event_type]) < 3:
-                                try:
-                                    content = line.split(")", 1)[1].strip()
-                                    examples[event_type].append(content)
-                                except:
-                                    pass
-            
-            summary["examples"] = examples
-            return summary
-    except FileNotFoundError:
-        return {"total_events": 0, "error": "No log file found"}
\ No newline at end of file
+    Returns:
+        dict: Combined summary of the range, plus the number of days covered
+    """
+    if end_date is None:
+        end_date = datetime.datetime.now().date()
+    
+    flush_log()
+    if not get_store().exists():
+        return {"total_events": 0, "error": "No log file found"}
+    
+    keys = [(start_date + datetime.timedelta(days=offset)).isoformat()
+            for offset in range((end_date - start_date).days + 1)]
+    records = get_store().day_rollups(keys)
+    summary = _build_summary(merge_rollups(records[key] for key in keys))
+    summary["days"] = len(keys)
+    return summary
@@ -0,0 +1,238 @@
+"""
+Health tracking for the LLM providers
+Keeps an EWMA of each provider's latency and error rate, honours rate limits,
+opens a circuit breaker after repeated failures and probes it again in the
+background, so queries go to the fastest healthy provider first
+"""
+import threading
+import time
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import (LLM_BREAKER_FAILURES, LLM_BREAKER_COOLDOWN, LLM_HEALTH_ALPHA,
+                    LLM_RATE_LIMIT_BACKOFF)
+
+# Circuit breaker states
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# An open breaker's cooldown doubles after every failed probe, up to this factor
+MAX_COOLDOWN_FACTOR = 16
+
+PROBE_PROMPT = "Reply with the single word OK."
+
+
+class ProviderError(Exception):
+    """
+    Error response from a provider API
+
+    Args:
+        message (str): Error description
+        status (int): HTTP status code
+        retry_after (str): Retry-After header of the response, if any
+    """
+
+    def __init__(self, message, status=None, retry_after=None):
+        super().__init__(message)
+        self.status = status
+        self.retry_after = retry_after
+
+
+class ProviderNotConfigured(ValueError):
+    """Raised when a provider cannot be used at all, e.g. its API key is not set"""
+
+
+class QueueTimeout(Exception):
+    """Raised when a request waited too long for the provider's local rate limit"""
+
+
+class ProviderHealth:
+    """Health record of one provider"""
+
+    def __init__(self, name, function):
+        self.name = name
+        self.function = function
+        self.latency = None
+        self.error_rate = 0.0
+        self.successes = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.rate_limited_until = 0.0
+        self.state = CLOSED
+        self.opened_at = 0.0
+        self.cooldown = LLM_BREAKER_COOLDOWN
+        self.last_error = None
+
+    def available(self, now):
+        """Check whether ordinary queries should be sent to the provider"""
+        return self.state == CLOSED and now >= self.rate_limited_until
+
+    def score(self):
+        """Expected seconds until this provider returns a good answer; lower is better"""
+        # Untried providers score 0 so they keep their configured position
+        # until they have a latency of their own
+        return (self.latency or 0.0) / max(1.0 - self.error_rate, 0.05)
+
+
+class HealthRegistry:
+    """
+    Scoreboard and circuit breakers for a set of providers
+
+    Args:
+        probe_prompt (str): Prompt sent when probing an open breaker
+    """
+
+    def __init__(self, probe_prompt=PROBE_PROMPT):
+        self.probe_prompt = probe_prompt
+        self.providers = {}
+        self._condition = threading.Condition()
+        self._prober = None
+
+    def register(self, name, function):
+        """
+        Add a provider, keeping the order of registration as its preference
+
+        Args:
+            name (str): Provider name
+            function (callable): Takes a prompt, returns the response text
+        """
+        with self._condition:
+            if name not in self.providers:
+                self.providers[name] = ProviderHealth(name, function)
+
+    def ordered(self):
+        """
+        Get the providers to try, best first
+
+        Available providers are sorted by score; providers behind an open
+        breaker or a rate limit come last, as a last resort.
+
+        Returns:
+            list: (name, function) pairs
+        """
+        now = time.monotonic()
+        with self._condition:
+            health = list(self.providers.values())
+            ready = sorted((h for h in health if h.available(now)), key=ProviderHealth.score)
+            held = [h for h in health if not h.available(now)]
+        return [(h.name, h.function) for h in ready + held]
+
+    def _sample(self, health, latency, failed):
+        alpha = LLM_HEALTH_ALPHA
+        health.error_rate = (1 - alpha) * health.error_rate + alpha * (1.0 if failed else 0.0)
+        if latency is not None:
+            health.latency = latency if health.latency is None else (1 - alpha) * health.latency + alpha * latency
+
+    def record_success(self, name, latency):
+        """
+        Record a successful call
+
+        Args:
+            name (str): Provider name
+            latency (float): Seconds the call took
+        """
+        with self._condition:
+            health = self.providers.get(name)
+            if health is None:
+                return
+            self._sample(health, latency, failed=False)
+            health.successes += 1
+            health.consecutive_failures = 0
+            if health.state != CLOSED:
+                health.state = CLOSED
+                health.cooldown = LLM_BREAKER_COOLDOWN
+
+    def record_failure(self, name, error):
+        """
+        Record a failed call, opening the breaker or noting a rate limit
+
+        Args:
+            name (str): Provider name
+            error (Exception): What went wrong
+        """
+        with self._condition:
+            health = self.providers.get(name)
+            # Timing out in our own queue says nothing about the provider
+            if health is None or isinstance(error, QueueTimeout):
+                return
+            now = time.monotonic()
+            # Failures are often instant, so they only count towards the error rate
+            self._sample(health, None, failed=True)
+            health.failures += 1
+            health.consecutive_failures += 1
+            health.last_error = str(error)
+            if getattr(error, "status", None) == 429:
+                try:
+                    backoff = float(error.retry_after)
+                except (TypeError, ValueError):
+                    backoff = LLM_RATE_LIMIT_BACKOFF
+                health.rate_limited_until = now + backoff
+                if health.state != HALF_OPEN:
+                    return
+            if health.state == HALF_OPEN:
+                health.cooldown = min(health.cooldown * 2, LLM_BREAKER_COOLDOWN * MAX_COOLDOWN_FACTOR)
+            if (isinstance(error, ProviderNotConfigured) or health.state == HALF_OPEN
+                    or health.consecutive_failures >= LLM_BREAKER_FAILURES):
+                health.state = OPEN
+                health.opened_at = now
+                self._start_prober()
+
+    def _start_prober(self):
+        self._condition.notify_all()
+        if self._prober is None or not self._prober.is_alive():
+            self._prober = threading.Thread(target=self._probe_loop, name="jarvis-llm-prober", daemon=True)
+            self._prober.start()
+
+    def _probe_loop(self):
+        """Half-open each open breaker once its cooldown passed and probe it"""
+        while True:
+            with self._condition:
+                while True:
+                    now = time.monotonic()
+                    opened = [h for h in self.providers.values() if h.state == OPEN]
+                    if not opened:
+                        self._prober = None
+                        return
+                    due = min(opened, key=lambda h: h.opened_at + h.cooldown)
+                    wait = due.opened_at + due.cooldown - now
+                    if wait <= 0:
+                        break
+                    self._condition.wait(wait)
+                due.state = HALF_OPEN
+            start = time.perf_counter()
+            try:
+                due.function(self.probe_prompt)
+            except Exception as e:
+                self.record_failure(due.name, e)
+            else:
+                self.record_success(due.name, time.perf_counter() - start)
+
+    def scoreboard(self):
+        """
+        Get the health of every provider, best first
+
+        Returns:
+            list: One dict per provider with its state, EWMA latency and
+                error rate, call counts, rate limit and last error
+        """
+        now = time.monotonic()
+        order = [name for name, _ in self.ordered()]
+        with self._condition:
+            board = []
+            for name in order:
+                h = self.providers[name]
+                board.append({
+                    "provider": name,
+                    "state": h.state,
+                    "available": h.available(now),
+                    "latency": h.latency,
+                    "error_rate": h.error_rate,
+                    "successes": h.successes,
+                    "failures": h.failures,
+                    "consecutive_failures": h.consecutive_failures,
+                    "rate_limited_for": max(0.0, h.rate_limited_until - now),
+                    "retry_in": max(0.0, h.opened_at + h.cooldown - now) if h.state == OPEN else 0.0,
+                    "last_error": h.last_error,
+                })
+            return board
@@ -0,0 +1,180 @@
+"""
+On-disk cache of LLM responses
+Responses are stored in a SQLite database keyed on the normalized prompt,
+system message and model, with a per-entry TTL and LRU eviction; WAL mode
+lets several JARVIS processes share it
+"""
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    response TEXT NOT NULL,
+    created REAL NOT NULL,
+    expires REAL NOT NULL,
+    last_used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS responses_last_used ON responses (last_used);
+CREATE TABLE IF NOT EXISTS counters (
+    name TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO counters (name, value) VALUES ('hits', 0), ('misses', 0), ('evictions', 0);
+"""
+
+# Prompts whose answer depends on when they are asked are never cached
+TIME_SENSITIVE_RE = re.compile(
+    r"\b(now|today|tonight|tomorrow|yesterday|current(ly)?|latest|recent|news|weather|"
+    r"forecast|time|date|day|week|month|year|price|stock|score)\b", re.IGNORECASE)
+
+WHITESPACE_RE = re.compile(r"\s+")
+
+
+def normalize_prompt(text):
+    """
+    Normalize a prompt so trivially different phrasings share a cache entry
+
+    Args:
+        text (str): Prompt as spoken or typed
+
+    Returns:
+        str: Lowercased prompt with collapsed whitespace and no trailing punctuation
+    """
+    return WHITESPACE_RE.sub(" ", text).strip().lower().rstrip(" .!?")
+
+
+def is_time_sensitive(prompt):
+    """Check whether a prompt asks about something that changes over time"""
+    return bool(TIME_SENSITIVE_RE.search(prompt))
+
+
+def cache_key(prompt, system_message, model):
+    """
+    Build the cache key of a query
+
+    Args:
+        prompt (str): User prompt
+        system_message (str): System message sent with it
+        model (str): Model, or models, that may answer it
+
+    Returns:
+        str: Hex digest identifying the query
+    """
+    parts = [normalize_prompt(prompt), WHITESPACE_RE.sub(" ", system_message).strip(), model]
+    return hashlib.sha256(json.dumps(parts).encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """
+    TTL and LRU bounded response cache in SQLite
+
+    Args:
+        path (str): Database file
+        ttl (float): Seconds an entry stays valid
+        max_entries (int): Entries kept before the least recently used are evicted
+    """
+
+    def __init__(self, path, ttl=24 * 3600, max_entries=1000):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.lock = threading.Lock()
+        self._connection = None
+
+    def _db(self):
+        if self._connection is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            connection = sqlite3.connect(self.path, timeout=10.0, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.executescript(SCHEMA)
+            self._connection = connection
+        return self._connection
+
+    def get(self, prompt, system_message, model):
+        """
+        Look up a cached response
+
+        Args:
+            prompt (str): User prompt
+            system_message (str): System message sent with it
+            model (str): Model, or models, that may answer it
+
+        Returns:
+            str: The cached response or None on a miss
+        """
+        key = cache_key(prompt, system_message, model)
+        now = time.time()
+        try:
+            with self.lock:
+                connection = self._db()
+                with connection:
+                    row = connection.execute("SELECT response FROM responses WHERE key = ? AND expires > ?",
+                                             (key, now)).fetchone()
+                    if row:
+                        connection.execute("UPDATE responses SET last_used = ? WHERE key = ?", (now, key))
+                    connection.execute("UPDATE counters SET value = value + 1 WHERE name = ?",
+                                       ("hits" if row else "misses",))
+        except sqlite3.Error as e:
+            print(f"Error reading LLM response cache: {e}")
+            return None
+        return row[0] if row else None
+
+    def put(self, prompt, system_message, model, response):
+        """
+        Store a response, evicting expired and least recently used entries
+
+        Args:
+            prompt (str): User prompt
+            system_message (str): System message sent with it
+            model (str): Model, or models, that may answer it
+            response (str): Response to cache
+        """
+        key = cache_key(prompt, system_message, model)
+        now = time.time()
+        try:
+            with self.lock:
+                connection = self._db()
+                with connection:
+                    connection.execute("INSERT OR REPLACE INTO responses (key, response, created, expires, last_used)"
+                                       " VALUES (?, ?, ?, ?, ?)", (key, response, now, now + self.ttl, now))
+                    evicted = connection.execute("DELETE FROM responses WHERE expires <= ?", (now,)).rowcount
+                    count = connection.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+                    if count > self.max_entries:
+                        evicted += connection.execute(
+                            "DELETE FROM responses WHERE key IN"
+                            " (SELECT key FROM responses ORDER BY last_used LIMIT ?)",
+                            (count - self.max_entries,)).rowcount
+                    if evicted:
+                        connection.execute("UPDATE counters SET value = value + ? WHERE name = 'evictions'",
+                                           (evicted,))
+        except sqlite3.Error as e:
+            print(f"Error writing LLM response cache: {e}")
+
+    def stats(self):
+        """
+        Get the cache counters, shared by every process using the cache
+
+        Returns:
+            dict: hits, misses, evictions, entries and the hit rate
+        """
+        with self.lock:
+            connection = self._db()
+            stats = dict(connection.execute("SELECT name, value FROM counters").fetchall())
+            stats["entries"] = connection.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+        return stats
+
+    def clear(self):
+        """Remove every cached response"""
+        with self.lock:
+            connection = self._db()
+            with connection:
+                connection.execute("DELETE FROM responses")
@@ -0,0 +1,202 @@
+"""
+Daily event rollups for the JARVIS memory system
+Per-day event counters and a few example events are maintained as lines are
+indexed, so day and date range summaries never have to scan the log
+"""
+import datetime
+import functools
+import json
+import os
+
+# Bumped whenever the on-disk layout changes so old files are rebuilt
+ROLLUP_VERSION = 1
+
+# Example events kept per event type and day
+EXAMPLE_LIMIT = 3
+
+EPOCH_DATE = datetime.date(1970, 1, 1)
+
+
+def day_key(stamp):
+    """
+    Get the rollup key of the day an index timestamp falls on
+
+    Args:
+        stamp (int): Seconds since the index epoch
+
+    Returns:
+        str: Date as YYYY-MM-DD
+    """
+    return _day_number_key(stamp // 86400)
+
+
+@functools.lru_cache(maxsize=4096)
+def _day_number_key(day_number):
+    return (EPOCH_DATE + datetime.timedelta(days=day_number)).isoformat()
+
+
+def empty_rollup():
+    """Create an empty day record"""
+    return {"total": 0, "types": {}, "examples": {}}
+
+
+def merge_rollups(records):
+    """
+    Combine day records, keeping the earliest examples first
+
+    Args:
+        records (iterable): Day records in time order
+
+    Returns:
+        dict: A single record with summed counters
+    """
+    merged = empty_rollup()
+    for record in records:
+        merged["total"] += record["total"]
+        for event_type, count in record["types"].items():
+            merged["types"][event_type] = merged["types"].get(event_type, 0) + count
+        for event_type, examples in record["examples"].items():
+            kept = merged["examples"].setdefault(event_type, [])
+            kept.extend(examples[:EXAMPLE_LIMIT - len(kept)])
+    return merged
+
+
+def _write_json(path, data):
+    temp_path = path + ".tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+    os.replace(temp_path, path)
+
+
+class DayCounter:
+    """
+    Per-day counters for the lines of one log segment
+
+    Args:
+        path (str): File the counters are saved to
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.days = {}
+        self.count = 0
+        self.unsaved = 0
+
+    def reset(self):
+        """Forget every counted line"""
+        self.days = {}
+        self.count = 0
+        self.unsaved = 0
+
+    def load(self, max_lines):
+        """
+        Load saved counters if they are usable for a segment of max_lines lines
+
+        Args:
+            max_lines (int): Number of lines currently in the segment's line index
+
+        Returns:
+            int: Number of lines covered by the loaded counters
+        """
+        self.reset()
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data["version"] == ROLLUP_VERSION and data["count"] <= max_lines:
+                self.days = data["days"]
+                self.count = data["count"]
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"Rebuilding day rollups {self.path}: {e}")
+        return self.count
+
+    def save(self):
+        """Write the counters atomically next to their segment"""
+        _write_json(self.path, {"version": ROLLUP_VERSION, "count": self.count, "days": self.days})
+        self.unsaved = 0
+
+    def add(self, line_no, stamp, event_type, line):
+        """
+        Count one line
+
+        Args:
+            line_no (int): Line number within the segment (must be increasing)
+            stamp (int): Timestamp of the line's event
+            event_type (str): Event type, None for continuation lines
+            line (bytes): Raw line, used for the first few examples only
+        """
+        self.count = line_no + 1
+        self.unsaved += 1
+        if event_type is None:
+            return
+        record = self.days.get(day_key(stamp))
+        if record is None:
+            record = self.days[day_key(stamp)] = empty_rollup()
+        record["total"] += 1
+        record["types"][event_type] = record["types"].get(event_type, 0) + 1
+        examples = record["examples"].setdefault(event_type, [])
+        if len(examples) < EXAMPLE_LIMIT:
+            try:
+                examples.append(line.split(b")", 1)[1].decode("utf-8", "replace").strip())
+            except IndexError:
+                pass
+
+
+class RollupArchive:
+    """
+    Immutable day records for days that are over
+
+    Once a day has passed its merged record never changes, so it is stored
+    here and served without touching any segment, even after the segments
+    holding that day were removed.
+
+    Args:
+        path (str): JSON file holding the archived records
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.records = None
+
+    def _load(self):
+        if self.records is None:
+            self.records = {}
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                if data.get("version") == ROLLUP_VERSION:
+                    self.records = data["days"]
+            except FileNotFoundError:
+                pass
+            except Exception as e:
+                print(f"Error reading rollup archive: {e}")
+
+    def get(self, key):
+        """
+        Get the archived record of a day
+
+        Args:
+            key (str): Date as YYYY-MM-DD
+
+        Returns:
+            dict: The day record or None if it was not archived yet
+        """
+        self._load()
+        return self.records.get(key)
+
+    def freeze(self, records):
+        """
+        Archive finished days
+
+        Args:
+            records (dict): Day records keyed by YYYY-MM-DD
+        """
+        self._load()
+        # Pick up days archived by another process before rewriting the file
+        current = self.records
+        self.records = None
+        self._load()
+        self.records.update(current)
+        self.records.update(records)
+        _write_json(self.path, {"version": ROLLUP_VERSION, "days": self.records})
@@ -0,0 +1,370 @@
+"""
+Warm worker processes for running learned code
+Learned solutions are LLM-written code, so instead of exec'ing them inside
+the assistant they run in a small pool of worker processes started ahead of
+time with the usual automation modules already imported. Each job has a
+wall-clock limit, after which its worker is killed and replaced, and a
+memory limit on what it may allocate beyond the warm worker's own use; its
+outcome comes back to the caller as a result dict.
+
+Workers are plain subprocesses running this file, so they do not re-import
+main.py the way multiprocessing's spawn would. Jobs and results travel as
+pickles over the worker's stdin and stdout; the learned code's own output
+goes to stderr.
+"""
+import concurrent.futures
+import importlib
+import marshal
+import os
+import pickle
+import queue
+import subprocess
+import sys
+import threading
+import time
+
+# POSIX memory limits
+try:
+    import resource
+except ImportError:
+    resource = None
+
+# Windows memory limits, through a job object (pywin32)
+try:
+    import win32api
+    import win32job
+    import win32process
+except ImportError:
+    win32job = None
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules imported by every worker before it takes jobs, and visible to the code
+PRELOAD = ("os", "sys", "re", "json", "time", "datetime", "subprocess", "webbrowser",
+           "pyautogui", "utils.mouse_control")
+
+# Seconds a new worker may take to import PRELOAD
+START_TIMEOUT = 60.0
+
+
+class _Worker:
+    """One warm worker process and the thread reading its results"""
+
+    def __init__(self, preload):
+        self.process = subprocess.Popen([sys.executable, os.path.abspath(__file__), *preload],
+                                        stdin=subprocess.PIPE, stdout=subprocess.PIPE, cwd=PROJECT_DIR)
+        self.results = queue.Queue()
+        threading.Thread(target=self._read, name="jarvis-sandbox-reader", daemon=True).start()
+
+    def _read(self):
+        try:
+            while True:
+                self.results.put(pickle.load(self.process.stdout))
+        except (EOFError, OSError, pickle.UnpicklingError):
+            # The worker exited; None tells the waiting caller
+            self.results.put(None)
+
+    def send(self, job):
+        pickle.dump(job, self.process.stdin)
+        self.process.stdin.flush()
+
+    def kill(self):
+        try:
+            self.process.kill()
+            self.process.wait(5.0)
+        except (OSError, subprocess.TimeoutExpired):
+            pass
+
+
+class SandboxPool:
+    """
+    Pool of warm worker processes that run compiled learned code
+
+    Args:
+        size (int): Worker processes kept running
+        timeout (float): Default wall-clock limit of a job in seconds
+        memory_limit_mb (float): Default memory a job may allocate, in MB
+            beyond what the warm worker already uses (0 for no limit)
+        preload (tuple): Modules every worker imports up front
+    """
+
+    def __init__(self, size=2, timeout=10.0, memory_limit_mb=256, preload=PRELOAD):
+        self.size = max(1, size)
+        self.timeout = timeout
+        self.memory_limit_mb = memory_limit_mb
+        self.preload = tuple(preload)
+        self.lock = threading.Lock()
+        self._idle = queue.Queue()
+        self._workers = set()
+        # Workers started but not ready yet, so close() can stop them too
+        self._starting = set()
+        self._started = False
+        self._closed = False
+        self._executor = None
+        self._stats = {"jobs": 0, "ok": 0, "errors": 0, "timeouts": 0, "crashes": 0, "restarts": 0}
+
+    def start(self):
+        """Start the workers in the background; returns at once"""
+        with self.lock:
+            if self._started or self._closed:
+                return
+            self._started = True
+        for _ in range(self.size):
+            self._replace()
+
+    def _replace(self):
+        """Start a worker in the background and make it idle once it is ready"""
+        threading.Thread(target=self._spawn, name="jarvis-sandbox-spawn", daemon=True).start()
+
+    def _spawn(self):
+        with self.lock:
+            if self._closed:
+                return
+            try:
+                worker = _Worker(self.preload)
+            except OSError as e:
+                print(f"Error starting sandbox worker: {e}")
+                return
+            self._starting.add(worker)
+        try:
+            ready = worker.results.get(timeout=START_TIMEOUT)
+        except queue.Empty:
+            ready = None
+        with self.lock:
+            self._starting.discard(worker)
+            if ready is None or self._closed:
+                if not self._closed:
+                    print("Error starting sandbox worker: it did not become ready")
+                worker.kill()
+                return
+            self._workers.add(worker)
+        self._idle.put(worker)
+
+    def _retire(self, worker, replace=True):
+        """Kill a worker that timed out or died, starting another in its place"""
+        worker.kill()
+        with self.lock:
+            self._workers.discard(worker)
+            replace = replace and not self._closed
+            if replace:
+                self._stats["restarts"] += 1
+        if replace:
+            self._replace()
+
+    def run(self, code, handlers=(), timeout=None, memory_limit_mb=None):
+        """
+        Run compiled code in a worker and wait for the outcome
+
+        The code runs with its own namespace holding the preloaded modules;
+        afterwards the first name in handlers it bound to a callable is called.
+
+        Args:
+            code (code): Compiled module-level code
+            handlers (list): Handler function names to look for, in order
+            timeout (float): Wall-clock limit in seconds, including the wait
+                for a free worker (None for the pool default)
+            memory_limit_mb (float): Memory limit in MB (None for the pool default)
+
+        Returns:
+            dict: status ("ok", "error", "timeout" or "crashed"), the handler
+                called, the error message and the seconds the job took
+        """
+        timeout = self.timeout if timeout is None else timeout
+        memory_limit_mb = self.memory_limit_mb if memory_limit_mb is None else memory_limit_mb
+        started = time.perf_counter()
+        self.start()
+        with self.lock:
+            self._stats["jobs"] += 1
+
+        try:
+            worker = self._idle.get(timeout=timeout)
+        except queue.Empty:
+            return self._result("timeout", f"no sandbox worker free within {timeout:g} s", started)
+
+        memory = int(memory_limit_mb * 1024 * 1024) if memory_limit_mb else None
+        try:
+            worker.send((marshal.dumps(code), list(handlers), memory))
+            result = worker.results.get(timeout=max(0.0, timeout - (time.perf_counter() - started)))
+        except (OSError, ValueError) as e:
+            self._retire(worker)
+            return self._result("crashed", f"sandbox worker unreachable: {e}", started)
+        except queue.Empty:
+            self._retire(worker)
+            return self._result("timeout", f"learned code ran longer than {timeout:g} s", started)
+
+        if result is None:
+            self._retire(worker)
+            return self._result("crashed", "sandbox worker exited during the job", started)
+        self._idle.put(worker)
+        return self._result(result["status"], result["error"], started, result["handler"])
+
+    def submit(self, code, handlers=(), timeout=None, memory_limit_mb=None):
+        """
+        Run compiled code in a worker without waiting
+
+        Args:
+            code (code): Compiled module-level code
+            handlers (list): Handler function names to look for, in order
+            timeout (float): Wall-clock limit in seconds (None for the pool default)
+            memory_limit_mb (float): Memory limit in MB (None for the pool default)
+
+        Returns:
+            concurrent.futures.Future: Resolves to the result dict of run()
+        """
+        with self.lock:
+            if self._executor is None:
+                self._executor = concurrent.futures.ThreadPoolExecutor(
+                    max_workers=self.size, thread_name_prefix="jarvis-sandbox")
+            executor = self._executor
+        return executor.submit(self.run, code, handlers, timeout, memory_limit_mb)
+
+    def _result(self, status, error, started, handler=None):
+        with self.lock:
+            key = {"ok": "ok", "timeout": "timeouts", "crashed": "crashes"}.get(status, "errors")
+            self._stats[key] += 1
+        return {"status": status, "handler": handler, "error": error,
+                "seconds": time.perf_counter() - started}
+
+    def close(self):
+        """Stop every worker"""
+        with self.lock:
+            self._closed = True
+            workers = list(self._workers)
+            self._workers.clear()
+            starting = list(self._starting)
+            self._starting.clear()
+            while not self._idle.empty():
+                self._idle.get_nowait()
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False)
+        for worker in starting:
+            worker.kill()
+        for worker in workers:
+            try:
+                worker.send(None)
+                worker.process.stdin.close()
+                worker.process.wait(1.0)
+            except (OSError, ValueError, subprocess.TimeoutExpired):
+                pass
+            worker.kill()
+
+    def stats(self):
+        """
+        Get the pool counters
+
+        Returns:
+            dict: Jobs run, how they ended, workers restarted and workers
+                running
+        """
+        with self.lock:
+            return dict(self._stats, workers=len(self._workers))
+
+
+def _memory_in_use(job):
+    """Memory the worker has now, in bytes, as its limit counts it; None if unknown"""
+    if job is not None:
+        return win32process.GetProcessMemoryInfo(win32api.GetCurrentProcess())["PagefileUsage"]
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[0]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+
+
+# The worker's own address space limit, restored after every job
+_ADDRESS_SPACE = resource.getrlimit(resource.RLIMIT_AS) if resource is not None else None
+
+
+def _limit_memory(job, extra):
+    """Allow the worker `extra` more bytes than it uses now (None lifts the limit)"""
+    if job is not None:
+        info = win32job.QueryInformationJobObject(job, win32job.JobObjectExtendedLimitInformation)
+        if extra is None:
+            info["BasicLimitInformation"]["LimitFlags"] &= ~win32job.JOB_OBJECT_LIMIT_PROCESS_MEMORY
+        else:
+            info["BasicLimitInformation"]["LimitFlags"] |= win32job.JOB_OBJECT_LIMIT_PROCESS_MEMORY
+            info["ProcessMemoryLimit"] = _memory_in_use(job) + extra
+        win32job.SetInformationJobObject(job, win32job.JobObjectExtendedLimitInformation, info)
+    elif resource is not None:
+        in_use = _memory_in_use(None)
+        if extra is None or in_use is None:
+            resource.setrlimit(resource.RLIMIT_AS, _ADDRESS_SPACE)
+        else:
+            soft, hard = _ADDRESS_SPACE
+            limit = in_use + extra
+            if soft != resource.RLIM_INFINITY:
+                limit = min(limit, soft)
+            resource.setrlimit(resource.RLIMIT_AS, (limit, hard))
+
+
+def _worker_main(preload):
+    """Serve jobs from stdin until it closes"""
+    # Keep stdin and stdout for the job channel; learned code that prints or
+    # reads input gets stderr and an empty stdin
+    jobs = os.fdopen(os.dup(sys.stdin.fileno()), "rb")
+    results = os.fdopen(os.dup(sys.stdout.fileno()), "wb")
+    with open(os.devnull, "rb") as devnull:
+        os.dup2(devnull.fileno(), sys.stdin.fileno())
+    os.dup2(sys.stderr.fileno(), sys.stdout.fileno())
+
+    # Import from the project, not from brain/ where this file lives
+    sys.path[0] = PROJECT_DIR
+    namespace = {"__name__": "__learned__", "__builtins__": __builtins__}
+    for name in preload:
+        try:
+            importlib.import_module(name)
+            top = name.partition(".")[0]
+            namespace[top] = sys.modules[top]
+        except Exception as e:
+            print(f"Sandbox worker could not preload {name}: {e}", file=sys.stderr)
+
+    job_object = None
+    if win32job is not None:
+        try:
+            job_object = win32job.CreateJobObject(None, "")
+            win32job.AssignProcessToJobObject(job_object, win32api.GetCurrentProcess())
+        except Exception as e:
+            print(f"Sandbox worker runs without a memory limit: {e}", file=sys.stderr)
+            job_object = None
+
+    pickle.dump("ready", results)
+    results.flush()
+    while True:
+        try:
+            job = pickle.load(jobs)
+        except (EOFError, OSError, pickle.UnpicklingError):
+            return
+        if job is None:
+            return
+        code, handlers, memory = job
+        result = {"status": "ok", "handler": None, "error": None}
+        scope = None
+        try:
+            code = marshal.loads(code)
+            if memory:
+                _limit_memory(job_object, memory)
+            try:
+                # One namespace, so functions see what the code imported
+                scope = dict(namespace)
+                exec(code, scope)
+                for name in handlers:
+                    if callable(scope.get(name)):
+                        result["handler"] = name
+                        scope[name]()
+                        break
+            finally:
+                if memory:
+                    _limit_memory(job_object, None)
+        except MemoryError:
+            result.update(status="error", error="learned code went over its memory limit")
+        except BaseException as e:
+            # SystemExit and the like end the job, not the worker
+            result.update(status="error", error=f"{type(e).__name__}: {e}")
+        del scope
+        pickle.dump(result, results)
+        results.flush()
+
+
+if __name__ == "__main__":
+    _worker_main(sys.argv[1:])
@@ -0,0 +1,488 @@
+"""
+Semantic cache for near-duplicate LLM prompts
+Prompts are turned into hashed character n-gram TF-IDF vectors and matched by
+cosine similarity against an inverted (column-major) sparse index in NumPy,
+so rephrased questions can reuse an earlier answer.
+
+The n-grams are taken from a prompt's content words, after dropping fillers,
+politeness and question words and folding plurals and contractions, so "how's
+the weather" finds "what's the weather like". A similar prompt then only
+shares its answer if most of its content words are the same and nothing
+flips the meaning: a negation ("not", "don't"), an antonym ("on" / "off",
+"increase" / "decrease"), a negating prefix ("lock" / "unlock", "mute" /
+"unmute"), a trailing symbol ("notepad" / "notepad++"), or the order around
+a direction word ("dollars to euros" / "euros to dollars"). Numbers must
+match exactly.
+
+Which prompts reach this cache at all is decided by brain.llm: only those
+asked without the recent history (by default none of process_command's; see
+LLM_CACHE_SELF_CONTAINED) and not about the current time (see
+response_cache.is_time_sensitive).
+"""
+import os
+import re
+import threading
+import time
+import zlib
+
+import numpy as np
+
+from brain.response_cache import normalize_prompt
+
+# Bumped whenever the saved layout changes so old files are ignored
+CACHE_VERSION = 2
+
+# Character n-gram sizes hashed into the feature space
+NGRAM_SIZES = (3, 4, 5)
+DIMENSIONS = 1 << 18
+
+# New prompts are scored by brute force until this many are waiting; then the
+# inverted index is rebuilt with fresh IDF weights
+MAX_PENDING = 512
+MIN_PENDING = 64
+
+# Share of the entries evicted at once when the cache is full
+EVICT_FRACTION = 0.05
+
+
+NUMBER_RE = re.compile(r"\d+")
+
+# Words keep trailing symbols, so "notepad++" and "c#" are not "notepad" and "c"
+WORD_RE = re.compile(r"[a-z0-9]+[+#]*")
+
+# Words that do not change what a prompt asks; negations and directions
+# ("on", "off", "to") are not among them
+STOPWORDS = {
+    "a", "an", "the", "please", "jarvis", "hey", "hi", "ok", "okay", "um", "uh", "so", "just", "kindly",
+    "can", "could", "would", "will", "you", "your", "me", "my", "i", "is", "are", "was", "were", "be",
+    "do", "does", "did", "tell", "let", "know", "quickly", "now", "what", "how", "like", "of", "for",
+    "some", "any", "it", "this", "that",
+}
+
+# Contractions, spelled without their apostrophe, and negations folded into one word
+CONTRACTIONS = {
+    "whats": "what", "hows": "how", "whos": "who", "wheres": "where", "whens": "when", "whys": "why",
+    "dont": "not", "doesnt": "not", "didnt": "not", "isnt": "not", "arent": "not", "cant": "not",
+    "cannot": "not", "wont": "not", "shouldnt": "not", "never": "not", "no": "not",
+}
+
+# Prefixes that negate or reverse the rest of a word: "unlock", "disable",
+# "increase" / "decrease"
+NEGATING_PREFIXES = ("un", "in", "im", "dis", "de", "non", "en", "ex", "anti")
+
+# Opposites no prefix gives away
+ANTONYMS = {frozenset(pair) for pair in [
+    ("on", "off"), ("up", "down"), ("in", "out"), ("open", "close"), ("show", "hide"), ("start", "stop"),
+    ("add", "remove"), ("next", "previous"), ("maximize", "minimize"), ("max", "min"), ("more", "less"),
+    ("higher", "lower"), ("louder", "quieter"), ("left", "right"), ("forward", "backward"),
+    ("first", "last"), ("top", "bottom"), ("before", "after"), ("upload", "download"),
+    ("import", "export"), ("push", "pull"), ("enter", "exit"), ("true", "false"),
+]}
+
+# Words whose neighbours' order decides the meaning: "dollars to euros"
+DIRECTION_WORDS = {"to", "into", "from", "than", "vs", "versus"}
+
+
+def context_key(system_message, model):
+    """
+    Identify the system message and model a cached answer belongs to
+
+    Returns:
+        int: Stable hash; only entries with the same key can match
+    """
+    return zlib.crc32(f"{system_message}\0{model}".encode("utf-8"))
+
+
+def _entry_key(prompt, context):
+    # Prompts differing only in a number ("set volume to 20" / "to 50") look
+    # alike as n-grams, so their numbers must match exactly
+    numbers = " ".join(NUMBER_RE.findall(prompt))
+    return (zlib.crc32(numbers.encode("ascii")) & 0x7FFFFFFF) << 32 | context
+
+
+def vectorize(prompt, dimensions=DIMENSIONS):
+    """
+    Hash a prompt's character n-grams into sparse term frequencies
+
+    Args:
+        prompt (str): Prompt text
+        dimensions (int): Size of the hashed feature space (a power of two)
+
+    Returns:
+        tuple: Sorted feature ids (int64) and their sublinear term frequencies (float32)
+    """
+    text = f" {' '.join(content_words(prompt)) or normalize_prompt(prompt)} "
+    grams = [text[i:i + n] for n in NGRAM_SIZES for i in range(len(text) - n + 1)]
+    if not grams:
+        return np.zeros(0, np.int64), np.zeros(0, np.float32)
+    hashes = np.fromiter((zlib.crc32(gram.encode("utf-8")) for gram in grams), np.int64, len(grams))
+    features, counts = np.unique(hashes & (dimensions - 1), return_counts=True)
+    return features, (1.0 + np.log(counts)).astype(np.float32)
+
+
+def content_words(prompt):
+    """
+    Get the words of a prompt that decide what it asks
+
+    Args:
+        prompt (str): Prompt text
+
+    Returns:
+        tuple: Content words in order, lowercased, with plurals folded
+    """
+    words = []
+    for word in WORD_RE.findall(prompt.lower().replace("'", "").replace("’", "")):
+        word = CONTRACTIONS.get(word, word)
+        if word in STOPWORDS:
+            continue
+        if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+            word = word[:-1]
+        words.append(word)
+    return tuple(words)
+
+
+def _forms(word):
+    """A word with a negating prefix or trailing symbols taken off"""
+    forms = {word, word.rstrip("+#")}
+    for prefix in NEGATING_PREFIXES:
+        if word.startswith(prefix) and len(word) - len(prefix) >= 3:
+            forms.add(word[len(prefix):])
+    return forms
+
+
+def flips_meaning(words, other):
+    """
+    Tell whether two similar prompts ask for opposite or different things
+
+    Args:
+        words (tuple): content_words() of one prompt
+        other (tuple): content_words() of the other
+
+    Returns:
+        bool: True if one is negated and the other not, they differ by an
+            antonym, a negating prefix or a trailing symbol, or their shared
+            words are ordered differently around a direction word
+    """
+    if ("not" in words) != ("not" in other):
+        return True
+    only, only_other = set(words) - set(other), set(other) - set(words)
+    for word in only:
+        for other_word in only_other:
+            if frozenset((word, other_word)) in ANTONYMS or _forms(word) & _forms(other_word):
+                return True
+    if DIRECTION_WORDS & (set(words) | set(other)):
+        shared = set(words) & set(other)
+        if [w for w in dict.fromkeys(words) if w in shared] != [w for w in dict.fromkeys(other) if w in shared]:
+            return True
+    return False
+
+
+def word_overlap(words, other):
+    """
+    Share of two prompts' content words they have in common (Dice coefficient)
+
+    Returns:
+        float: 0 for no word in common up to 1 for the same words
+    """
+    words, other = set(words), set(other)
+    if not words and not other:
+        return 1.0
+    return 2 * len(words & other) / (len(words) + len(other))
+
+
+def _gather_ranges(starts, lengths):
+    """Positions covered by consecutive [start, start + length) ranges"""
+    total = int(lengths.sum())
+    offsets = np.cumsum(lengths) - lengths
+    return np.arange(total) - np.repeat(offsets - starts, lengths)
+
+
+def _grow(array, needed):
+    """Return array, reallocated with doubled capacity if it cannot hold needed items"""
+    if needed <= len(array):
+        return array
+    grown = np.zeros(max(needed, 2 * len(array)), array.dtype)
+    grown[:len(array)] = array
+    return grown
+
+
+def _pack_texts(texts):
+    encoded = [text.encode("utf-8") for text in texts]
+    offsets = np.zeros(len(encoded) + 1, np.int64)
+    np.cumsum([len(data) for data in encoded], out=offsets[1:])
+    return np.frombuffer(b"".join(encoded), np.uint8), offsets
+
+
+def _unpack_texts(blob, offsets):
+    data = blob.tobytes()
+    return [data[offsets[i]:offsets[i + 1]].decode("utf-8") for i in range(len(offsets) - 1)]
+
+
+class SemanticCache:
+    """
+    Cosine-similarity cache of LLM answers
+
+    Indexed entries are listed per n-gram in a column-major posting index, so
+    a lookup only scores entries sharing the prompt's rarer n-grams. Entries
+    added since the last rebuild are scored directly. Numbers in the prompts
+    must match exactly, their content words must overlap by word_overlap and
+    neither may flip the other's meaning (see flips_meaning). The least
+    recently used entries are evicted past max_entries. The cache is loaded
+    from and saved to an .npz file; each process works on its own copy and
+    the last one to save wins.
+
+    Args:
+        path (str): .npz file the cache is persisted to
+        threshold (float): Minimum cosine similarity to serve a cached answer
+        word_overlap (float): Minimum share of content words in common (0-1)
+        max_entries (int): Entries kept before eviction
+        ttl (float): Seconds an entry stays valid
+        dimensions (int): Size of the hashed feature space (a power of two)
+    """
+
+    def __init__(self, path, threshold=0.7, max_entries=100000, ttl=7 * 24 * 3600, dimensions=DIMENSIONS,
+                 word_overlap=0.6):
+        self.path = path
+        self.threshold = threshold
+        self.word_overlap = word_overlap
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.dimensions = dimensions
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.loaded = False
+        self.dirty = False
+        self._dense = np.zeros(dimensions, np.float32)
+        self._reset()
+
+    def _reset(self):
+        # Every entry, row-major with raw term frequencies for rebuilding and
+        # normalized TF-IDF values for scoring. The arrays over-allocate; only
+        # the first `count` entries and `nnz` features are in use
+        self.count = 0
+        self.nnz = 0
+        self.row_ptr = np.zeros(1, np.int64)
+        self.row_features = np.zeros(0, np.int64)
+        self.row_tf = np.zeros(0, np.float32)
+        self.row_values = np.zeros(0, np.float32)
+        self.created = np.zeros(0)
+        self.last_used = np.zeros(0)
+        self.contexts = np.zeros(0, np.int64)
+        self.alive = np.zeros(0, bool)
+        self.prompts = []
+        self.responses = []
+        # Column-major TF-IDF index over the first `indexed` entries
+        self.indexed = 0
+        self.idf = np.ones(self.dimensions, np.float32)
+        self.col_ptr = np.zeros(self.dimensions + 1, np.int64)
+        self.col_rows = np.zeros(0, np.int32)
+
+    def __len__(self):
+        return int(self.alive[:self.count].sum())
+
+    def _weigh(self, features, tf):
+        values = tf * self.idf[features]
+        norm = np.linalg.norm(values)
+        return values / norm if norm else values
+
+    def load(self):
+        """Load the saved cache, starting empty if it is missing or unusable"""
+        self._reset()
+        self.loaded = True
+        try:
+            with np.load(self.path) as data:
+                if int(data["version"]) != CACHE_VERSION or int(data["dimensions"]) != self.dimensions:
+                    return
+                for name in ("row_ptr", "row_features", "row_tf", "row_values", "created", "last_used",
+                             "contexts", "alive", "idf", "col_ptr", "col_rows"):
+                    setattr(self, name, data[name])
+                self.indexed = int(data["indexed"])
+                self.count = len(self.alive)
+                self.nnz = len(self.row_features)
+                self.prompts = _unpack_texts(data["prompt_blob"], data["prompt_offsets"])
+                self.responses = _unpack_texts(data["response_blob"], data["response_offsets"])
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"Error loading semantic cache, starting empty: {e}")
+            self._reset()
+
+    def save(self):
+        """Write the cache and its index atomically"""
+        with self.lock:
+            if not self.dirty:
+                return
+            count, nnz = self.count, self.nnz
+            prompt_blob, prompt_offsets = _pack_texts(self.prompts)
+            response_blob, response_offsets = _pack_texts(self.responses)
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            temp_path = self.path + ".tmp"
+            try:
+                with open(temp_path, "wb") as f:
+                    np.savez(f, version=CACHE_VERSION, dimensions=self.dimensions, indexed=self.indexed,
+                             row_ptr=self.row_ptr[:count + 1], row_features=self.row_features[:nnz],
+                             row_tf=self.row_tf[:nnz], row_values=self.row_values[:nnz],
+                             created=self.created[:count], last_used=self.last_used[:count],
+                             contexts=self.contexts[:count], alive=self.alive[:count], idf=self.idf,
+                             col_ptr=self.col_ptr, col_rows=self.col_rows,
+                             prompt_blob=prompt_blob, prompt_offsets=prompt_offsets,
+                             response_blob=response_blob, response_offsets=response_offsets)
+                os.replace(temp_path, self.path)
+                self.dirty = False
+            except OSError as e:
+                print(f"Error saving semantic cache: {e}")
+
+    def _candidates(self, features, query):
+        """
+        Entries that may reach the threshold
+
+        Features are taken rarest first until the rest of the query vector is
+        too short to reach the threshold on its own: any entry sharing none of
+        the taken features has a cosine similarity below the threshold, so
+        only their postings, and the entries not yet indexed, are scored.
+        """
+        pending = np.arange(self.indexed, self.count)
+        if not self.indexed:
+            return pending
+        starts = self.col_ptr[features]
+        lengths = self.col_ptr[features + 1] - starts
+        order = np.argsort(lengths, kind="stable")
+        rest = np.cumsum((query * query)[order][::-1])[::-1]
+        taken = order[:max(1, int(np.count_nonzero(rest >= self.threshold ** 2)))]
+        rows = self.col_rows[_gather_ranges(starts[taken], lengths[taken])]
+        return np.concatenate([np.unique(rows), pending])
+
+    def lookup(self, prompt, context):
+        """
+        Find the cached answer of the most similar earlier prompt
+
+        Args:
+            prompt (str): New prompt
+            context (int): context_key() of the system message and model
+
+        Returns:
+            tuple: (response, similarity) or None if nothing is similar enough
+        """
+        with self.lock:
+            if not self.loaded:
+                self.load()
+            features, tf = vectorize(prompt, self.dimensions)
+            if not self.count or not len(features):
+                self.misses += 1
+                return None
+            now = time.time()
+            query = self._weigh(features, tf)
+            rows = self._candidates(features, query)
+            rows = rows[self.alive[rows] & (self.contexts[rows] == _entry_key(prompt, context))
+                        & (self.created[rows] > now - self.ttl)]
+            if not len(rows):
+                self.misses += 1
+                return None
+            starts = self.row_ptr[rows]
+            lengths = self.row_ptr[rows + 1] - starts
+            positions = _gather_ranges(starts, lengths)
+            self._dense[features] = query
+            products = self._dense[self.row_features[positions]] * self.row_values[positions]
+            self._dense[features] = 0
+            scores = np.add.reduceat(products, np.cumsum(lengths) - lengths)
+            # The most similar entry that also asks for the same thing
+            words = content_words(prompt)
+            for best in np.argsort(-scores, kind="stable"):
+                if scores[best] < self.threshold:
+                    break
+                row = int(rows[best])
+                cached = content_words(self.prompts[row])
+                if word_overlap(words, cached) >= self.word_overlap and not flips_meaning(words, cached):
+                    self.hits += 1
+                    self.last_used[row] = now
+                    self.dirty = True
+                    return self.responses[row], float(scores[best])
+            self.misses += 1
+            return None
+
+    def add(self, prompt, context, response):
+        """
+        Cache an answer
+
+        Args:
+            prompt (str): Prompt that was answered
+            context (int): context_key() of the system message and model
+            response (str): The answer
+        """
+        with self.lock:
+            if not self.loaded:
+                self.load()
+            features, tf = vectorize(prompt, self.dimensions)
+            if not len(features):
+                return
+            now = time.time()
+            row, start, end = self.count, self.nnz, self.nnz + len(features)
+            for name, values in (("row_features", features), ("row_tf", tf),
+                                 ("row_values", self._weigh(features, tf))):
+                array = _grow(getattr(self, name), end)
+                array[start:end] = values
+                setattr(self, name, array)
+            self.row_ptr = _grow(self.row_ptr, row + 2)
+            self.row_ptr[row + 1] = end
+            for name, value in (("created", now), ("last_used", now),
+                                ("contexts", _entry_key(prompt, context)), ("alive", True)):
+                array = _grow(getattr(self, name), row + 1)
+                array[row] = value
+                setattr(self, name, array)
+            self.prompts.append(prompt)
+            self.responses.append(response)
+            self.count, self.nnz = row + 1, end
+            self.dirty = True
+
+            alive = len(self)
+            if alive > self.max_entries:
+                evict = alive - self.max_entries + int(self.max_entries * EVICT_FRACTION)
+                age = np.where(self.alive[:self.count], self.last_used[:self.count], np.inf)
+                self.alive[np.argpartition(age, evict - 1)[:evict]] = False
+            pending = self.count - self.indexed
+            if pending >= max(MIN_PENDING, min(MAX_PENDING, self.indexed // 4)):
+                self._rebuild()
+
+    def _rebuild(self):
+        """Drop evicted entries, recompute IDF weights and rebuild the inverted index"""
+        keep = np.flatnonzero(self.alive[:self.count])
+        starts = self.row_ptr[keep]
+        lengths = self.row_ptr[keep + 1] - starts
+        positions = _gather_ranges(starts, lengths)
+        features = self.row_features[positions]
+        tf = self.row_tf[positions]
+        count = len(keep)
+
+        self.row_ptr = np.zeros(count + 1, np.int64)
+        np.cumsum(lengths, out=self.row_ptr[1:])
+        self.row_features, self.row_tf = features, tf
+        self.created, self.last_used = self.created[keep], self.last_used[keep]
+        self.contexts, self.alive = self.contexts[keep], self.alive[keep]
+        self.prompts = [self.prompts[i] for i in keep]
+        self.responses = [self.responses[i] for i in keep]
+        self.count, self.nnz = count, len(features)
+
+        frequency = np.bincount(features, minlength=self.dimensions)
+        self.idf = (np.log((1.0 + count) / (1.0 + frequency)) + 1.0).astype(np.float32)
+        rows = np.repeat(np.arange(count, dtype=np.int32), lengths)
+        values = tf * self.idf[features]
+        norms = np.sqrt(np.bincount(rows, values * values, minlength=count)).astype(np.float32)
+        values /= norms[rows]
+        self.row_values = values
+        self.col_rows = rows[np.argsort(features, kind="stable")]
+        self.col_ptr = np.zeros(self.dimensions + 1, np.int64)
+        np.cumsum(frequency, out=self.col_ptr[1:])
+        self.indexed = count
+
+    def stats(self):
+        """
+        Get the cache counters of this process
+
+        Returns:
+            dict: hits, misses, hit rate and live entries
+        """
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {"hits": self.hits, "misses": self.misses,
+                    "hit_rate": self.hits / lookups if lookups else 0.0, "entries": len(self)}
@@ -0,0 +1,91 @@
+"""
+Single-flight deduplication of concurrent identical calls
+The first caller of a key runs the call; callers arriving while it is in
+flight wait for the same result or exception instead of starting their own.
+Flights are shared across threads and event loops.
+"""
+import asyncio
+import threading
+from concurrent.futures import Future
+
+
+class SharedCallCancelled(Exception):
+    """The call a coalesced caller was waiting on was cancelled by its owner"""
+
+
+class SingleFlight:
+    """
+    Registry of calls in flight, keyed by what they compute
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._flights = {}
+        self._stats = {"calls": 0, "upstream": 0, "coalesced": 0}
+
+    async def run(self, key, function, rank=0):
+        """
+        Run a coroutine function once for every concurrent caller of a key
+
+        Args:
+            key: Hashable identity of the call
+            function: Coroutine function without arguments doing the call
+            rank (int): Urgency of this caller, lower is more urgent; a caller
+                only joins a flight started by an equally or more urgent one,
+                so it never waits longer than it would on its own
+
+        Returns:
+            The result of the shared call
+
+        Raises:
+            Whatever the shared call raised, or SharedCallCancelled if the
+            caller running it was cancelled
+        """
+        with self._lock:
+            self._stats["calls"] += 1
+            flight = self._flights.get(key)
+            if flight is not None and flight[1] <= rank:
+                self._stats["coalesced"] += 1
+                future = flight[0]
+                leader = False
+            else:
+                future = Future()
+                self._flights[key] = (future, rank)
+                self._stats["upstream"] += 1
+                leader = True
+
+        if not leader:
+            # Shielded so a waiter being cancelled leaves the shared call alone
+            return await asyncio.shield(asyncio.wrap_future(future))
+
+        try:
+            result = await function()
+        except BaseException as e:
+            self._finish(key, future)
+            if isinstance(e, asyncio.CancelledError):
+                future.set_exception(SharedCallCancelled("Shared LLM request was cancelled"))
+            else:
+                future.set_exception(e)
+            # Mark the exception as retrieved when nobody else was waiting
+            future.exception()
+            raise
+        self._finish(key, future)
+        future.set_result(result)
+        return result
+
+    def _finish(self, key, future):
+        # Later callers start a new flight rather than reuse a finished one
+        with self._lock:
+            if self._flights.get(key, (None,))[0] is future:
+                del self._flights[key]
+
+    def stats(self):
+        """
+        Get the deduplication counters
+
+        Returns:
+            dict: Calls made, upstream calls actually run, calls that shared
+                another caller's flight, and flights currently in flight
+        """
+        with self._lock:
+            return dict(self._stats, in_flight=len(self._flights))
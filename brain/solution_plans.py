@@ -0,0 +1,176 @@
+"""
+Parsed and compiled learned solutions
+A learned solution is parsed once into a plan: its first Python code block
+compiled to a code object, the key presses it describes and the names of
+the handler functions its code defines. Plans are cached by a hash of the
+solution text, so running a learned command again skips the regexes and the
+compiler, and a changed solution gets a new plan.
+"""
+import ast
+import collections
+import hashlib
+import re
+import threading
+
+CODE_BLOCK_RE = re.compile(r'```(?:python)?\s*(.*?)```', re.DOTALL)
+
+# Ways a solution describes key presses, tried in order
+KEY_PATTERNS = [
+    re.compile(r'press[^\n]*?[\'"`](.+?)[\'"`]', re.IGNORECASE),  # press('key')
+    re.compile(r'key(?:Down|Up|Press)[^\n]*?[\'"`](.+?)[\'"`]', re.IGNORECASE),  # keyDown('key')
+    re.compile(r'hotkey\([\'"`](.+?)[\'"`]', re.IGNORECASE),  # hotkey('key1', 'key2')
+    re.compile(r'(?:alt|ctrl|shift|win|cmd)\s*\+\s*([a-z0-9])', re.IGNORECASE),  # alt+key syntax
+]
+
+# Names of functions that are called after the code block runs
+HANDLER_RE = re.compile(r'handle_[a-z_]+')
+
+
+class SolutionPlan:
+    """
+    What running a learned solution takes
+
+    Attributes:
+        key (str): Hash of the solution text
+        code (code): Compiled first code block, or None
+        error (str): Why the code block did not compile, or None
+        keys (list): Key presses described by the solution, e.g. "alt+tab"
+        handlers (list): Handler names the code binds at top level, in order
+    """
+
+    def __init__(self, key, code=None, error=None, keys=None, handlers=None):
+        self.key = key
+        self.code = code
+        self.error = error
+        self.keys = keys or []
+        self.handlers = handlers or []
+
+    @property
+    def has_code(self):
+        """Whether the solution contains a code block, compiled or not"""
+        return self.code is not None or self.error is not None
+
+
+def solution_key(solution):
+    """
+    Hash a solution's text
+
+    Args:
+        solution (str): The learned solution
+
+    Returns:
+        str: Hex digest identifying the solution
+    """
+    return hashlib.sha256(solution.encode("utf-8")).hexdigest()
+
+
+def _bound_names(statements):
+    """Names a block of code binds in its own namespace, in source order"""
+    names = []
+    for node in statements:
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            names.append(node.name)
+        elif isinstance(node, (ast.Import, ast.ImportFrom)):
+            names.extend((alias.asname or alias.name).split(".")[0] for alias in node.names)
+        elif isinstance(node, (ast.Assign, ast.AnnAssign, ast.AugAssign)):
+            targets = node.targets if isinstance(node, ast.Assign) else [node.target]
+            names.extend(target.id for target in targets if isinstance(target, ast.Name))
+        # Function and class bodies have namespaces of their own
+        if not isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef, ast.Lambda)):
+            for field in ("body", "orelse", "finalbody", "handlers"):
+                names.extend(_bound_names(getattr(node, field, None) or []))
+    return names
+
+
+def parse_solution(solution):
+    """
+    Parse a learned solution into a plan
+
+    Args:
+        solution (str): The learned solution
+
+    Returns:
+        SolutionPlan: The solution's code, key presses and handlers
+    """
+    key = solution_key(solution)
+
+    keys = []
+    for pattern in KEY_PATTERNS:
+        keys = pattern.findall(solution)
+        if keys:
+            break
+
+    block = CODE_BLOCK_RE.search(solution)
+    if not block:
+        return SolutionPlan(key, keys=keys)
+    source = block.group(1)
+    try:
+        tree = ast.parse(source, filename=f"<learned solution {key[:12]}>")
+        code = compile(tree, f"<learned solution {key[:12]}>", "exec")
+    except (SyntaxError, ValueError) as e:
+        return SolutionPlan(key, error=str(e), keys=keys)
+    handlers = [name for name in dict.fromkeys(_bound_names(tree.body)) if HANDLER_RE.match(name)]
+    return SolutionPlan(key, code=code, keys=keys, handlers=handlers)
+
+
+class SolutionPlanCache:
+    """
+    LRU bounded cache of solution plans keyed by solution hash
+
+    Args:
+        max_entries (int): Plans kept before the least recently used are dropped
+    """
+
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self.lock = threading.Lock()
+        self._plans = collections.OrderedDict()
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+    def get(self, solution):
+        """
+        Get the plan of a solution, parsing it on first use
+
+        Args:
+            solution (str): The learned solution
+
+        Returns:
+            SolutionPlan: Its plan
+        """
+        key = solution_key(solution)
+        with self.lock:
+            plan = self._plans.get(key)
+            if plan is not None:
+                self._plans.move_to_end(key)
+                self._stats["hits"] += 1
+                return plan
+            self._stats["misses"] += 1
+        # Parsed outside the lock; two threads parsing the same new solution
+        # just store equal plans
+        plan = parse_solution(solution)
+        with self.lock:
+            self._plans[key] = plan
+            while len(self._plans) > self.max_entries:
+                self._plans.popitem(last=False)
+                self._stats["evictions"] += 1
+        return plan
+
+    def discard(self, solution):
+        """
+        Drop the plan of a solution that was replaced
+
+        Args:
+            solution (str): The old solution text
+        """
+        with self.lock:
+            self._plans.pop(solution_key(solution), None)
+
+    def stats(self):
+        """
+        Get the cache counters
+
+        Returns:
+            dict: Hits, misses, evictions and plans cached
+        """
+        with self.lock:
+            return dict(self._stats, entries=len(self._plans))
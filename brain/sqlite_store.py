@@ -0,0 +1,363 @@
+"""
+SQLite storage backend for the JARVIS memory system
+Events are kept in a WAL-mode database with indexed timestamp and type
+columns and an FTS5 trigram index over their text, so the voice loop can
+write while other processes such as the web UI read
+"""
+import datetime
+import os
+import sqlite3
+import sys
+import threading
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from brain.event_store import EventStore, line_type, parse_header, to_stamp
+from brain.log_compression import open_segment
+from brain.rollups import EXAMPLE_LIMIT, day_key, empty_rollup
+from brain.text_index import tokenize
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    id INTEGER PRIMARY KEY,
+    ts INTEGER NOT NULL,
+    type TEXT,
+    text TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS events_ts ON events (ts);
+CREATE INDEX IF NOT EXISTS events_type ON events (type);
+"""
+
+# The trigram tokenizer lets MATCH find any substring of three or more
+# characters, so indexed searches return exactly what a line scan would
+FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS events_fts USING fts5 (
+    text, content='events', content_rowid='id', tokenize='trigram'
+);
+CREATE TRIGGER IF NOT EXISTS events_fts_insert AFTER INSERT ON events BEGIN
+    INSERT INTO events_fts (rowid, text) VALUES (new.id, new.text);
+END;
+CREATE TRIGGER IF NOT EXISTS events_fts_delete AFTER DELETE ON events BEGIN
+    INSERT INTO events_fts (events_fts, rowid, text) VALUES ('delete', old.id, old.text);
+END;
+"""
+
+MIN_MATCH_LENGTH = 3
+
+# PRAGMA synchronous level for each log durability policy
+SYNCHRONOUS = {"none": "OFF", "flush": "NORMAL", "fsync": "FULL"}
+
+# Lines inserted per transaction by the flat-file importer
+IMPORT_BATCH = 10000
+
+
+def _lines(text):
+    """Split stored event text into log lines, each ending with a newline"""
+    return [line + "\n" for line in text.split("\n")[:-1]]
+
+
+def _phrase(text):
+    """Quote text as an FTS5 phrase"""
+    return '"' + text.replace('"', '""') + '"'
+
+
+class SqliteEventStore:
+    """
+    Event store with the EventStore interface, backed by SQLite
+
+    Each event is one row holding its log text exactly as the flat file
+    would, header line and continuation lines included, so every query
+    returns the same lines as the flat-file store.
+
+    Args:
+        path (str): Database file
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.RLock()
+        self.full_text = True
+        self._connection = None
+        self._synchronous = None
+        self._last_stamp = -1
+        with self.lock:
+            row = self._db().execute("SELECT ts FROM events ORDER BY id DESC LIMIT 1").fetchone()
+            if row:
+                self._last_stamp = row[0]
+
+    def _db(self):
+        """Get the connection, opening and migrating the database if needed"""
+        if self._connection is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            connection = sqlite3.connect(self.path, timeout=10.0, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.executescript(SCHEMA)
+            try:
+                connection.executescript(FTS_SCHEMA)
+            except sqlite3.OperationalError as e:
+                # SQLite before 3.34 has no trigram tokenizer; searches scan instead
+                print(f"Full-text search unavailable, memory searches will scan: {e}")
+                self.full_text = False
+            self._connection = connection
+            self._synchronous = None
+        return self._connection
+
+    def exists(self):
+        """Check whether the database exists"""
+        return os.path.exists(self.path)
+
+    def create(self):
+        """Create an empty database if there is none"""
+        with self.lock:
+            self._db()
+
+    def refresh(self):
+        """Nothing to index; other processes' writes are visible through SQLite"""
+
+    def _parse(self, text):
+        """Group log lines into (ts, type, text) rows, one per event"""
+        rows = []
+        for line in _lines(text):
+            header = parse_header(line.encode("utf-8"))
+            if header:
+                self._last_stamp = header[0]
+                rows.append([header[0], header[1], line])
+            elif rows:
+                rows[-1][2] += line
+            else:
+                # Continuation text without a header of its own
+                rows.append([self._last_stamp, None, line])
+        return rows
+
+    def append(self, text, durability="flush"):
+        """
+        Insert already formatted log text in a single transaction
+
+        Args:
+            text (str): One or more complete log lines
+            durability (str): "none", "flush" or "fsync", mapped to
+                PRAGMA synchronous OFF, NORMAL and FULL
+        """
+        with self.lock:
+            connection = self._db()
+            if self._synchronous != durability:
+                connection.execute(f"PRAGMA synchronous={SYNCHRONOUS[durability]}")
+                self._synchronous = durability
+            rows = self._parse(text)
+            with connection:
+                connection.executemany("INSERT INTO events (ts, type, text) VALUES (?, ?, ?)", rows)
+
+    def sync(self, fsync=False):
+        """
+        Make committed events durable in the main database file
+
+        Args:
+            fsync (bool): Checkpoint the write-ahead log into the database
+        """
+        if fsync:
+            with self.lock:
+                self._db().execute("PRAGMA wal_checkpoint(FULL)")
+
+    def close(self):
+        """Close the connection; it is reopened by the next call"""
+        with self.lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+    def tail(self, n):
+        """
+        Get the last n lines of the log
+
+        Args:
+            n (int): Number of lines
+
+        Returns:
+            list: Decoded lines, oldest first
+        """
+        lines = []
+        with self.lock:
+            for (text,) in self._db().execute("SELECT text FROM events ORDER BY id DESC"):
+                lines.extend(reversed(_lines(text)))
+                if len(lines) >= n:
+                    break
+        return lines[n - 1::-1] if n > 0 else []
+
+    def by_type(self, event_type, limit):
+        """
+        Get the most recent header lines of a given event type
+
+        Args:
+            event_type (str): Event type to match
+            limit (int): Maximum number of lines
+
+        Returns:
+            list: Decoded lines, newest first
+        """
+        with self.lock:
+            rows = self._db().execute("SELECT text FROM events WHERE type = ? ORDER BY id DESC LIMIT ?",
+                                      (event_type, limit)).fetchall()
+        return [_lines(text)[0] for (text,) in rows]
+
+    def between(self, start_stamp=None, end_stamp=None, event_type=None):
+        """
+        Get header lines with start_stamp <= timestamp < end_stamp
+
+        Args:
+            start_stamp (int): Inclusive lower bound, None for no bound
+            end_stamp (int): Exclusive upper bound, None for no bound
+            event_type (str): Only return events of this type
+
+        Returns:
+            list: Decoded event header lines, oldest first
+        """
+        conditions, params = ["type IS NOT NULL"], []
+        for condition, value in (("ts >= ?", start_stamp), ("ts < ?", end_stamp), ("type = ?", event_type)):
+            if value is not None:
+                conditions.append(condition)
+                params.append(value)
+        with self.lock:
+            rows = self._db().execute(f"SELECT text FROM events WHERE {' AND '.join(conditions)} ORDER BY id",
+                                      params).fetchall()
+        return [_lines(text)[0] for (text,) in rows]
+
+    def day_rollups(self, keys):
+        """
+        Get per-day event counters and examples with two grouped queries
+
+        Args:
+            keys (list): Dates as YYYY-MM-DD
+
+        Returns:
+            dict: Day records keyed by date
+        """
+        records = {key: empty_rollup() for key in keys}
+        if not keys:
+            return records
+        start = to_stamp(datetime.datetime.strptime(min(keys), "%Y-%m-%d"))
+        end = to_stamp(datetime.datetime.strptime(max(keys), "%Y-%m-%d")) + 86400
+        with self.lock:
+            connection = self._db()
+            counts = connection.execute(
+                "SELECT ts / 86400 AS day, type, COUNT(*) FROM events"
+                " WHERE ts >= ? AND ts < ? AND type IS NOT NULL"
+                " GROUP BY day, type ORDER BY MIN(id)", (start, end)).fetchall()
+            examples = connection.execute(
+                "SELECT day, type, text FROM ("
+                "  SELECT id, ts / 86400 AS day, type, text,"
+                "    ROW_NUMBER() OVER (PARTITION BY ts / 86400, type ORDER BY id) AS position"
+                "  FROM events WHERE ts >= ? AND ts < ? AND type IS NOT NULL"
+                ") WHERE position <= ? ORDER BY id", (start, end, EXAMPLE_LIMIT)).fetchall()
+
+        for day, event_type, count in counts:
+            record = records.get(day_key(day * 86400))
+            if record is not None:
+                record["total"] += count
+                record["types"][event_type] = count
+        for day, event_type, text in examples:
+            record = records.get(day_key(day * 86400))
+            if record is not None:
+                try:
+                    example = text.split("\n", 1)[0].split(")", 1)[1].strip()
+                except IndexError:
+                    continue
+                record["examples"].setdefault(event_type, []).append(example)
+        return records
+
+    def search(self, query, limit, event_type=None, all_terms=False):
+        """
+        Find the most recent lines matching a query (case-insensitive)
+
+        The FTS index narrows the events to check and the lines are then
+        matched in Python, so results are the same as the flat-file store's.
+        Terms shorter than three characters cannot use the index and fall
+        back to scanning.
+
+        Args:
+            query (str): Text to look for
+            limit (int): Maximum number of lines
+            event_type (str): Only match events of this type
+            all_terms (bool): Match lines containing every word of the query
+                in any order instead of the query as one string
+
+        Returns:
+            list: Decoded lines, newest first
+        """
+        needle = query.lower()
+        terms = tokenize(query)
+        phrases = terms if all_terms and terms else [needle]
+        phrases = [phrase for phrase in phrases if len(phrase) >= MIN_MATCH_LENGTH]
+
+        def accept(line):
+            lowered = line.lower()
+            if all_terms and terms:
+                found = all(term in lowered for term in terms)
+            else:
+                found = needle in lowered
+            return found and (event_type is None or line_type(line) == event_type)
+
+        if phrases and self.full_text:
+            sql = ("SELECT events.text FROM events_fts JOIN events ON events.id = events_fts.rowid"
+                   " WHERE events_fts MATCH ?")
+            params = [" AND ".join(_phrase(phrase) for phrase in phrases)]
+            order = " ORDER BY events_fts.rowid DESC"
+        else:
+            sql, params, order = "SELECT text FROM events WHERE 1", [], " ORDER BY id DESC"
+        if event_type is not None:
+            sql += " AND events.type = ?"
+            params.append(event_type)
+
+        matches = []
+        with self.lock:
+            for (text,) in self._db().execute(sql + order, params):
+                for line in reversed(_lines(text)):
+                    if accept(line):
+                        matches.append(line)
+                        if len(matches) >= limit:
+                            return matches
+        return matches
+
+    def import_log(self, log_file):
+        """
+        Copy a flat-file log, including its sealed segments, into the database
+
+        Only runs on an empty database so it cannot import the same events twice.
+
+        Args:
+            log_file (str): Path of the active flat-file log
+
+        Returns:
+            int: Number of imported lines
+        """
+        with self.lock:
+            if self._db().execute("SELECT 1 FROM events LIMIT 1").fetchone():
+                print(f"{self.path} already holds events, not importing {log_file}")
+                return 0
+        paths = [segment.path for segment in EventStore(log_file).sealed]
+        if os.path.exists(log_file):
+            paths.append(log_file)
+
+        imported = 0
+        batch = []
+        for path in paths:
+            with open_segment(path) as f:
+                for raw in iter(f.readline, b""):
+                    if not raw.endswith(b"\n"):
+                        break
+                    # Cut batches at event headers so multi-line events stay whole
+                    if len(batch) >= IMPORT_BATCH and parse_header(raw):
+                        self.append("".join(batch), durability="none")
+                        batch = []
+                    batch.append(raw.decode("utf-8", "replace").replace("\r\n", "\n"))
+                    imported += 1
+        if batch:
+            self.append("".join(batch), durability="none")
+        self.sync(fsync=True)
+        return imported
+
+
+if __name__ == "__main__":
+    # One-shot import: python brain/sqlite_store.py [log file] [database]
+    log_file = sys.argv[1] if len(sys.argv) > 1 else "data/jarvis_log.txt"
+    database = sys.argv[2] if len(sys.argv) > 2 else os.path.splitext(log_file)[0] + ".db"
+    store = SqliteEventStore(database)
+    print(f"Imported {store.import_log(log_file)} log lines into {database}")
+    store.close()
@@ -0,0 +1,147 @@
+"""
+Helpers for streamed LLM responses
+Parses server-sent events from the provider APIs and splits the streamed text
+into sentences that are spoken while the rest is still being generated
+"""
+import json
+import queue
+import re
+import threading
+import time
+
+# A sentence ends at . ! or ? (optionally closed by a quote or bracket)
+# followed by whitespace, or at a line break
+SENTENCE_END_RE = re.compile(r"[.!?]+[\"')\]]*\s+|\n+")
+
+# Abbreviations whose trailing period does not end a sentence
+ABBREVIATIONS = {"mr", "mrs", "ms", "dr", "prof", "sr", "jr", "st", "vs", "etc", "e.g", "i.e", "approx"}
+
+# Clauses longer than this are cut at a comma, semicolon or colon so speech
+# does not wait for a very long sentence to finish
+MAX_SENTENCE_CHARS = 200
+CLAUSE_END_RE = re.compile(r"[,;:]\s+")
+
+
+def iter_sse_data(response):
+    """
+    Read the data fields of a server-sent event stream
+
+    Args:
+        response (requests.Response): Streamed response (stream=True)
+
+    Yields:
+        dict: Each event's JSON payload, until the stream ends or sends [DONE]
+    """
+    # Lines are decoded here: text/event-stream has no charset, so requests
+    # would fall back to ISO-8859-1
+    for line in response.iter_lines(chunk_size=None):
+        if not line.startswith(b"data:"):
+            continue
+        data = line[5:].strip().decode("utf-8")
+        if data == "[DONE]":
+            return
+        if data:
+            yield json.loads(data)
+
+
+class SentenceSegmenter:
+    """
+    Split streamed text into complete sentences
+
+    Feed text fragments as they arrive; complete sentences are returned as
+    soon as their end is seen and the remainder is kept for the next fragment.
+    """
+
+    def __init__(self, max_chars=MAX_SENTENCE_CHARS):
+        self.max_chars = max_chars
+        self.buffer = ""
+
+    def _is_abbreviation(self, end):
+        words = self.buffer[:end].rstrip(".!?\"')] \n").rsplit(None, 1)
+        return bool(words) and words[-1].lower() in ABBREVIATIONS
+
+    def feed(self, text):
+        """
+        Add a fragment of text
+
+        Args:
+            text (str): Next piece of the response
+
+        Returns:
+            list: Sentences completed by this fragment
+        """
+        self.buffer += text
+        sentences = []
+        start = 0
+        for match in SENTENCE_END_RE.finditer(self.buffer):
+            if match.group().startswith(".") and self._is_abbreviation(match.end()):
+                continue
+            sentence = self.buffer[start:match.end()].strip()
+            if sentence:
+                sentences.append(sentence)
+            start = match.end()
+        self.buffer = self.buffer[start:]
+        if len(self.buffer) > self.max_chars:
+            clauses = list(CLAUSE_END_RE.finditer(self.buffer))
+            if clauses:
+                end = clauses[-1].end()
+                sentences.append(self.buffer[:end].strip())
+                self.buffer = self.buffer[end:]
+        return sentences
+
+    def flush(self):
+        """
+        Get whatever text is left once the stream ended
+
+        Returns:
+            list: The final sentence, if any
+        """
+        rest, self.buffer = self.buffer.strip(), ""
+        return [rest] if rest else []
+
+
+def speak_sentences(chunks, speak):
+    """
+    Speak streamed text sentence by sentence while it is still arriving
+
+    The stream is read in a background thread; each completed sentence is
+    spoken in the calling thread as soon as it is available, so the speech
+    engine stays on the thread that owns it.
+
+    Args:
+        chunks (iterable): Pieces of text
+        speak (callable): Speaks one sentence
+
+    Returns:
+        tuple: The complete text and the seconds until the first sentence
+            started being spoken (None if nothing was spoken)
+    """
+    sentences = queue.Queue()
+    pieces = []
+
+    def read():
+        segmenter = SentenceSegmenter()
+        try:
+            for chunk in chunks:
+                pieces.append(chunk)
+                for sentence in segmenter.feed(chunk):
+                    sentences.put(sentence)
+            for sentence in segmenter.flush():
+                sentences.put(sentence)
+        except Exception as e:
+            print(f"Error reading streamed response: {e}")
+        finally:
+            sentences.put(None)
+
+    start = time.perf_counter()
+    threading.Thread(target=read, name="jarvis-speech-stream", daemon=True).start()
+    first_word = None
+    while True:
+        sentence = sentences.get()
+        if sentence is None:
+            break
+        if first_word is None:
+            first_word = time.perf_counter() - start
+            print(f"Time to first spoken word: {first_word:.2f} s")
+        speak(sentence)
+    return "".join(pieces), first_word
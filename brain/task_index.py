@@ -0,0 +1,142 @@
+"""
+Similar-task index for the knowledge base
+Finds known tasks that are a substring of a command, or that contain the
+command, without scanning every task: the first by looking up the command's
+substrings of each known task length in a hash table, the second through
+character trigram postings verified with a substring test. Postings are
+split by task length and read shortest first, so a common word stops after
+the few best matches instead of checking every task containing it. Tasks are
+added one at a time as they are learned, and matches are ranked by how much
+of the longer string the shorter one covers.
+"""
+import collections
+
+# Length of the character n-grams in the postings
+GRAM = 3
+
+
+class TaskIndex:
+    """
+    Substring index over task names
+
+    Implements the add/rebuild interface of KnowledgeStore indexes.
+    """
+
+    def __init__(self):
+        self._ids = {}
+        self._tasks = []
+        # Task ids by length, and by trigram and length
+        self._by_length = collections.defaultdict(set)
+        self._postings = collections.defaultdict(lambda: collections.defaultdict(set))
+
+    def __len__(self):
+        return len(self._ids)
+
+    def add(self, task, entry=None):
+        """
+        Index a task
+
+        Args:
+            task (str): Task name
+            entry (dict): Its knowledge entry (unused)
+        """
+        if task in self._ids:
+            return
+        task_id = len(self._tasks)
+        self._ids[task] = task_id
+        self._tasks.append(task)
+        self._by_length[len(task)].add(task_id)
+        for gram in _grams(task):
+            self._postings[gram][len(task)].add(task_id)
+
+    def remove(self, task):
+        """
+        Drop a task from the index
+
+        Args:
+            task (str): Task name
+        """
+        task_id = self._ids.pop(task, None)
+        if task_id is None:
+            return
+        self._tasks[task_id] = None
+        self._by_length[len(task)].discard(task_id)
+        if not self._by_length[len(task)]:
+            del self._by_length[len(task)]
+        for gram in _grams(task):
+            postings = self._postings[gram]
+            postings[len(task)].discard(task_id)
+            if not postings[len(task)]:
+                del postings[len(task)]
+            if not postings:
+                del self._postings[gram]
+
+    def rebuild(self, entries):
+        """
+        Replace the index contents
+
+        Args:
+            entries (dict): Task name to knowledge entry
+        """
+        self.__init__()
+        for task in entries:
+            self.add(task)
+
+    def search(self, command, limit=5):
+        """
+        Find the known tasks most similar to a command
+
+        Args:
+            command (str): The command
+            limit (int): Most candidates to return
+
+        Returns:
+            list: (task, score) pairs, best first; the score is the length of
+                the shorter string over the longer one, ties keep the order
+                the tasks were added in
+        """
+        if not command:
+            return []
+        found = {}
+
+        # Known tasks inside the command: one hash lookup per substring of a
+        # length some task has, independent of the number of tasks
+        for length in self._by_length:
+            if length > len(command):
+                continue
+            score = length / len(command)
+            for start in range(len(command) - length + 1):
+                task_id = self._ids.get(command[start:start + length])
+                if task_id is not None:
+                    found[task_id] = score
+
+        # The command inside known tasks: tasks sharing every trigram of the
+        # command, rarest trigrams first, then checked with a substring test;
+        # the shortest containing tasks score highest, so lengths are read in
+        # increasing order until enough are found
+        grams = _grams(command)
+        contained = 0
+        for length in sorted(length for length in self._by_length if length >= len(command)):
+            if grams:
+                postings = sorted((self._postings[gram].get(length, ()) if gram in self._postings else ()
+                                   for gram in grams), key=len)
+                candidates = postings[0]
+                for other in postings[1:]:
+                    if len(candidates) <= limit:
+                        break
+                    candidates = candidates & other
+            else:
+                candidates = self._by_length[length]
+            hits = sorted(i for i in candidates if command in self._tasks[i])[:limit - contained]
+            for task_id in hits:
+                found[task_id] = max(found.get(task_id, 0.0), len(command) / length)
+            contained += len(hits)
+            if contained >= limit:
+                break
+
+        ranked = sorted(found.items(), key=lambda item: (-item[1], item[0]))[:limit]
+        return [(self._tasks[task_id], score) for task_id, score in ranked]
+
+
+def _grams(text):
+    return {text[i:i + GRAM] for i in range(len(text) - GRAM + 1)}
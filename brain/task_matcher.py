@@ -0,0 +1,402 @@
+"""
+Ranked fuzzy matching of commands against learned tasks
+Learned tasks and their solutions are indexed as BM25F documents (the task
+name weighs more than the solution text) in column-major NumPy arrays, and a
+command is scored against all of them with one vectorized gather. Text is
+tokenized for speech recognition output: fillers and politeness are dropped,
+number words become digits, common command verbs are folded into one form
+and words are lightly stemmed, so reworded commands still find their task.
+A match is scored by how much of the command's weight it covers times how
+much of the task name's weight the command covers, so neither a short task
+inside a long command nor a long task sharing one word with a short command
+scores high.
+"""
+import re
+import threading
+import numpy as np
+
+# BM25 term frequency saturation and length normalization
+K1 = 1.2
+B = 0.75
+# Weight of solution words relative to task name words
+SOLUTION_WEIGHT = 0.25
+# Tasks added since the last build are scored exactly until there are this many
+MAX_PENDING = 256
+
+WORD_RE = re.compile(r"[a-z0-9]+")
+
+# Words that carry no meaning in a spoken command
+FILLERS = {
+    "a", "an", "the", "please", "jarvis", "hey", "hi", "ok", "okay", "um", "uh", "er", "hmm", "like",
+    "just", "can", "could", "would", "will", "you", "kindly", "i", "want", "wanna", "need", "id",
+    "to", "for", "of", "and", "my", "me", "some", "it", "that", "this", "now", "right", "quickly",
+    "our", "your", "its", "us", "by", "go", "ahead", "thanks", "thank",
+}
+
+NUMBERS = {
+    "zero": "0", "one": "1", "two": "2", "three": "3", "four": "4", "five": "5", "six": "6",
+    "seven": "7", "eight": "8", "nine": "9", "ten": "10", "eleven": "11", "twelve": "12",
+    "fifteen": "15", "twenty": "20", "thirty": "30", "forty": "40", "fifty": "50", "hundred": "100",
+}
+
+# Verbs of commands that mean the same thing, folded into one
+SYNONYMS = {
+    "launch": "open", "start": "open", "run": "open", "load": "open", "show": "open",
+    "shut": "close", "exit": "close", "quit": "close", "kill": "close", "terminate": "close",
+    "increase": "up", "raise": "up", "louder": "up", "higher": "up", "boost": "up",
+    "decrease": "down", "lower": "down", "quieter": "down", "reduce": "down",
+    "find": "search", "lookup": "search",
+    "capture": "screenshot", "snapshot": "screenshot",
+    "begin": "open", "create": "make", "generate": "make",
+    "remove": "delete", "erase": "delete", "trash": "delete",
+    "duplicate": "copy", "hide": "minimize", "mail": "email", "locate": "search",
+}
+
+# Multi-word verbs, replaced before the words are split
+PHRASES = {
+    "bring up": "open", "pull up": "open", "open up": "open", "fire up": "open",
+    "close down": "close", "shut down": "close",
+    "look up": "search", "look for": "search",
+    "get rid of": "delete", "print out": "print",
+}
+PHRASE_RE = re.compile(r"\b(" + "|".join(sorted(PHRASES, key=len, reverse=True)) + r")\b")
+
+
+def _stem(word):
+    """Light suffix stripping that maps inflections of a word to one form"""
+    for suffix in ("ing", "ies", "ed", "es", "s"):
+        if word.endswith(suffix) and len(word) - len(suffix) >= 3:
+            word = word[:-len(suffix)] + ("y" if suffix == "ies" else "")
+            break
+    if word.endswith("e") and len(word) > 3:
+        word = word[:-1]
+    if len(word) > 3 and word[-1] == word[-2]:
+        word = word[:-1]
+    return word
+
+
+def tokenize(text):
+    """
+    Split spoken or written text into matching terms
+
+    Args:
+        text (str): Command, task name or solution
+
+    Returns:
+        list: Normalized terms, in order
+    """
+    terms = []
+    text = PHRASE_RE.sub(lambda match: PHRASES[match.group(1)], text.lower().replace("'", ""))
+    for word in WORD_RE.findall(text):
+        word = NUMBERS.get(word, word)
+        if word in FILLERS:
+            continue
+        word = SYNONYMS.get(word, word)
+        terms.append(word if word.isdigit() else _stem(word))
+    return terms
+
+
+class TaskMatcher:
+    """
+    BM25F index over learned tasks
+
+    Implements the add/rebuild interface of KnowledgeStore indexes; tasks
+    without a solution are not indexed. With background set, the
+    column-major index is built on a thread of its own and swapped in when
+    ready, so adds and reloads made under the knowledge store's lock stay
+    cheap; meanwhile searches score the tasks added since the last build
+    directly. Searches only wait for the first reload to be indexed.
+
+    Args:
+        background (bool): Build the index on a background thread
+    """
+
+    def __init__(self, background=True):
+        self.lock = threading.Lock()
+        self.background = background
+        self._wake = threading.Condition(self.lock)
+        self._thread = None
+        # Entries of a reload waiting for the builder, and the adds made since
+        # it was asked for (None when no reload is in flight)
+        self._reload = None
+        self._replay = None
+        self._build_wanted = False
+        # Bumped whenever a reload is swapped in, so older builds are dropped
+        self._generation = 0
+        self._ready = False
+        self._reset()
+
+    def _reset(self):
+        self.vocabulary = {}
+        self.tasks = []
+        self.ids = {}
+        # Row of each document: term ids, field-weighted term frequencies and
+        # whether the term is in the task name
+        self.rows = []
+        self.alive = np.zeros(0, bool)
+        self.pending = []
+        self._built = 0
+        self.idf = np.zeros(0)
+        self.col_ptr = np.zeros(1, np.int64)
+        self.col_docs = np.zeros(0, np.int64)
+        self.col_weights = np.zeros(0)
+        self.col_names = np.zeros(0)
+        self.name_weights = np.zeros(0)
+        self.avg_length = 1.0
+        self.live_count = 0
+
+    def __len__(self):
+        return len(self.ids)
+
+    def _row(self, task, solution):
+        counts = {}
+        for weight, text in ((1.0, task), (SOLUTION_WEIGHT, solution)):
+            for term in tokenize(text):
+                term_id = self.vocabulary.setdefault(term, len(self.vocabulary))
+                counts[term_id] = counts.get(term_id, 0.0) + weight
+        names = {self.vocabulary[term] for term in tokenize(task)}
+        return (np.fromiter(counts, np.int64, len(counts)), np.fromiter(counts.values(), float, len(counts)),
+                np.fromiter((term_id in names for term_id in counts), bool, len(counts)))
+
+    def add(self, task, entry):
+        """
+        Index or re-index a task
+
+        Args:
+            task (str): Task name
+            entry (dict): Its knowledge entry; only tasks with a solution are matched
+        """
+        with self.lock:
+            self._add(task, entry)
+            if self._replay is not None:
+                self._replay.append((task, entry))
+            if len(self.pending) > MAX_PENDING:
+                self._request_build()
+
+    def _add(self, task, entry):
+        """Index a task without rebuilding (lock held)"""
+        solution = (entry or {}).get("solution")
+        old = self.ids.pop(task, None)
+        if old is not None:
+            self.alive[old] = False
+        if not isinstance(solution, str) or not solution.strip():
+            return
+        doc = len(self.tasks)
+        self.tasks.append(task)
+        self.ids[task] = doc
+        self.rows.append(self._row(task, solution))
+        if len(self.alive) <= doc:
+            grown = np.zeros(max(doc + 1, 2 * len(self.alive)), bool)
+            grown[:len(self.alive)] = self.alive
+            self.alive = grown
+        self.alive[doc] = True
+        self.pending.append(doc)
+
+    def rebuild(self, entries):
+        """
+        Replace the index contents
+
+        Args:
+            entries (dict): Task name to knowledge entry
+        """
+        if self.background:
+            with self.lock:
+                # Indexed by the builder; adds from now on are replayed on top
+                self._reload = dict(entries)
+                self._replay = []
+                self._start()
+                self._wake.notify_all()
+            return
+        with self.lock:
+            self._reset()
+            for task, entry in entries.items():
+                if isinstance(entry, dict):
+                    self._add(task, entry)
+            self._build()
+            self._ready = True
+
+    def _request_build(self):
+        """Build the index now, or have the builder do it (lock held)"""
+        if not self.background:
+            self._build()
+            return
+        self._build_wanted = True
+        self._start()
+        self._wake.notify_all()
+
+    def _start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="jarvis-task-matcher", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            with self._wake:
+                self._wake.wait_for(lambda: self._reload is not None or self._build_wanted)
+                entries, self._reload = self._reload, None
+                self._build_wanted = False
+                if entries is None:
+                    count = len(self.tasks)
+                    snapshot = (self._generation, count, self.rows[:count], self.alive[:count].copy(),
+                                len(self.vocabulary))
+            try:
+                if entries is not None:
+                    self._swap_in(entries)
+                else:
+                    generation, count, rows, alive, vocabulary = snapshot
+                    index = self._index(rows, alive, vocabulary)
+                    with self.lock:
+                        if generation == self._generation:
+                            self._apply(index, count, alive)
+            except Exception as e:
+                print(f"Error building the task matcher index: {e}")
+                with self.lock:
+                    if entries is not None and self._reload is None:
+                        # Let waiting searches use what is indexed
+                        self._replay = None
+                        self._wake.notify_all()
+
+    def _swap_in(self, entries):
+        """Index reloaded entries apart, then take their place in one step"""
+        fresh = TaskMatcher(background=False)
+        fresh.rebuild(entries)
+        with self.lock:
+            if self._reload is not None:
+                # Reloaded again meanwhile; the newer entries win
+                return
+            for task, entry in self._replay:
+                fresh._add(task, entry)
+            for name in ("vocabulary", "tasks", "ids", "rows", "alive", "pending", "_built", "idf",
+                         "col_ptr", "col_docs", "col_weights", "col_names", "name_weights",
+                         "avg_length", "live_count"):
+                setattr(self, name, getattr(fresh, name))
+            self._replay = None
+            self._generation += 1
+            self._ready = True
+            if len(self.pending) > MAX_PENDING:
+                self._build_wanted = True
+            self._wake.notify_all()
+
+    def _build(self):
+        """Recompute the statistics and the column-major index (lock held)"""
+        count = len(self.tasks)
+        alive = self.alive[:count].copy()
+        self._apply(self._index(self.rows[:count], alive, len(self.vocabulary)), count, alive)
+
+    def _index(self, rows, alive, vocabulary):
+        """Statistics and column-major arrays of the given rows; touches no state"""
+        count = len(rows)
+        live = np.flatnonzero(alive).tolist()
+        if not live:
+            return None
+        terms = np.concatenate([rows[doc][0] for doc in live])
+        freqs = np.concatenate([rows[doc][1] for doc in live])
+        in_name = np.concatenate([rows[doc][2] for doc in live])
+        sizes = np.array([len(rows[doc][0]) for doc in live])
+        docs = np.repeat(np.array(live, np.int64), sizes)
+        lengths = np.bincount(docs, weights=freqs, minlength=count)
+        avg_length = float(lengths[live].mean()) or 1.0
+
+        df = np.bincount(terms, minlength=vocabulary)
+        idf = np.log(1 + (len(live) - df + 0.5) / (df + 0.5))
+        norm = K1 * (1 - B + B * lengths[docs] / avg_length)
+        weights = idf[terms] * freqs * (K1 + 1) / (freqs + norm)
+        names = idf[terms] * in_name
+
+        order = np.argsort(terms, kind="stable")
+        col_ptr = np.zeros(vocabulary + 1, np.int64)
+        np.cumsum(np.bincount(terms, minlength=vocabulary), out=col_ptr[1:])
+        return {"idf": idf, "avg_length": avg_length, "live_count": len(live),
+                "name_weights": np.bincount(docs, weights=names, minlength=count),
+                "col_ptr": col_ptr, "col_docs": docs[order], "col_weights": weights[order],
+                "col_names": names[order]}
+
+    def _apply(self, index, count, alive):
+        """Swap in an index built over the first count rows (lock held)"""
+        # Dead rows are dropped for good, their ids stay unused
+        for doc in np.flatnonzero(~alive).tolist():
+            self.rows[doc] = (np.zeros(0, np.int64), np.zeros(0), np.zeros(0, bool))
+        if index is None:
+            self._reset_index(count)
+        else:
+            for name, value in index.items():
+                setattr(self, name, value)
+        self.pending = [doc for doc in self.pending if doc >= count]
+        self._built = count
+
+    def _reset_index(self, count):
+        self.idf = np.zeros(len(self.vocabulary))
+        self.col_ptr = np.zeros(len(self.vocabulary) + 1, np.int64)
+        self.col_docs = np.zeros(0, np.int64)
+        self.col_weights = np.zeros(0)
+        self.col_names = np.zeros(0)
+        self.name_weights = np.zeros(count)
+        self.live_count = 0
+
+    def _idf(self, term_id):
+        if term_id < len(self.idf) and self.col_ptr[term_id + 1] > self.col_ptr[term_id]:
+            return self.idf[term_id]
+        # Terms the built index has never seen count as the rarest possible
+        return np.log(1 + (self.live_count + 0.5) / 0.5)
+
+    def search(self, command, limit=5):
+        """
+        Rank learned tasks against a command
+
+        Args:
+            command (str): The command, as recognized
+            limit (int): Most matches to return
+
+        Returns:
+            list: (task, score) pairs, best first; a score of 1 means the
+                task and the command share every term
+        """
+        terms = list(dict.fromkeys(tokenize(command)))
+        with self.lock:
+            # Until the first reload is indexed there is nothing to search
+            self._wake.wait_for(lambda: self._ready or self._replay is None)
+            if not self.ids or not terms:
+                return []
+            if self._built == 0 and self.tasks:
+                self._request_build()
+            term_ids = [self.vocabulary[term] for term in terms if term in self.vocabulary]
+            total = sum(self._idf(self.vocabulary[term]) if term in self.vocabulary
+                        else np.log(1 + (self.live_count + 0.5) / 0.5) for term in terms)
+
+            # Summed BM25 weight of the command's terms in each task, and the
+            # summed idf of the task name terms the command mentions
+            scores = np.zeros(len(self.tasks))
+            covered = np.zeros(len(self.tasks))
+            names = np.ones(len(self.tasks))
+            names[:self._built] = self.name_weights[:self._built]
+            indexed = [t for t in term_ids if t < len(self.col_ptr) - 1]
+            if indexed:
+                slices = [slice(self.col_ptr[t], self.col_ptr[t + 1]) for t in indexed]
+                docs = np.concatenate([self.col_docs[s] for s in slices])
+                scores[:self._built] = np.bincount(docs, weights=np.concatenate(
+                    [self.col_weights[s] for s in slices]), minlength=self._built)[:self._built]
+                covered[:self._built] = np.bincount(docs, weights=np.concatenate(
+                    [self.col_names[s] for s in slices]), minlength=self._built)[:self._built]
+
+            # Tasks added since the build, scored with the built statistics
+            query = set(term_ids)
+            for doc in self.pending:
+                row_terms, row_freqs, row_names = self.rows[doc]
+                norm = K1 * (1 - B + B * row_freqs.sum() / self.avg_length)
+                names[doc] = 0.0
+                for t, f, name in zip(row_terms.tolist(), row_freqs.tolist(), row_names.tolist()):
+                    idf = self._idf(t)
+                    names[doc] += idf * name
+                    if t in query:
+                        scores[doc] += idf * f * (K1 + 1) / (f + norm)
+                        covered[doc] += idf * name
+
+            scores[~self.alive[:len(self.tasks)]] = 0.0
+            # Ranked unclipped, so the task with fewer unmatched words wins a tie
+            scores = scores / total * covered / np.maximum(names, 1e-9)
+            count = min(limit, int(np.count_nonzero(scores)))
+            if count == 0:
+                return []
+            best = np.argpartition(-scores, count - 1)[:count]
+            best = best[np.lexsort((best, -scores[best]))]
+            return [(self.tasks[doc], min(float(scores[doc]), 1.0)) for doc in best]
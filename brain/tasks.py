@@ -15,19 +15,22 @@ from utils.speech import speak
 from utils.mouse_control import move_mouse, click
 from utils.browser import search_web, open_website
 from brain.vision import read_screen, detect_object
-from brain.llm import query_llm
+from brain.llm import query_llm, stream_llm
+from brain.context_budget import refers_to_history
 from brain.memory import log_event
-from config import APPLICATIONS
+from config import APPLICATIONS, LLM_CACHE_SELF_CONTAINED
 
-def process_command(command):
+def process_command(command, stream=False):
     """
     Process user's voice command
     
     Args:
         command (str): User's voice command
+        stream (bool): Return the LLM fallback's answer as a stream of text
+            pieces (see brain.llm.stream_llm) instead of waiting for all of it
         
     Returns:
-        str: Response to the command
+        str: Response to the command, or a generator of pieces when streamed
     """
     # Log the user command
     log_event("USER_COMMAND", command)
@@ -140,21 +143,15 @@ def process_command(command):
         return system_info
         
     # Memory query commands
-    elif re.match(r"what did I say (\d+) minutes ago", command):
-        from brain.memory import get_events_by_timeframe
-        minutes = int(re.match(r"what did I say (\d+) minutes ago", command).group(1))
-        past_events = get_events_by_timeframe(minutes)
+    elif re.match(r"what did i say (\d+) minutes ago", command):
+        from brain.memory import get_events_between
+        minutes = int(re.match(r"what did i say (\d+) minutes ago", command).group(1))
+        since = datetime.datetime.now() - datetime.timedelta(minutes=minutes)
+        past_commands = get_events_between(since, event_type="USER_COMMAND")
         log_event("ACTION", f"Retrieved memory from past {minutes} minutes")
         
-        if not past_events:
-            return f"I don't have any records from {minutes} minutes ago."
-        
-        # Extract only USER_COMMAND events
-        user_commands = []
-        for line in past_events.split('\n'):
-            if "(USER_COMMAND)" in line:
-                user_commands.append(line)
-                
+        # Only USER_COMMAND events are fetched from the time index
+        user_commands = past_commands.splitlines()
         if user_commands:
             return f"In the past {minutes} minutes, you said:\n" + "\n".join(user_commands)
         else:
@@ -174,9 +171,15 @@ def process_command(command):
             log_event("ERROR", f"Error in learning module: {str(e)}")
             print(f"Error handling unknown command: {e}")
         
-        # If no specialized handler, fall back to LLM
+        # If no specialized handler, fall back to LLM; with
+        # LLM_CACHE_SELF_CONTAINED, commands that do not refer back to the
+        # conversation are asked without the recent history, so repeats of
+        # them can be answered from the response cache
         log_event("ACTION", "Falling back to LLM for response")
-        return query_llm(command)
+        include_memory = not LLM_CACHE_SELF_CONTAINED or refers_to_history(command)
+        if stream:
+            return stream_llm(command, include_memory=include_memory)
+        return query_llm(command, include_memory=include_memory)
 
 def open_application(app_name):
     """
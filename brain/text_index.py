@@ -0,0 +1,199 @@
+"""
+Inverted full-text index over event log lines
+Maps every word seen in a log segment to the line numbers it appears on, so
+memory searches only read the lines that can possibly match
+"""
+import bisect
+import heapq
+import os
+import pickle
+import re
+from array import array
+
+TOKEN_RE = re.compile(r"\w+")
+
+# Bumped whenever the on-disk layout changes so old files are rebuilt
+INDEX_VERSION = 1
+
+# Terms that expand to more posting lists than this are not probed with a
+# binary search per candidate; up to MAX_SET_POSTINGS postings they are
+# merged into a set instead, beyond that the line text check filters them
+MAX_PROBE_LISTS = 16
+MAX_SET_POSTINGS = 200000
+
+
+def tokenize(text):
+    """
+    Split text into lowercase index terms
+
+    Args:
+        text (str): Text to split
+
+    Returns:
+        list: Words made of letters, digits and underscores
+    """
+    return TOKEN_RE.findall(text.lower())
+
+
+def index_terms(query):
+    """
+    Get the query words that can be looked up in the index
+
+    Segments index the line text after the timestamp, so words made only of
+    digits may sit in the unindexed timestamp and cannot narrow a search.
+
+    Args:
+        query (str): Search query
+
+    Returns:
+        list: Lowercase words to look up
+    """
+    return [term for term in tokenize(query) if not term.isdigit()]
+
+
+def _contains(postings, line_no):
+    position = bisect.bisect_left(postings, line_no)
+    return position < len(postings) and postings[position] == line_no
+
+
+class TermIndex:
+    """
+    Word -> line number postings for one log segment, persisted with pickle
+
+    Args:
+        path (str): File the index is saved to
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.postings = {}
+        self.count = 0
+        self.unsaved = 0
+        self._vocabulary = None
+
+    def reset(self):
+        """Forget every indexed line"""
+        self.postings = {}
+        self.count = 0
+        self.unsaved = 0
+        self._vocabulary = None
+
+    def load(self, max_lines):
+        """
+        Load the saved index if it is usable for a segment of max_lines lines
+
+        Args:
+            max_lines (int): Number of lines currently in the segment's line index
+
+        Returns:
+            int: Number of lines covered by the loaded index
+        """
+        self.reset()
+        try:
+            with open(self.path, "rb") as f:
+                data = pickle.load(f)
+            if data["version"] == INDEX_VERSION and data["count"] <= max_lines:
+                self.postings = data["postings"]
+                self.count = data["count"]
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"Rebuilding search index {self.path}: {e}")
+        return self.count
+
+    def save(self):
+        """Write the index atomically next to its segment"""
+        temp_path = self.path + ".tmp"
+        with open(temp_path, "wb") as f:
+            pickle.dump({"version": INDEX_VERSION, "count": self.count, "postings": self.postings},
+                        f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_path, self.path)
+        self.unsaved = 0
+
+    def add(self, line_no, text):
+        """
+        Index one line
+
+        Args:
+            line_no (int): Line number within the segment (must be increasing)
+            text (str): Searchable part of the decoded line
+        """
+        for token in set(tokenize(text)):
+            postings = self.postings.get(token)
+            if postings is None:
+                postings = self.postings[token] = array("I")
+                self._vocabulary = None
+            postings.append(line_no)
+        self.count = line_no + 1
+        self.unsaved += 1
+
+    def matching_tokens(self, term):
+        """
+        Find indexed words containing a term anywhere inside them
+
+        Substring matching keeps search results identical to a plain
+        "query in line" scan, e.g. "screen" still finds "screenshot".
+
+        Args:
+            term (str): Lowercase search term
+
+        Returns:
+            set: Matching indexed words
+        """
+        if self._vocabulary is None:
+            self._vocabulary = "\n" + "\n".join(self.postings) + "\n"
+        blob = self._vocabulary
+        found = set()
+        position = blob.find(term)
+        while position >= 0:
+            start = blob.rfind("\n", 0, position) + 1
+            stop = blob.find("\n", position)
+            found.add(blob[start:stop])
+            position = blob.find(term, stop)
+        return found
+
+    def candidates(self, terms):
+        """
+        Yield line numbers that contain every term, newest first
+
+        The term with the fewest postings drives the walk; the others are
+        probed by binary search or a set when they are cheap enough to check,
+        otherwise left to the caller. Candidates still need checking against
+        the line text.
+
+        Args:
+            terms (list): Lowercase search terms
+
+        Yields:
+            int: Candidate line numbers in descending order
+        """
+        groups = []
+        for term in set(terms):
+            lists = [self.postings[token] for token in self.matching_tokens(term)]
+            if not lists:
+                return
+            groups.append(lists)
+        if not groups:
+            return
+
+        sizes = [sum(len(postings) for postings in lists) for lists in groups]
+        order = sorted(range(len(groups)), key=sizes.__getitem__)
+        driver = groups[order[0]]
+        probes = []
+        for position in order[1:]:
+            lists = groups[position]
+            if len(lists) <= MAX_PROBE_LISTS:
+                probes.append(lambda line_no, lists=lists: any(_contains(postings, line_no) for postings in lists))
+            elif sizes[position] <= MAX_SET_POSTINGS:
+                members = set()
+                for postings in lists:
+                    members.update(postings)
+                probes.append(members.__contains__)
+
+        previous = None
+        for line_no in heapq.merge(*(reversed(postings) for postings in driver), reverse=True):
+            if line_no == previous:
+                continue
+            previous = line_no
+            if all(probe(line_no) for probe in probes):
+                yield line_no
@@ -11,6 +11,52 @@ GROQ_API_KEY = os.getenv("GROQ_API_KEY")
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 
+# Provider endpoints; override them to use a proxy or the offline stand-in
+# server in benchmarks/llm_standin.py
+GROQ_BASE_URL = os.getenv("GROQ_BASE_URL", "https://api.groq.com/openai/v1")
+GEMINI_BASE_URL = os.getenv("GEMINI_BASE_URL", "https://generativelanguage.googleapis.com/v1beta")
+OPENAI_BASE_URL = os.getenv("OPENAI_BASE_URL", "https://api.openai.com/v1")
+
+# LLM HTTP settings
+LLM_CONNECT_TIMEOUT = 5  # Seconds to establish a connection to a provider
+LLM_READ_TIMEOUT = 60  # Seconds to wait for a provider's response
+LLM_MAX_RETRIES = 2  # Retries on 429/5xx responses and connection failures
+LLM_RETRY_BACKOFF = 0.5  # Backoff factor in seconds between retries (0.5, 1, 2, ...)
+LLM_POOL_SIZE = 4  # Kept-alive connections per provider
+LLM_ASYNC_CONCURRENCY = 8  # Prompts in flight at once when fanning out, and async connections per provider
+LLM_POLICY = "sequential"  # "sequential", "hedged" (next provider starts after LLM_HEDGE_DELAY) or "race"
+LLM_HEDGE_DELAY = 1.5  # Seconds to wait for a provider before hedging with the next one
+LLM_BREAKER_FAILURES = 3  # Consecutive failures that open a provider's circuit breaker
+LLM_BREAKER_COOLDOWN = 30  # Seconds before an open breaker is probed again (doubles per failed probe)
+LLM_HEALTH_ALPHA = 0.3  # Weight of the newest call in the EWMA latency and error rate
+LLM_RATE_LIMIT_BACKOFF = 30  # Seconds a provider is skipped after a 429 without Retry-After
+# Requests and tokens per minute JARVIS lets itself send to each provider (0 for no limit)
+LLM_RATE_LIMITS = {
+    "Groq": {"requests_per_minute": 30, "tokens_per_minute": 6000},
+    "Gemini": {"requests_per_minute": 15, "tokens_per_minute": 1000000},
+    "OpenAI": {"requests_per_minute": 500, "tokens_per_minute": 200000},
+}
+LLM_QUEUE_TIMEOUTS = {"interactive": 5, "normal": 30, "background": 120}  # Longest wait in seconds for a rate limit slot
+LLM_EXPECTED_OUTPUT_TOKENS = 300  # Tokens reserved for the answer on top of the prompt's estimate
+LLM_SINGLE_FLIGHT = True  # Concurrent identical prompts share one provider request
+LLM_CACHE_ENABLED = True  # Reuse responses to repeated prompts (never with memory context)
+LLM_CACHE_SELF_CONTAINED = False  # Ask commands that do not refer back to the conversation without memory context, so the cache can answer them
+LLM_CACHE_FILE = "data/llm_cache.db"
+LLM_CACHE_TTL = 24 * 3600  # Seconds a cached response stays valid
+LLM_CACHE_MAX_ENTRIES = 1000  # Least recently used responses are evicted past this
+LLM_SEMANTIC_CACHE_ENABLED = True  # Also reuse answers to rephrased prompts (same rules as the cache above)
+LLM_SEMANTIC_CACHE_FILE = "data/llm_semantic_cache.npz"
+LLM_SEMANTIC_THRESHOLD = 0.7  # Minimum cosine similarity of two prompts to share an answer
+LLM_SEMANTIC_WORD_OVERLAP = 0.6  # Minimum share of content words two prompts have in common (0-1)
+LLM_SEMANTIC_MAX_ENTRIES = 100000  # Least recently used prompts are evicted past this
+LLM_STREAMING = True  # Speak LLM answers sentence by sentence while they are generated
+LLM_CONTEXT_TOKEN_BUDGET = 300  # Estimated tokens of "Recent history" sent with each prompt
+LLM_CONTEXT_MAX_EVENTS = 10  # Most events in the recent history
+LLM_CONTEXT_SCAN_EVENTS = 50  # Log lines searched for those events
+LLM_CONTEXT_MAX_EVENT_CHARS = 200  # Longer events are truncated in the history
+LLM_CONTEXT_EVENT_TYPES = ["USER_COMMAND", "USER_INPUT", "LLM_RESPONSE", "ACTION", "ACTION_EXECUTED",
+                           "WEB_ACTION", "VISION_ACTION", "MOUSE_ACTION", "KEYBOARD_ACTION", "LEARNING", "ERROR"]
+
 # Voice settings
 VOICE_RATE = 180
 VOICE_VOLUME = 2
@@ -45,3 +91,26 @@ DEFAULT_SEARCH_ENGINE = "https://duckduckgo.com/?q="
 
 # Vision settings
 WEBCAM_INDEX = 0  # Default camera index
+
+# Memory settings
+MEMORY_BACKEND = "file"  # "file" (indexed flat log) or "sqlite" (data/jarvis_log.db, import with brain/sqlite_store.py)
+LOG_SEGMENT_MAX_BYTES = 64 * 1024 * 1024  # Seal the active log into log_segments/ past this size
+LOG_SEGMENT_MAX_AGE_HOURS = 24 * 7  # Also seal it once its oldest event is this old (0 disables)
+LOG_COMPRESSION = "gzip"  # Sealed segments: "none", "gzip" or "zstd" (needs the zstandard package)
+LOG_RETENTION_DAYS = 0  # Delete sealed segments whose newest event is older than this (0 keeps them)
+LOG_RETENTION_MAX_BYTES = 0  # Delete the oldest sealed segments past this total (0 for no limit)
+LOG_DURABILITY = "flush"  # "none", "flush" (hand to the OS) or "fsync" (force to disk) per batch
+LOG_BATCH_SIZE = 64  # Records written per batch by the background log writer
+LOG_FLUSH_INTERVAL = 0.2  # Longest time in seconds a record waits before being written
+
+# Learning settings
+LEARN_IN_BACKGROUND = True  # Learn unknown commands in batches in the background instead of while the user waits
+LEARN_BATCH_SIZE = 5  # Most unknown commands sent to the LLM in one learning prompt
+LEARN_BATCH_DELAY = 2.0  # Seconds an unknown command waits for others to join its batch
+KNOWLEDGE_WRITE_DELAY = 1.0  # Seconds knowledge base changes are held so a burst of them is written once
+LEARN_MATCH_THRESHOLD = 0.7  # Lowest match score (0-1) at which a learned task answers a reworded command
+SOLUTION_PLAN_CACHE_SIZE = 256  # Learned solutions kept parsed and compiled for repeat executions
+LEARNED_CODE_SANDBOX = True  # Run learned code in warm worker processes instead of inside JARVIS
+SANDBOX_WORKERS = 2  # Worker processes kept ready to run learned code
+SANDBOX_TIMEOUT = 10.0  # Seconds learned code may run before its worker is killed
+SANDBOX_MEMORY_LIMIT_MB = 256  # Memory learned code may allocate beyond the worker's own (0 for no limit)
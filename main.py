@@ -13,12 +13,13 @@ project_dir = os.path.dirname(os.path.abspath(__file__))
 sys.path.append(project_dir)
 
 # Import components
-from utils.speech import speak, listen, listen_for_wake_word
+from utils.speech import speak, speak_stream, listen, listen_for_wake_word
 from brain.tasks import process_command
-from brain.learn import ensure_knowledge_file
+from brain.learn import ensure_knowledge_file, SANDBOX
 from brain.llm import query_llm
 from brain.vision import detect_faces
-from brain.memory import log_event
+from brain.memory import log_event, shutdown_logging
+from config import LLM_STREAMING
 
 # Create the data directory and knowledge file if they don't exist
 os.makedirs(os.path.join(project_dir, "data"), exist_ok=True)
@@ -76,6 +77,10 @@ def initialize():
     except ImportError:
         print("Warning: Config file not found or incomplete.")
     
+    # Warm up the workers that run learned commands
+    if SANDBOX is not None:
+        SANDBOX.start()
+    
     # Perform face detection to ensure camera is working
     face_result = detect_faces()
     print(face_result)
@@ -84,6 +89,15 @@ def initialize():
     speak("JARVIS is now online and ready to assist.")
     print("\nJARVIS is in standby mode. Say 'Hey JARVIS' to wake me up.")
 
+def respond(command):
+    """Process a command and speak the response, streaming LLM answers as they arrive"""
+    response = process_command(command, stream=LLM_STREAMING)
+    if isinstance(response, str):
+        speak(response)
+        return response
+    response, _ = speak_stream(response)
+    return response
+
 def wake_word_listening_mode():
     """Main loop that waits for wake word, then processes commands until told to standby or exit"""
     running = True
@@ -124,8 +138,7 @@ def wake_word_listening_mode():
                     continue
                 
                 # Process regular commands
-                response = process_command(command)
-                speak(response)
+                respond(command)
 
 def continuous_listening_mode():
     """Legacy continuous listening mode without wake word"""
@@ -143,8 +156,7 @@ def continuous_listening_mode():
             speak("Shutting down JARVIS. Goodbye.")
             break
             
-        response = process_command(command)
-        speak(response)
+        respond(command)
 
 def query_mode():
     """Interactive mode for testing and debugging"""
@@ -165,11 +177,13 @@ def query_mode():
             speak("Shutting down JARVIS. Goodbye.")
             break
             
-        response = process_command(command)
-        print(f"JARVIS: {response}")
-        speak(response)
+        respond(command)
 
 if __name__ == "__main__":
-    initialize()
-    
-    wake_word_listening_mode()
+    try:
+        initialize()
+        
+        wake_word_listening_mode()
+    finally:
+        # Make sure queued log events reach the disk before exiting
+        shutdown_logging()
@@ -0,0 +1,79 @@
+"""
+Tests for the non-blocking HTTP client of the LLM providers
+"""
+import asyncio
+import time
+
+import pytest
+
+aiohttp = pytest.importorskip("aiohttp")
+from aiohttp import web
+
+from brain import async_http
+
+
+async def serve(handler):
+    """Start a local server answering every POST with handler; returns its runner and URL"""
+    app = web.Application()
+    app.router.add_post("/chat", handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = runner.addresses[0][1]
+    return runner, f"http://127.0.0.1:{port}/chat"
+
+
+@pytest.fixture(autouse=True)
+def fresh_counters(monkeypatch):
+    monkeypatch.setattr(async_http, "_stats", {})
+
+
+def test_rate_limited_request_is_retried_after_retry_after():
+    calls = []
+
+    async def handler(request):
+        calls.append(await request.json())
+        if len(calls) == 1:
+            return web.json_response({"error": "slow down"}, status=429, headers={"Retry-After": "0"})
+        return web.json_response({"answer": "Paris"})
+
+    async def ask():
+        runner, url = await serve(handler)
+        try:
+            start = time.perf_counter()
+            response = await async_http.post("test", url, json={"prompt": "capital of france"})
+            return response, time.perf_counter() - start
+        finally:
+            await async_http.close_sessions()
+            await runner.cleanup()
+
+    response, elapsed = asyncio.run(ask())
+
+    assert response.status_code == 200
+    assert response.json() == {"answer": "Paris"}
+    assert calls == [{"prompt": "capital of france"}] * 2
+    # Retry-After: 0 was honoured instead of the exponential backoff
+    assert elapsed < async_http.LLM_RETRY_BACKOFF
+    assert async_http.connection_stats()["test"] == {"requests": 1, "retries": 1, "errors": 0}
+
+
+def test_each_event_loop_gets_its_own_session():
+    async def handler(request):
+        return web.json_response({"answer": "ok"})
+
+    async def ask():
+        runner, url = await serve(handler)
+        try:
+            await async_http.post("test", url, json={})
+            await async_http.post("test", url, json={})
+            return async_http._sessions[asyncio.get_running_loop()]["test"]
+        finally:
+            await async_http.close_sessions()
+            await runner.cleanup()
+
+    first, second = asyncio.run(ask()), asyncio.run(ask())
+
+    assert first is not second
+    assert first.closed and second.closed
+    assert async_http.connection_stats()["test"]["requests"] == 4
@@ -0,0 +1,64 @@
+"""
+Tests for the segmented event log
+"""
+import datetime
+import os
+
+from brain.event_store import EventStore, to_stamp
+from brain.memory import STORE_BACKENDS
+
+OLD_LOG = (
+    "[2025-05-28 12:22:15] (SYSTEM) JARVIS AI system initializing...\n"
+    "[2025-05-28 12:22:18] (USER_COMMAND) open notepad\n"
+    "[2025-05-28 12:22:19] (ACTION) Opening notepad\n"
+)
+
+
+def write_old_log(tmp_path):
+    log_file = os.path.join(tmp_path, "jarvis_log.txt")
+    with open(log_file, "w", encoding="utf-8") as f:
+        f.write(OLD_LOG)
+    return log_file
+
+
+def test_old_log_survives_startup_with_default_settings(tmp_path):
+    log_file = write_old_log(tmp_path)
+    store = STORE_BACKENDS["file"](log_file)
+
+    assert store.search("notepad", 10)
+    assert len(store.tail(10)) == 3
+    assert not store.sealed
+    store.close()
+
+
+def test_old_log_is_adopted_instead_of_sealed_into_retention(tmp_path):
+    log_file = write_old_log(tmp_path)
+    options = dict(segment_max_age=7 * 24 * 3600, retention_age=365 * 86400,
+                   retention_max_bytes=1024 * 1024)
+    store = EventStore(log_file, **options)
+
+    assert len(store.search("notepad", 10)) == 2
+    assert not store.sealed
+    store.close()
+
+    # Still adopted after a restart, when its index already exists
+    store = EventStore(log_file, **options)
+    assert len(store.tail(10)) == 3
+    assert not store.sealed
+    store.close()
+
+
+def test_adopted_log_is_sealed_once_its_adoption_is_old(tmp_path):
+    log_file = write_old_log(tmp_path)
+    store = EventStore(log_file, segment_max_age=7 * 24 * 3600)
+    store.refresh()
+    store.close()
+    adopted = to_stamp(datetime.datetime.now() - datetime.timedelta(days=8))
+    with open(log_file + ".adopted", "w", encoding="utf-8") as f:
+        f.write(str(adopted))
+
+    store = EventStore(log_file, segment_max_age=7 * 24 * 3600)
+    assert len(store.tail(10)) == 3
+    assert len(store.sealed) == 1
+    assert not os.path.exists(log_file + ".adopted")
+    store.close()
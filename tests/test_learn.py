@@ -0,0 +1,47 @@
+"""
+Tests for answering commands from the knowledge base
+"""
+import json
+
+import pytest
+
+from brain import learn, memory
+from brain.knowledge_store import KnowledgeStore
+from brain.task_index import TaskIndex
+from brain.task_matcher import TaskMatcher
+
+
+@pytest.fixture
+def knowledge(tmp_path, monkeypatch):
+    """Point the learning module at a scratch knowledge base; yields the executed commands"""
+    def learned(task):
+        return {"status": "learned", "timestamp": "2024-01-01 00:00:00", "attempts": 1,
+                "solution": f"Run it:\n```python\ntask = {task!r}\n```"}
+
+    path = tmp_path / "knowledge.json"
+    path.write_text(json.dumps({task: learned(task) for task in ["play", "play some music"]}))
+    task_index, task_matcher = TaskIndex(), TaskMatcher()
+    store = KnowledgeStore(str(path), write_delay=0, indexes=[task_index, task_matcher])
+    monkeypatch.setattr(learn, "KNOWLEDGE", store)
+    monkeypatch.setattr(learn, "TASK_INDEX", task_index)
+    monkeypatch.setattr(learn, "TASK_MATCHER", task_matcher)
+    monkeypatch.setattr(learn, "SANDBOX", None)
+
+    executed = []
+    def log_event(kind, text):
+        if kind == "ACTION_EXECUTED":
+            executed.append(text.rpartition(": ")[2])
+    monkeypatch.setattr(memory, "log_event", log_event)
+    yield executed
+    store.close()
+
+
+def test_reworded_command_runs_the_task_it_was_matched_to(knowledge):
+    # The substring index alone would pick "play", contained in the command
+    assert learn.find_similar_task("play music") == "play"
+    assert learn.match_learned_task("play music")[0] == "play some music"
+
+    response = learn.handle_unknown_command("play music")
+
+    assert response == "I've executed a similar command: play some music"
+    assert knowledge == ["play some music"]
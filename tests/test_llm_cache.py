@@ -0,0 +1,59 @@
+"""
+Tests for answering repeated commands from the LLM response cache
+"""
+import pytest
+
+# process_command lives with the desktop automation, speech and vision code
+for module in ("pyautogui", "pyttsx3", "speech_recognition", "keyboard", "selenium", "cv2", "pytesseract", "PIL"):
+    pytest.importorskip(module)
+
+from brain import learn, llm, memory, tasks
+from brain.response_cache import ResponseCache
+from brain.semantic_cache import SemanticCache
+
+
+@pytest.fixture
+def provider(tmp_path, monkeypatch):
+    """Fresh caches and a fake LLM provider recording the prompts it is sent"""
+    monkeypatch.setattr(llm, "RESPONSE_CACHE", ResponseCache(str(tmp_path / "llm_cache.db")))
+    monkeypatch.setattr(llm, "SEMANTIC_CACHE", SemanticCache(str(tmp_path / "llm_semantic_cache.npz")))
+    monkeypatch.setattr(memory, "log_event", lambda *args, **kwargs: None)
+    monkeypatch.setattr(memory, "get_last_n_events", lambda n: "")
+    monkeypatch.setattr(tasks, "log_event", lambda *args, **kwargs: None)
+    monkeypatch.setattr(learn, "handle_unknown_command", lambda command: None)
+    prompts = []
+
+    async def answer(prompt):
+        prompts.append(prompt)
+        return "Paris is the capital of France."
+
+    monkeypatch.setattr(llm, "ASYNC_PROVIDERS", {name: answer for name in llm.ASYNC_PROVIDERS})
+    return prompts
+
+
+def test_commands_are_asked_with_history_and_not_cached_by_default(provider):
+    tasks.process_command("what is the capital of france")
+    tasks.process_command("what is the capital of france")
+
+    assert len(provider) == 2
+    assert llm.RESPONSE_CACHE.stats()["hits"] == 0
+
+
+def test_repeated_command_is_answered_from_cache(provider, monkeypatch):
+    monkeypatch.setattr(tasks, "LLM_CACHE_SELF_CONTAINED", True)
+
+    first = tasks.process_command("what is the capital of france")
+    second = tasks.process_command("what is the capital of france")
+
+    assert first == second == "Paris is the capital of France."
+    assert len(provider) == 1
+    assert llm.RESPONSE_CACHE.stats()["hits"] == 1
+
+
+def test_command_referring_to_history_is_not_cached(provider, monkeypatch):
+    monkeypatch.setattr(tasks, "LLM_CACHE_SELF_CONTAINED", True)
+
+    tasks.process_command("tell me more about that")
+    tasks.process_command("tell me more about that")
+
+    assert len(provider) == 2
@@ -0,0 +1,75 @@
+"""
+Tests for the LLM provider fallback policies
+"""
+import asyncio
+
+import pytest
+
+from brain.llm_dispatch import adispatch
+
+
+@pytest.mark.parametrize("policy", ["hedged", "race"])
+def test_losing_calls_have_finished_when_dispatch_returns(policy):
+    finished = []
+
+    async def fast(prompt):
+        await asyncio.sleep(0.05)
+        return "fast answer"
+
+    async def slow(prompt):
+        try:
+            await asyncio.sleep(10)
+        finally:
+            finished.append("slow")
+
+    async def ask():
+        result = await adispatch([("slow", slow), ("fast", fast)], "prompt", policy=policy,
+                                 hedge_delay=0.01)
+        # Nothing left pending on the loop once the winner is returned
+        pending = asyncio.all_tasks() - {asyncio.current_task()}
+        return result, pending
+
+    (name, response), pending = asyncio.run(ask())
+
+    assert (name, response) == ("fast", "fast answer")
+    assert finished == ["slow"]
+    assert not pending
+
+
+class Health:
+    """Records what adispatch reports about each provider"""
+
+    def __init__(self):
+        self.latencies = {}
+        self.failures = []
+
+    def record_success(self, name, latency):
+        self.latencies[name] = latency
+
+    def record_failure(self, name, error):
+        self.failures.append(name)
+
+
+def test_rate_limit_wait_is_neither_latency_nor_a_reason_to_hedge():
+    called = []
+
+    async def admit(name, prompt):
+        # A local rate limit slot takes a while
+        if name == "throttled":
+            await asyncio.sleep(0.3)
+
+    def provider(name):
+        async def answer(prompt):
+            called.append(name)
+            await asyncio.sleep(0.01)
+            return f"{name} answer"
+        return answer
+
+    health = Health()
+    name, response = asyncio.run(adispatch([("throttled", provider("throttled")), ("backup", provider("backup"))],
+                                           "prompt", policy="hedged", hedge_delay=0.1, health=health,
+                                           admit=admit))
+
+    assert (name, response) == ("throttled", "throttled answer")
+    assert called == ["throttled"]
+    assert health.latencies["throttled"] < 0.1
@@ -0,0 +1,15 @@
+"""
+Tests for the LLM request scheduler
+"""
+from brain.llm_scheduler import ProviderScheduler
+
+
+def test_callers_are_forgotten_once_their_requests_leave_the_queue():
+    scheduler = ProviderScheduler("test", requests_per_minute=6000)
+
+    for i in range(1000):
+        scheduler.acquire(10, caller=f"caller-{i}", timeout=1.0)
+
+    assert scheduler._served == {}
+    assert scheduler.stats["interactive"]["granted"] == 1000
+
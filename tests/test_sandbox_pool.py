@@ -0,0 +1,46 @@
+"""
+Tests for the sandbox worker pool
+"""
+import os
+import time
+
+import pytest
+
+from brain.sandbox_pool import SandboxPool
+
+
+def child_processes():
+    """Process ids whose parent is this process"""
+    children = []
+    for pid in os.listdir("/proc"):
+        if not pid.isdigit():
+            continue
+        try:
+            with open(f"/proc/{pid}/stat") as f:
+                # The parent id follows the parenthesised command name
+                fields = f.read().rpartition(")")[2].split()
+        except OSError:
+            continue
+        if int(fields[1]) == os.getpid() and fields[0] != "Z":
+            children.append(int(pid))
+    return children
+
+
+@pytest.mark.skipif(not os.path.isdir("/proc/self"), reason="needs /proc to list child processes")
+def test_close_after_a_timeout_leaves_no_workers_behind():
+    before = set(child_processes())
+    pool = SandboxPool(size=1, timeout=5.0, memory_limit_mb=0, preload=("os",))
+    pool.start()
+    deadline = time.monotonic() + 30
+    while pool.stats()["workers"] < 1 and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    result = pool.run(compile("while True:\n    pass\n", "<learned>", "exec"), timeout=0.5)
+    # The timed-out worker's replacement is still starting
+    pool.close()
+    left = set(child_processes()) - before
+    time.sleep(1.0)
+
+    assert result["status"] == "timeout"
+    assert left == set()
+    assert set(child_processes()) - before == set()
@@ -0,0 +1,49 @@
+"""
+Tests for the semantic LLM response cache
+"""
+import pytest
+
+from brain.semantic_cache import SemanticCache
+
+CONTEXT = 1
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return SemanticCache(str(tmp_path / "llm_semantic_cache.npz"), threshold=0.7, word_overlap=0.6)
+
+
+@pytest.mark.parametrize("cached, asked", [
+    ("increase brightness", "decrease brightness"),
+    ("lock the screen", "unlock the screen"),
+    ("unmute the microphone", "mute the microphone"),
+    ("open notepad", "open notepad++"),
+    ("lock the screen", "don't lock the screen"),
+    ("convert dollars to euros", "convert euros to dollars"),
+    ("turn on wifi", "turn off wifi"),
+    ("enable bluetooth", "disable bluetooth"),
+    ("install python", "uninstall python"),
+    ("maximize the window", "minimize the window"),
+    ("write code in c", "write code in c#"),
+    ("set volume to 20", "set volume to 50"),
+    ("open chrome", "open chrome downloads folder"),
+])
+def test_opposite_command_is_not_served(cache, cached, asked):
+    cache.add(cached, CONTEXT, f"answer to {cached}")
+
+    assert cache.lookup(asked, CONTEXT) is None
+
+
+@pytest.mark.parametrize("cached, asked", [
+    ("what's the weather like", "how's the weather"),
+    ("open chrome browser", "open chrome"),
+    ("what is the capital of france", "what's france's capital"),
+    ("increase brightness", "Increase the brightness"),
+    ("lock the screen", "lock the screens"),
+    ("convert dollars to euros", "convert dollars into euros"),
+])
+def test_reworded_command_is_served(cache, cached, asked):
+    cache.add(cached, CONTEXT, f"answer to {cached}")
+
+    match = cache.lookup(asked, CONTEXT)
+    assert match is not None and match[0] == f"answer to {cached}"
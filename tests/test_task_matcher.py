@@ -0,0 +1,44 @@
+"""
+Tests for ranked matching of commands against learned tasks
+"""
+import threading
+import time
+
+from brain.task_matcher import MAX_PENDING, TaskMatcher
+
+
+def learned(task):
+    return {"status": "learned", "solution": f"Steps to {task}"}
+
+
+def test_adds_and_reloads_do_not_wait_for_index_builds(monkeypatch):
+    gate = threading.Event()
+    gate.set()
+    index = TaskMatcher._index
+
+    def slow_index(self, *args):
+        gate.wait()
+        return index(self, *args)
+
+    monkeypatch.setattr(TaskMatcher, "_index", slow_index)
+    matcher = TaskMatcher()
+    matcher.rebuild({"open chrome": learned("open chrome")})
+    assert matcher.search("open chrome", limit=1)[0][0] == "open chrome"
+
+    # Enough adds to call for a build, then a reload, while every build is stuck
+    gate.clear()
+    caller = threading.Thread(target=lambda: (
+        [matcher.add(f"print report {i}", learned(f"print report {i}")) for i in range(MAX_PENDING + 1)],
+        matcher.rebuild({"open chrome": learned("open chrome"), "close chrome": learned("close chrome")})))
+    caller.start()
+    caller.join(5.0)
+    assert not caller.is_alive()
+    # Searches meanwhile answer from what is indexed, new tasks included
+    assert matcher.search("print report 7", limit=1)[0][0] == "print report 7"
+
+    gate.set()
+    deadline = time.monotonic() + 5.0
+    while len(matcher) != 2 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert len(matcher) == 2
+    assert matcher.search("close chrome", limit=1)[0][0] == "close chrome"
@@ -7,6 +7,7 @@ import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from config import VOICE_RATE, VOICE_VOLUME
+from brain.streaming import speak_sentences
 
 def speak(text):
     """
@@ -39,6 +40,19 @@ def speak(text):
     engine.say(text)
     engine.runAndWait()
 
+def speak_stream(chunks):
+    """
+    Speak a streamed response sentence by sentence while it is still arriving
+    
+    Args:
+        chunks (iterable): Pieces of text, e.g. from brain.llm.stream_llm
+        
+    Returns:
+        tuple: The complete text and the seconds until the first sentence
+            started being spoken (None if nothing was spoken)
+    """
+    return speak_sentences(chunks, speak)
+
 def listen():
     """
     Listen for voice commands